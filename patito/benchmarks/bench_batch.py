@@ -0,0 +1,32 @@
+import sys
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from batch import run_many
+
+PROGRAMS = 16
+
+
+def main():
+    with open(os.path.join(root_dir, 'tests', 'fib_recursive.patito')) as f:
+        source = f.read()
+    programs = [source] * PROGRAMS
+
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, cores})
+    print(f"{'Workers':>8} {'Seconds':>10} {'Programs/sec':>14}")
+    print("-" * 35)
+    for count in workers:
+        start = time.perf_counter()
+        results = list(run_many(programs, max_workers=count, engine='dispatch'))
+        elapsed = time.perf_counter() - start
+        assert all(result.ok for result in results)
+        print(f"{count:>8} {elapsed:>10.3f} {PROGRAMS / elapsed:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
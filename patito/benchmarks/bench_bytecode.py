@@ -0,0 +1,84 @@
+import sys
+import os
+import io
+import time
+import pickle
+import tempfile
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from bytecode import write_bytecode, load_bytecode
+
+STATEMENTS = 20000
+
+
+def make_source(statements):
+    lines = ["program big;", "var a, b, c : int;", "main() {", "    a = 1;", "    b = 2;"]
+    # Plain copies, every temporal would use up the fixed temp segment
+    names = ['a', 'b', 'c']
+    for i in range(statements):
+        lines.append(f"    {names[i % 3]} = {names[(i + 1) % 3]};")
+    lines.append("    print(c);")
+    lines.append("}")
+    lines.append("end")
+    return "\n".join(lines)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = PatitoParser()
+    source = make_source(STATEMENTS)
+
+    def compile_source():
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse(source)
+        return parser.get_program()
+
+    program, compile_time = timed(compile_source)
+    print(f"{len(program.quadruples)} quadruples")
+
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, 'big.pkl')
+        bytecode_path = os.path.join(directory, 'big.ptc')
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(program, f, protocol=pickle.HIGHEST_PROTOCOL)
+        write_bytecode(program, bytecode_path)
+
+        def load_pickle():
+            with open(pickle_path, 'rb') as f:
+                return pickle.load(f)
+
+        loaded, pickle_time = timed(load_pickle)
+        bytecode, bytecode_time = timed(lambda: load_bytecode(bytecode_path))
+
+        def first_run(prog):
+            vm = VirtualMachine(engine='dispatch', output=io.StringIO())
+            vm.load_program(prog)
+            with contextlib.redirect_stdout(io.StringIO()):
+                vm.execute()
+            return vm.get_output()
+
+        output, run_time = timed(lambda: first_run(bytecode))
+        assert output == first_run(program)
+
+        print(f"{'Step':<28} {'ms':>10} {'File size':>12}")
+        print("-" * 52)
+        print(f"{'compile source':<28} {compile_time * 1000:>10.2f} {len(source):>12}")
+        print(f"{'load pickle':<28} {pickle_time * 1000:>10.2f} {os.path.getsize(pickle_path):>12}")
+        print(f"{'load bytecode (mmap)':<28} {bytecode_time * 1000:>10.2f} {os.path.getsize(bytecode_path):>12}")
+        print(f"{'decode + run bytecode':<28} {run_time * 1000:>10.2f}")
+        bytecode.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from cfg import build_cfgs, liveness, reaching_definitions
+from optimizer import (eliminate_dead_code, propagate_copies, eliminate_subexpressions, hoist_invariants,
+                       recycle_temps)
+
+# While loops in main, about 19 quadruples each: the last size is past 200k quadruples
+SIZES = [1300, 2600, 5300, 10600]
+
+
+def make_source(loops):
+    lines = ["program big;", "var i, total : int;", "", "int step(n: int) {", "    {",
+             "        if (n > 3) {", "            return n - 1;", "        } else {", "            return n + 1;",
+             "        }", "    }", "};", "", "main() {", "    total = 0;"]
+    for k in range(loops):
+        lines += ["    i = 0;", f"    while (i < {k % 7 + 2}) do {{", "        if (i > 1) {",
+                  f"            total = total + i * {k % 5 + 1} - step(i);", "        } else {",
+                  "            total = total - 1;", "        }", "        i = i + 1;", "    }"]
+    lines += ["    print(total);", "}", "end"]
+    return "\n".join(lines)
+
+
+def compile_source(source, loops):
+    # One statement's temporals per loop, the default segments are too small without recycling
+    parser = PatitoParser(segment_sizes={('temp', 'int'): 8 * loops})
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program(recycle_temps=False)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    analyses = ['CFG', 'Dominators', 'Liveness', 'Reaching']
+    passes = [('Dead code', eliminate_dead_code), ('Copies', propagate_copies),
+              ('CSE', eliminate_subexpressions), ('LICM', hoist_invariants), ('Recycle', recycle_temps)]
+
+    print(f"{'Quads':>8} {'Blocks':>7} " + " ".join(f"{name:>10}" for name in analyses) + f" {'us/quad':>8}")
+    print("-" * (27 + 11 * len(analyses)))
+    programs = []
+    for loops in SIZES:
+        program = compile_source(make_source(loops), loops)
+        programs.append(program)
+        quads = program.quadruples
+        build_time, cfgs = timed(build_cfgs, quads, program.functions)
+        dominator_time, _ = timed(lambda: [cfg.natural_loops() for cfg in cfgs])
+        liveness_time, _ = timed(lambda: [liveness(cfg) for cfg in cfgs])
+        reaching_time, _ = timed(lambda: [reaching_definitions(cfg) for cfg in cfgs])
+        times = [build_time, dominator_time, liveness_time, reaching_time]
+        blocks = sum(len(cfg.blocks) for cfg in cfgs)
+        print(f"{len(quads):>8} {blocks:>7} " + " ".join(f"{t:>10.3f}" for t in times)
+              + f" {sum(times) / len(quads) * 1e6:>8.1f}")
+    print()
+
+    print(f"{'Quads':>8} " + " ".join(f"{name:>10}" for name, function in passes) + f" {'us/quad':>8}")
+    print("-" * (18 + 11 * len(passes)))
+    for program in programs:
+        times = [timed(function, program)[0] for name, function in passes]
+        print(f"{len(program.quadruples):>8} " + " ".join(f"{t:>10.3f}" for t in times)
+              + f" {sum(times) / len(program.quadruples) * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+import time
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from compile_cache import CompileCache
+
+PROGRAMS = ['normal.patito', 'factorial.patito', 'fib_recursive.patito']
+REPEAT = 200
+
+
+def main():
+    parser = PatitoParser()
+    print(f"{'Program':<22} {'Compile (ms)':>13} {'Cache hit (ms)':>15} {'Speedup':>9}")
+    print("-" * 62)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+        for name in PROGRAMS:
+            with open(os.path.join(root_dir, 'tests', name)) as f:
+                source = f.read()
+
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                cache.clear()
+                cache.compile(source, parser)
+            miss = (time.perf_counter() - start) / REPEAT
+
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                cache.compile(source, parser)
+            hit = (time.perf_counter() - start) / REPEAT
+            print(f"{name:<22} {miss * 1000:>13.3f} {hit * 1000:>15.3f} {miss / hit:>8.1f}x")
+        print(cache.get_stats())
+
+
+if __name__ == "__main__":
+    main()
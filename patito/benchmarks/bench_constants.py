@@ -0,0 +1,82 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from memory_manager import MemoryManager
+
+SIZES = (2000, 10000, 50000)
+# The linear scan is quadratic, past this many literals it takes minutes (pass --full to run it anyway)
+SCAN_LIMIT = 10000
+PER_PRINT = 10
+
+
+def make_source(literals):
+    """print() statements of ten literals each: ints, floats and strings, every one distinct."""
+    items = []
+    for i in range(literals):
+        kind = i % 3
+        if kind == 0:
+            items.append(str(i))
+        elif kind == 1:
+            items.append(f"{i}.5")
+        else:
+            items.append(f'"s{i}"')
+    lines = ["program literals;", "main() {"]
+    for start in range(0, literals, PER_PRINT):
+        lines.append(f"    print({', '.join(items[start:start + PER_PRINT])});")
+    lines.append("}")
+    lines.append("end")
+    return "\n".join(lines)
+
+
+def linear_get_const_address(self, type_, value):
+    # What get_const_address did before the constant pool: scan every constant
+    for addr, val in self.constant_memory.items():
+        if val == value and self._get_type_from_addr(addr) == type_:
+            return addr
+    return self.constant_pool.add(type_, value)
+
+
+def compile_time(parser, source):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    program = parser.get_program()
+    return time.perf_counter() - start, program
+
+
+def main():
+    full = '--full' in sys.argv
+    parser = PatitoParser()
+
+    print(f"{'Literals':>9} {'Constants':>10} {'Linear scan (s)':>16} {'Constant pool (s)':>18} {'Speedup':>8}")
+    print("-" * 65)
+    for literals in SIZES:
+        source = make_source(literals)
+        pooled, program = compile_time(parser, source)
+        # Every literal is distinct, so the segments are sized past the default 1000 slots
+        assert len(program.constants) == literals
+
+        if literals <= SCAN_LIMIT or full:
+            indexed = MemoryManager.get_const_address
+            MemoryManager.get_const_address = linear_get_const_address
+            try:
+                scanned, scanned_program = compile_time(parser, source)
+            finally:
+                MemoryManager.get_const_address = indexed
+            assert scanned_program.constants == program.constants
+            print(f"{literals:>9} {len(program.constants):>10} {scanned:>16.3f} {pooled:>18.3f} {scanned / pooled:>7.1f}x")
+        else:
+            print(f"{literals:>9} {len(program.constants):>10} {'-':>16} {pooled:>18.3f} {'-':>8}")
+    print(f"Constant segment at {SIZES[-1]} literals: {program.memory_layout['const']}")
+
+
+if __name__ == "__main__":
+    main()
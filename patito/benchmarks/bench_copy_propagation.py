@@ -0,0 +1,74 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import propagate_copies
+
+REPEATS = 5
+
+
+def compile_source(source):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program()
+
+
+def executed(program):
+    """Quadruples executed by one run, from the profiler."""
+    vm = VirtualMachine(profile=True, output=io.StringIO())
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    return vm.get_profile().get_instruction_count()
+
+
+def run_time(program, engine):
+    best = None
+    for _ in range(REPEATS):
+        vm = VirtualMachine(engine=engine)
+        vm.load_program(program)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    print(f"{'Program':<22} {'Quads':>6} {'After':>6} {'Executed':>10} {'After':>10} {'Saved':>7}")
+    print("-" * 66)
+    programs = []
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        with open(os.path.join(root_dir, 'tests', file_name)) as f:
+            program = compile_source(f.read())
+        optimized, stats = propagate_copies(program)
+        before, after = executed(program), executed(optimized)
+        programs.append((file_name, program, optimized))
+        print(f"{file_name:<22} {stats['quadruples_before']:>6} {stats['quadruples_after']:>6} "
+              f"{before:>10} {after:>10} {(before - after) / before:>7.1%}")
+    print()
+
+    file_name, program, optimized = programs[2]
+    print(f"{file_name}")
+    print(f"{'Engine':<10} {'Plain (s)':>10} {'Optimized (s)':>14}")
+    print("-" * 36)
+    for engine in ['loop', 'dispatch']:
+        plain_time, plain_output = run_time(program, engine)
+        optimized_time, optimized_output = run_time(optimized, engine)
+        assert plain_output == optimized_output
+        print(f"{engine:<10} {plain_time:>10.3f} {optimized_time:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
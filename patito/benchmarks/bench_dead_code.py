@@ -0,0 +1,85 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import eliminate_dead_code
+
+FUNCTIONS = 50
+ITERATIONS = 2000
+REPEATS = 5
+
+
+def make_source(functions):
+    """Functions whose if/else branches all return, called from an if/else at the end of a loop."""
+    lines = ["program deadcode;", "var i, total : int;", ""]
+    for k in range(functions):
+        lines += [f"int f{k}(n: int) {{", "    {",
+                  f"        if (n > {k}) {{", f"            return n - {k};",
+                  "        } else {", f"            return {k} - n;", "        }", "    }", "};", ""]
+    lines += ["main() {", "    i = 0;", "    total = 0;", f"    while (i < {ITERATIONS}) do {{",
+              "        i = i + 1;", "        if (i > 1000) {", "            total = total + f0(i);",
+              "        } else {", f"            total = total + f{functions - 1}(i);", "        }", "    }",
+              "    print(total);", "}", "end"]
+    return "\n".join(lines)
+
+
+def compile_source(source):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program()
+
+
+def run_time(program, engine):
+    best = None
+    for _ in range(REPEATS):
+        vm = VirtualMachine(engine=engine)
+        vm.load_program(program)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    sources = [("generated", make_source(FUNCTIONS))]
+    for file_name in ['factorial.patito', 'fib_recursive.patito', 'normal.patito']:
+        with open(os.path.join(root_dir, 'tests', file_name)) as f:
+            sources.append((file_name, f.read()))
+
+    print(f"{'Program':<22} {'Quads':>7} {'After':>7} {'Removed':>8} {'Threaded':>9} {'To return':>10}")
+    print("-" * 67)
+    programs = []
+    for label, source in sources:
+        program = compile_source(source)
+        start = time.perf_counter()
+        optimized, stats = eliminate_dead_code(program)
+        elapsed = time.perf_counter() - start
+        programs.append((label, program, optimized))
+        print(f"{label:<22} {stats['quadruples_before']:>7} {stats['quadruples_after']:>7} {stats['removed']:>8} "
+              f"{stats['jumps_threaded']:>9} {stats['jumps_to_return']:>10}   ({elapsed * 1000:.1f} ms)")
+    print()
+
+    label, program, optimized = programs[0]
+    print(f"{'Engine':<10} {'Plain (s)':>10} {'Optimized (s)':>14}")
+    print("-" * 36)
+    for engine in ['loop', 'dispatch']:
+        plain_time, plain_output = run_time(program, engine)
+        optimized_time, optimized_output = run_time(optimized, engine)
+        assert plain_output == optimized_output
+        print(f"{engine:<10} {plain_time:>10.3f} {optimized_time:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
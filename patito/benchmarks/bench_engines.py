@@ -0,0 +1,66 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+PROGRAMS = ['fibonacci.patito', 'factorial.patito']
+ENGINES = ['loop', 'dispatch']
+REPEAT = 2000
+
+
+def compile_program(parser, name):
+    with open(os.path.join(root_dir, 'tests', name)) as f:
+        source = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program()
+
+
+def count_instructions(program):
+    """Number of quadruples executed by one run of the program."""
+    vm = VirtualMachine(engine='dispatch')
+    vm.load_program(program)
+    code = vm.decode()
+    executed = 0
+    ip = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        while ip < len(code):
+            ip = code[ip]()
+            executed += 1
+    return executed
+
+
+def run_engine(engine, program):
+    vm = VirtualMachine(engine=engine)
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = PatitoParser()
+    print(f"{'Program':<20} {'Engine':<10} {'Instr/run':>10} {'Seconds':>10} {'Instr/sec':>14}")
+    print("-" * 68)
+    for name in PROGRAMS:
+        program = compile_program(parser, name)
+        executed = count_instructions(program)
+        for engine in ENGINES:
+            elapsed = run_engine(engine, program)
+            rate = executed * REPEAT / elapsed
+            print(f"{name:<20} {engine:<10} {executed:>10} {elapsed:>10.3f} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
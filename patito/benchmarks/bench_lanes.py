@@ -0,0 +1,57 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from lane_engine import run_lanes
+
+SOURCE = """
+program countdown;
+var n, steps, total : int;
+
+main() {
+    steps = 0;
+    total = 0;
+    while (n > 0) do {
+        if (n > 10) {
+            total = total + n * 2;
+            n = n - 7;
+        } else {
+            total = total - 1;
+            n = n - 1;
+        }
+        steps = steps + 1;
+    }
+}
+end
+"""
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = PatitoParser()
+        parser.parse(SOURCE)
+    program = parser.get_program()
+
+    print(f"{'Lanes':>8} {'Scalar (s)':>12} {'Vectorized (s)':>16} {'Speedup':>9}")
+    print("-" * 48)
+    for lanes in (10, 100, 1000, 10000):
+        inputs = {'n': list(range(1, lanes + 1))}
+        start = time.perf_counter()
+        scalar = run_lanes(program, inputs, vectorize=False)
+        scalar_time = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized = run_lanes(program, inputs)
+        vectorized_time = time.perf_counter() - start
+        assert (scalar.globals['total'] == vectorized.globals['total']).all()
+        print(f"{lanes:>8} {scalar_time:>12.3f} {vectorized_time:>16.3f} {scalar_time / vectorized_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from bench_tracing_jit import SOURCE as HOT_LOOP
+
+ENGINES = ['loop', 'dispatch']
+LIMITS = {'max_instructions': 10 ** 12, 'max_call_depth': 10 ** 6, 'max_frame_slots': 10 ** 9}
+REPEAT = 7
+
+
+def compile_source(source):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program()
+
+
+def best_time(program, options):
+    best = None
+    for _ in range(REPEAT):
+        vm = VirtualMachine(output=io.StringIO(), **options)
+        vm.load_program(program)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            vm.execute()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    with open(os.path.join(root_dir, 'tests', 'fib_recursive.patito')) as f:
+        programs = [('fib_recursive', compile_source(f.read())), ('hot loop', compile_source(HOT_LOOP))]
+
+    print(f"{'Program':<15} {'Engine':<10} {'Unlimited':>10} {'Limited':>10} {'Slowdown':>9}")
+    print("-" * 58)
+    for name, program in programs:
+        for engine in ENGINES:
+            unlimited = best_time(program, {'engine': engine})
+            limited = best_time(program, dict(LIMITS, engine=engine))
+            slowdown = (limited / unlimited - 1) * 100
+            print(f"{name:<15} {engine:<10} {unlimited:>10.3f} {limited:>10.3f} {slowdown:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
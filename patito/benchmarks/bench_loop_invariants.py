@@ -0,0 +1,85 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import hoist_invariants, recycle_temps
+
+ITERATIONS = 20000
+REPEATS = 5
+
+SOURCE = f"""
+program invariants;
+var i, limit, a, b, total : int;
+
+main() {{
+    limit = {ITERATIONS // 2};
+    a = 3;
+    b = 7;
+    total = 0;
+    i = 0;
+    while (i < limit * 2) do {{
+        total = total + (a * b + a - b) * (b - 1) + i * (a + b);
+        i = i + 1;
+    }}
+    print(total);
+}}
+end
+"""
+
+
+def compile_source(source):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    return parser.get_program(recycle_temps=False)
+
+
+def executed(program):
+    vm = VirtualMachine(profile=True, output=io.StringIO())
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    return vm.get_profile().get_instruction_count()
+
+
+def run_time(program, engine):
+    best = None
+    for _ in range(REPEATS):
+        vm = VirtualMachine(engine=engine)
+        vm.load_program(program)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    program = compile_source(SOURCE)
+    optimized, stats = hoist_invariants(program)
+    plain, _ = recycle_temps(program)
+    optimized, _ = recycle_temps(optimized)
+    print(f"Hoisted {stats['hoisted']} quadruples out of {stats['loops']} loop(s)")
+    print(f"Executed quadruples: {executed(plain)} -> {executed(optimized)}")
+    print()
+    print(f"{'Engine':<10} {'Plain (s)':>10} {'Hoisted (s)':>12}")
+    print("-" * 34)
+    for engine in ['loop', 'dispatch']:
+        plain_time, plain_output = run_time(plain, engine)
+        optimized_time, optimized_output = run_time(optimized, engine)
+        assert plain_output == optimized_output
+        print(f"{engine:<10} {plain_time:>10.3f} {optimized_time:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
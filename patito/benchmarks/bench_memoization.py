@@ -0,0 +1,67 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+SOURCE = """
+program fibmemo;
+var r : int;
+
+int fib(n: int) {{
+    {{
+        if (n < 2) {{
+            return n;
+        }} else {{
+            return fib(n - 1) + fib(n - 2);
+        }}
+    }}
+}};
+
+main() {{
+    r = fib({n});
+    print(r);
+}}
+end
+"""
+
+ENGINES = ['loop', 'dispatch', 'python']
+
+
+def compile_fib(n):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(SOURCE.format(n=n))
+    return parser.get_program()
+
+
+def run(program, engine, memoize):
+    vm = VirtualMachine(engine=engine, memoize=memoize)
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        vm.execute()
+        elapsed = time.perf_counter() - start
+    return elapsed, vm.get_memo_stats()
+
+
+def main():
+    print(f"{'Program':<10} {'Engine':<10} {'Memoize':<8} {'Seconds':>10}  Stats")
+    print("-" * 70)
+    # Without memoization fib(30) takes minutes on the interpreters
+    for n, memoize in [(20, False), (30, True)]:
+        program = compile_fib(n)
+        for engine in ENGINES:
+            elapsed, stats = run(program, engine, memoize)
+            print(f"fib({n}){'':<3} {engine:<10} {str(memoize):<8} {elapsed:>10.4f}  {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+N = 24
+
+CODIGO = """
+program fibrecursive;
+var r : int;
+
+int fib(n: int) {
+    {
+        if (n < 2) {
+            return n;
+        } else {
+            return fib(n - 1) + fib(n - 2);
+        }
+    }
+};
+
+main() {
+    r = fib(%d);
+    print(r);
+}
+end
+""" % N
+
+
+def native_fib(n):
+    if n < 2:
+        return n
+    return native_fib(n - 1) + native_fib(n - 2)
+
+
+def time_engine(program, engine):
+    vm = VirtualMachine(engine=engine)
+    vm.load_program(program)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        vm.execute()
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue().splitlines()[1]
+
+
+def main():
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(CODIGO)
+    program = parser.get_program()
+
+    start = time.perf_counter()
+    expected = native_fib(N)
+    native = time.perf_counter() - start
+
+    print(f"fib({N}) = {expected}")
+    print(f"{'Engine':<10} {'Seconds':>10} {'x native':>10}")
+    print("-" * 32)
+    print(f"{'native':<10} {native:>10.3f} {1.0:>10.1f}")
+    for engine in ['loop', 'dispatch', 'python']:
+        elapsed, result = time_engine(program, engine)
+        assert result == str(expected), result
+        print(f"{engine:<10} {elapsed:>10.3f} {elapsed / native:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+import subprocess
+import statistics
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(root_dir, 'src')
+
+REPEAT = 15
+
+# Runs in a fresh interpreter: import the compiler and compile one program
+SNIPPET = """
+import sys, io, json, time, contextlib
+started = time.perf_counter()
+sys.path.append({src!r})
+if {hide_tables!r}:
+    # An import of None fails, PLY rebuilds the tables in memory
+    sys.modules['patito_parsetab'] = None
+    sys.modules['patito_lextab'] = None
+from parser import PatitoParser
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    parser = PatitoParser(optimize={optimize!r})
+    built = time.perf_counter()
+    parser.parse(open({source!r}).read())
+    parser.get_program()
+done = time.perf_counter()
+print(json.dumps([imported - started, built - imported, done - built, done - started]))
+"""
+
+MODES = [
+    ('rebuilt tables', True, False),
+    ('shipped tables', False, False),
+    ('shipped, optimize', False, True),
+]
+
+
+def measure(hide_tables, optimize):
+    code = SNIPPET.format(src=src_dir, hide_tables=hide_tables, optimize=optimize,
+                          source=os.path.join(root_dir, 'tests', 'normal.patito'))
+    runs = []
+    for _ in range(REPEAT):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        runs.append(json.loads(result.stdout))
+    return [statistics.median(column) for column in zip(*runs)]
+
+
+def main():
+    print(f"{'Mode':<18} {'Import (ms)':>12} {'Parser (ms)':>12} {'Compile (ms)':>13} {'Total (ms)':>11}")
+    print("-" * 70)
+    for name, hide_tables, optimize in MODES:
+        imported, built, compiled, total = measure(hide_tables, optimize)
+        print(f"{name:<18} {imported * 1000:>12.2f} {built * 1000:>12.2f} {compiled * 1000:>13.2f} {total * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import io
+import time
+import random
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import eliminate_subexpressions, recycle_temps
+
+PROGRAMS = 20
+STATEMENTS = 100
+ITERATIONS = 200
+REPEATS = 3
+SEED = 7
+
+
+def make_expression(rng, names, depth):
+    if depth == 0:
+        return rng.choice(names + [str(rng.randint(1, 9))])
+    left = make_expression(rng, names, depth - 1)
+    right = make_expression(rng, names, depth - 1)
+    return f"({left} {rng.choice(['+', '-', '*'])} {right})"
+
+
+def make_source(rng):
+    """A loop body of statements that repeat subexpressions, like index arithmetic does."""
+    names = ['a', 'b', 'c', 'i']
+    lines = ["program stress;", "var a, b, c, i, x : int;", "", "main() {",
+             "    a = 1;", "    b = 2;", "    c = 3;", "    x = 0;", "    i = 0;",
+             f"    while (i < {ITERATIONS}) do {{"]
+    for _ in range(STATEMENTS):
+        shared = make_expression(rng, names, 2)
+        other = make_expression(rng, names, 1)
+        target = rng.choice(['x', 'x', 'x', 'c'])
+        lines.append(f"        {target} = {shared} * {other} - {shared} + {other} * {shared};")
+        if target == 'c':
+            lines.append("        c = c - c + 3;")
+    lines += ["        i = i + 1;", "    }", "    print(x);", "}", "end"]
+    return "\n".join(lines)
+
+
+def compile_source(source):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    # Recycled temporals overwrite values the pass could reuse, recycle after it instead
+    return parser.get_program(recycle_temps=False)
+
+
+def run(program):
+    vm = VirtualMachine(engine='dispatch')
+    vm.load_program(program)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        vm.execute()
+    return time.perf_counter() - start, output.getvalue()
+
+
+def best_time(program):
+    times = []
+    for _ in range(REPEATS):
+        elapsed, output = run(program)
+        times.append(elapsed)
+    return min(times), output
+
+
+def main():
+    rng = random.Random(SEED)
+    total_before = total_after = total_eliminated = 0
+    plain_time = optimized_time = 0.0
+    for _ in range(PROGRAMS):
+        program = compile_source(make_source(rng))
+        optimized, stats = eliminate_subexpressions(program)
+        plain, _ = recycle_temps(program)
+        optimized, _ = recycle_temps(optimized)
+        total_before += stats['quadruples_before']
+        total_after += stats['quadruples_after']
+        total_eliminated += stats['eliminated']
+
+        elapsed, expected = best_time(plain)
+        plain_time += elapsed
+        elapsed, output = best_time(optimized)
+        optimized_time += elapsed
+        assert output == expected
+
+    print(f"Stress corpus: {PROGRAMS} programs, {STATEMENTS} statements each")
+    print(f"{'':<22} {'Before':>10} {'After':>10}")
+    print("-" * 44)
+    print(f"{'Quadruples':<22} {total_before:>10} {total_after:>10}")
+    print(f"{'Dispatch run (s)':<22} {plain_time:>10.3f} {optimized_time:>10.3f}")
+    print(f"Duplicates eliminated: {total_eliminated} "
+          f"({(total_before - total_after) / total_before:.1%} fewer quadruples)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import fuse_superinstructions
+from bench_engines import compile_program, count_instructions
+
+PROGRAMS = ['fibonacci.patito', 'factorial.patito', 'fib_recursive.patito']
+ENGINES = ['loop', 'dispatch']
+REPEAT = 20
+
+
+def run_engine(engine, program):
+    vm = VirtualMachine(engine=engine)
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = PatitoParser()
+    print(f"{'Program':<22} {'Engine':<10} {'Dispatches':>12} {'Fused':>12} {'Seconds':>10} {'Fused':>10}")
+    print("-" * 80)
+    for name in PROGRAMS:
+        program = compile_program(parser, name)
+        fused, stats = fuse_superinstructions(program)
+        before = count_instructions(program)
+        after = count_instructions(fused)
+        for engine in ENGINES:
+            plain_time = run_engine(engine, program)
+            fused_time = run_engine(engine, fused)
+            print(f"{name:<22} {engine:<10} {before:>12} {after:>12} {plain_time:>10.3f} {fused_time:>10.3f}")
+        print(f"  temps per function: {stats['temps_before']} -> {stats['temps_after']}")
+
+
+if __name__ == "__main__":
+    main()
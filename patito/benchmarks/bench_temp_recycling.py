@@ -0,0 +1,80 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+STATEMENTS = 200
+CALLS = 300
+REPEATS = 5
+
+
+def make_source(statements):
+    """A function full of independent expressions, each temporal alive for one statement."""
+    lines = ["program temps;", "var r, i : int;", "", "int work(n: int) {", "    var a, b : int;", "    {",
+             "        a = n;", "        b = 0;"]
+    for i in range(statements):
+        lines.append(f"        b = b + (a * {i % 7 + 1} - {i % 5}) * (a + {i % 3});")
+    lines += ["        return b;", "    }", "};", "", "main() {", "    i = 0;",
+              f"    while (i < {CALLS}) do {{", "        r = work(i);", "        i = i + 1;", "    }",
+              "    print(r);", "}", "end"]
+    return "\n".join(lines)
+
+
+def compile_source(source, recycle_temps):
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(source)
+    program = parser.get_program(recycle_temps=recycle_temps)
+    return parser, program
+
+
+def run_time(program, engine):
+    best = None
+    for _ in range(REPEATS):
+        vm = VirtualMachine(engine=engine)
+        vm.load_program(program)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            vm.execute()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    with open(os.path.join(root_dir, 'tests', 'fib_recursive.patito')) as f:
+        fib_source = f.read()
+
+    for label, source in [("generated", make_source(STATEMENTS)), ("fib_recursive", fib_source)]:
+        parser, recycled = compile_source(source, True)
+        _, plain = compile_source(source, False)
+        stats = parser.temp_stats
+
+        print(f"== {label} ==")
+        print(f"{'Function':<12} {'Temps before':>13} {'Temps after':>12}")
+        print("-" * 39)
+        for name in stats['temps_before']:
+            print(f"{name:<12} {stats['temps_before'][name]:>13} {stats['temps_after'][name]:>12}")
+        print(f"Temp segment: {plain.memory_layout['temp']} -> {recycled.memory_layout['temp']}")
+
+        print(f"{'Engine':<10} {'Plain (s)':>10} {'Recycled (s)':>13}")
+        print("-" * 35)
+        for engine in ['loop', 'dispatch']:
+            plain_time, plain_output = run_time(plain, engine)
+            recycled_time, recycled_output = run_time(recycled, engine)
+            assert plain_output == recycled_output
+            print(f"{engine:<10} {plain_time:>10.3f} {recycled_time:>13.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
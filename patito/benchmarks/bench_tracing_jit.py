@@ -0,0 +1,62 @@
+import sys
+import os
+import io
+import time
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(current_dir)
+sys.path.append(os.path.join(root_dir, 'src'))
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+SOURCE = """
+program hotloop;
+var i, s : int; f : float;
+
+main() {
+    i = 0;
+    s = 0;
+    f = 1.0;
+    while (i < 200000) do {
+        if (i > 100000) {
+            s = s + i;
+        } else {
+            s = s - 1;
+        }
+        f = f * 1.0;
+        i = i + 1;
+    }
+    print(s);
+}
+end
+"""
+
+CONFIGURATIONS = [
+    ('loop', {'engine': 'loop'}),
+    ('dispatch', {'engine': 'dispatch', 'jit': False}),
+    ('dispatch+jit', {'engine': 'dispatch'}),
+]
+
+
+def main():
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(SOURCE)
+    program = parser.get_program()
+
+    print(f"{'Configuration':<15} {'Seconds':>10}  JIT stats")
+    print("-" * 70)
+    for name, options in CONFIGURATIONS:
+        vm = VirtualMachine(**options)
+        vm.load_program(program)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            vm.execute()
+            elapsed = time.perf_counter() - start
+        print(f"{name:<15} {elapsed:>10.3f}  {vm.get_jit_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import io
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from parser import PatitoParser
+from program import CompiledProgram
+from compile_cache import CompileCache
+from virtual_machine import VirtualMachine, ResourceLimitExceeded
+
+# Parser and compile cache of the current worker process, built once by _init_worker()
+_worker_parser = None
+_worker_cache = None
+
+
+class RunResult:
+    """Outcome of one program run by run_many()."""
+
+    def __init__(self, index, status, output, log, exit_code, error, compile_time, run_time):
+        # Position of the program in the list given to run_many()
+        self.index = index
+        # 'ok', 'compile_error', 'runtime_error' or 'limit_exceeded'
+        self.status = status
+        self.output = output
+        # Banners and error messages the VM printed
+        self.log = log
+        self.exit_code = exit_code
+        self.error = error
+        self.compile_time = compile_time
+        self.run_time = run_time
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def __repr__(self):
+        return f"RunResult({self.index}, {self.status}, {self.run_time:.4f}s)"
+
+
+def _init_worker(cache_dir=None):
+    global _worker_parser, _worker_cache
+    # Building the parser loads the PLY tables; do it once per process
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_parser = PatitoParser()
+    # Workers share the directory, entries are replaced atomically
+    _worker_cache = CompileCache(cache_dir) if cache_dir is not None else None
+
+
+def _compile(program):
+    if isinstance(program, str):
+        if _worker_parser is None:
+            _init_worker()
+        if _worker_cache is not None:
+            return _worker_cache.compile(program, _worker_parser)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _worker_parser.parse(program)
+        return _worker_parser.get_program()
+    return program
+
+
+def run_program(index, program, vm_options):
+    """Compile (when given source) and run one program, capturing everything it prints."""
+    started = time.perf_counter()
+    try:
+        program = _compile(program)
+    except Exception as e:
+        return RunResult(index, 'compile_error', '', '', 1, str(e), time.perf_counter() - started, 0.0)
+    compile_time = time.perf_counter() - started
+
+    output = io.StringIO()
+    log = io.StringIO()
+    vm = VirtualMachine(output=output, **vm_options)
+    if isinstance(program, CompiledProgram):
+        vm.load_program(program)
+    else:
+        quadruples, constants = program
+        vm.load_quadruples(quadruples)
+        vm.set_constants(constants)
+
+    status, exit_code, error = 'ok', 0, None
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log):
+            vm.execute()
+    except ResourceLimitExceeded as e:
+        status, exit_code, error = 'limit_exceeded', 1, str(e)
+    except SystemExit as e:
+        # The VM reports runtime errors and exits
+        status, exit_code = 'runtime_error', e.code
+        error = log.getvalue().strip().splitlines()[-1] if log.getvalue().strip() else None
+    run_time = time.perf_counter() - started
+    return RunResult(index, status, output.getvalue(), log.getvalue(), exit_code, error, compile_time, run_time)
+
+
+def run_many(programs, max_workers=None, cache_dir=None, **vm_options):
+    """Run many programs across a process pool, yielding RunResults as they finish.
+
+    Each program is Patito source, a CompiledProgram or a (quadruples,
+    constants) pair. vm_options go to every VirtualMachine (engine,
+    limits...). Results arrive in completion order; RunResult.index
+    tells which program each one belongs to. With cache_dir, sources are
+    compiled through a CompileCache shared by all workers.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(cache_dir,)) as pool:
+        futures = [pool.submit(run_program, index, program, vm_options)
+                   for index, program in enumerate(programs)]
+        for future in as_completed(futures):
+            yield future.result()
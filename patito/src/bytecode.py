@@ -0,0 +1,388 @@
+import os
+import sys
+import mmap
+import struct
+from program import CompiledProgram
+from function_directory import FunctionInfo
+from variable_table import VariableTable
+from quadruple_generator import Quadruple, JUMP_TARGET_FIELDS
+from virtual_machine import OPCODES
+
+# Layout of a .ptc file (all little-endian):
+#   header
+#   code       - count instructions of four int32: opcode, operand1, operand2, result
+#   constants  - int (address, int64), float (address, float64) and string (address, utf-8) pools
+#   functions  - start, return slot, resource needs and variables of every function
+#   metadata   - program name, memory layout, address ranges, main resource needs and globals
+MAGIC = b'PTC\x00'
+VERSION = 2
+
+HEADER = struct.Struct('<4sHHIIIIIIII')
+INSTRUCTION = struct.Struct('<iiii')
+COUNT = struct.Struct('<I')
+INT_CONSTANT = struct.Struct('<iq')
+FLOAT_CONSTANT = struct.Struct('<id')
+STRING_CONSTANT = struct.Struct('<iI')
+FUNCTION = struct.Struct('<iiB')
+VARIABLE = struct.Struct('<i')
+NEED = struct.Struct('<i')
+RANGE = struct.Struct('<ii')
+
+# Operand that is not used by the instruction
+NONE = -1
+
+# Range of the int constant pool; the VM itself has unbounded ints
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+OPERATORS = {opcode: name for name, opcode in OPCODES.items()}
+
+
+def _const_type(address, address_ranges):
+    for segment, type_, first, limit in address_ranges:
+        if segment == 'const' and first <= address < limit:
+            return type_
+    return None
+
+
+def _pack_name(parts, name):
+    data = (name if name is not None else '').encode('utf-8')
+    parts.append(struct.pack('<H', len(data)))
+    parts.append(data)
+
+
+def _unpack_name(buffer, offset):
+    size, = struct.unpack_from('<H', buffer, offset)
+    offset += 2
+    return bytes(buffer[offset:offset + size]).decode('utf-8'), offset + size
+
+
+def _pack_variables(parts, variables):
+    parts.append(COUNT.pack(len(variables)))
+    for var_info in variables:
+        _pack_name(parts, var_info.name)
+        _pack_name(parts, var_info.var_type)
+        _pack_name(parts, var_info.scope)
+        parts.append(VARIABLE.pack(var_info.address if var_info.address is not None else NONE))
+
+
+def _unpack_variables(buffer, offset):
+    count, = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    variables = []
+    for _ in range(count):
+        name, offset = _unpack_name(buffer, offset)
+        var_type, offset = _unpack_name(buffer, offset)
+        scope, offset = _unpack_name(buffer, offset)
+        address, = VARIABLE.unpack_from(buffer, offset)
+        offset += VARIABLE.size
+        variables.append((name, var_type, scope, address if address != NONE else None))
+    return variables, offset
+
+
+def _pack_needs(parts, needs):
+    parts.append(COUNT.pack(len(needs)))
+    for key, value in needs.items():
+        _pack_name(parts, key)
+        parts.append(NEED.pack(value))
+
+
+def _unpack_needs(buffer, offset):
+    count, = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+    needs = {}
+    for _ in range(count):
+        key, offset = _unpack_name(buffer, offset)
+        needs[key], = NEED.unpack_from(buffer, offset)
+        offset += NEED.size
+    return needs, offset
+
+
+def encode_instruction(quad, function_index):
+    """(opcode, operand1, operand2, result) as int32 values."""
+    opcode = OPCODES.get(quad.operator)
+    if opcode is None:
+        raise Exception(f"Unknown operator: {quad.operator}")
+    fields = []
+    for field in ('operand1', 'operand2', 'result'):
+        value = getattr(quad, field)
+        if quad.operator == 'ERA' and field == 'operand1':
+            value = function_index[value]
+        elif quad.operator == 'PARAM' and field == 'result':
+            value = int(value.replace('param', ''))
+        elif quad.operator == 'GOTO' and field == 'operand1':
+            # The 'MAIN' label of the first jump is not needed to run
+            value = None
+        fields.append(int(value) if value is not None else NONE)
+    return (opcode, *fields)
+
+
+def decode_fields(opcode, operand1, operand2, result, function_names):
+    """(operator, operand1, operand2, result) of one instruction, with the field types the parser uses."""
+    operator = OPERATORS[opcode]
+    fields = [value if value != NONE else None for value in (operand1, operand2, result)]
+    if operator == 'ERA':
+        fields[0] = function_names[fields[0]]
+    elif operator == 'PARAM':
+        fields[2] = f"param{fields[2]}"
+    elif JUMP_TARGET_FIELDS.get(operator) == 'result':
+        # fill_quad() stores jump targets as strings
+        fields[2] = str(fields[2])
+    return operator, fields[0], fields[1], fields[2]
+
+
+def decode_instruction(opcode, operand1, operand2, result, function_names):
+    """Quadruple for one instruction."""
+    return Quadruple(*decode_fields(opcode, operand1, operand2, result, function_names))
+
+
+class InstructionCursor:
+    """Quadruple-shaped view of one instruction, refilled in place by InstructionView.cursor()."""
+
+    __slots__ = ('operator', 'operand1', 'operand2', 'result')
+
+    def __str__(self):
+        return f"({self.operator}, {self.operand1}, {self.operand2}, {self.result})"
+
+
+def write_bytecode(program, path):
+    """Serialize a CompiledProgram into the binary format at path."""
+    names = list(program.functions)
+    function_index = {name: index for index, name in enumerate(names)}
+
+    code = b''.join(INSTRUCTION.pack(*encode_instruction(quad, function_index))
+                    for quad in program.quadruples)
+
+    ranges = program.get_address_ranges()
+    pools = {'int': [], 'float': [], 'string': []}
+    for address, value in sorted(program.constants.items()):
+        pools[_const_type(int(address), ranges)].append((int(address), value))
+    for address, value in pools['int']:
+        if not INT64_MIN <= value <= INT64_MAX:
+            raise Exception(f"Error: int constant {value} does not fit the 64-bit constants of the bytecode format")
+    constants = [COUNT.pack(len(pools['int']))]
+    constants.extend(INT_CONSTANT.pack(address, value) for address, value in pools['int'])
+    constants.append(COUNT.pack(len(pools['float'])))
+    constants.extend(FLOAT_CONSTANT.pack(address, value) for address, value in pools['float'])
+    constants.append(COUNT.pack(len(pools['string'])))
+    for address, value in pools['string']:
+        data = value.encode('utf-8')
+        constants.append(STRING_CONSTANT.pack(address, len(data)))
+        constants.append(data)
+
+    functions = [COUNT.pack(len(names))]
+    for name in names:
+        func = program.functions[name]
+        _pack_name(functions, name)
+        _pack_name(functions, func.return_type)
+        functions.append(FUNCTION.pack(func.start_quad if func.start_quad is not None else NONE,
+                                       func.return_address if func.return_address is not None else NONE,
+                                       int(func.is_pure)))
+        _pack_needs(functions, func.resource_needs)
+        # Parameters first and in order, add_parameter() rebuilds func.params from them
+        params = [func.var_table.lookup(param.name) for param in func.params]
+        others = [v for v in func.var_table.get_all_variables() if v.scope != 'param']
+        _pack_variables(functions, params + others)
+
+    metadata = []
+    _pack_name(metadata, program.name)
+    layout = [(segment, type_, count) for segment, sizes in program.memory_layout.items()
+              for type_, count in sizes.items()]
+    metadata.append(COUNT.pack(len(layout)))
+    for segment, type_, count in layout:
+        _pack_name(metadata, segment)
+        _pack_name(metadata, type_)
+        metadata.append(NEED.pack(count))
+    metadata.append(COUNT.pack(len(ranges)))
+    for segment, type_, first, limit in ranges:
+        _pack_name(metadata, segment)
+        _pack_name(metadata, type_)
+        metadata.append(RANGE.pack(first, limit))
+    _pack_needs(metadata, program.main_resource_needs)
+    _pack_variables(metadata, program.global_vars.get_all_variables() if program.global_vars else [])
+
+    sections = [code, b''.join(constants), b''.join(functions), b''.join(metadata)]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(program.quadruples), offsets[0],
+                         offsets[1], len(sections[1]), offsets[2], len(sections[2]), offsets[3], len(sections[3]))
+
+    # Written next to the destination and moved into place, readers never see half a file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(temp_path, path)
+
+
+class InstructionView:
+    """Read-only sequence of Quadruples over the mmapped instruction array.
+
+    Nothing is decoded up front: a Quadruple is built the first time its
+    index is read and kept for the next reads. raw(ip) returns the four
+    integers straight from the file and cursor() walks the instructions
+    without building Quadruples.
+    """
+
+    def __init__(self, buffer, offset, count, function_names):
+        self.count = count
+        self.function_names = function_names
+        self.decoded = [None] * count
+        if sys.byteorder == 'little':
+            # Instruction fields are read in place, sharing the file's pages
+            self.words = memoryview(buffer)[offset:offset + count * INSTRUCTION.size].cast('i')
+        else:
+            self.words = [value for fields in INSTRUCTION.iter_unpack(buffer[offset:offset + count * INSTRUCTION.size])
+                          for value in fields]
+
+    def raw(self, ip):
+        base = ip * 4
+        words = self.words
+        return words[base], words[base + 1], words[base + 2], words[base + 3]
+
+    def cursor(self):
+        """(ip, InstructionCursor) for every instruction, always the same cursor.
+
+        Nothing is cached and no Quadruple is built; readers must take what
+        they need from the cursor before advancing. The VM decodes bytecode
+        programs this way.
+        """
+        cursor = InstructionCursor()
+        function_names = self.function_names
+        for ip in range(self.count):
+            cursor.operator, cursor.operand1, cursor.operand2, cursor.result = \
+                decode_fields(*self.raw(ip), function_names)
+            yield ip, cursor
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, ip):
+        if isinstance(ip, slice):
+            return [self[i] for i in range(*ip.indices(self.count))]
+        if ip < 0:
+            ip += self.count
+        if not 0 <= ip < self.count:
+            raise IndexError("instruction index out of range")
+        quad = self.decoded[ip]
+        if quad is None:
+            quad = self.decoded[ip] = decode_instruction(*self.raw(ip), self.function_names)
+        return quad
+
+    def __iter__(self):
+        for ip in range(self.count):
+            yield self[ip]
+
+    def release(self):
+        if isinstance(self.words, memoryview):
+            self.words.release()
+
+
+class BytecodeProgram(CompiledProgram):
+    """CompiledProgram whose instructions are read from a memory-mapped .ptc file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            # Read-only mapping: worker processes loading the same file share its pages
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self.buffer
+
+        if len(buffer) < HEADER.size or buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise Exception(f"{path} is not a Patito bytecode file")
+        (magic, version, flags, count, code_offset, const_offset, const_size,
+         func_offset, func_size, meta_offset, meta_size) = HEADER.unpack_from(buffer, 0)
+        if version != VERSION:
+            buffer.close()
+            raise Exception(f"{path} has bytecode version {version}, expected {VERSION}")
+
+        functions = self._read_functions(buffer, func_offset)
+        name, layout, ranges, main_needs, global_vars = self._read_metadata(buffer, meta_offset)
+        quadruples = InstructionView(buffer, code_offset, count, list(functions))
+        super().__init__(name, quadruples, self._read_constants(buffer, const_offset),
+                         layout, functions, main_needs, global_vars, ranges)
+
+    def _read_constants(self, buffer, offset):
+        constants = {}
+        for record in (INT_CONSTANT, FLOAT_CONSTANT):
+            count, = COUNT.unpack_from(buffer, offset)
+            offset += COUNT.size
+            for address, value in record.iter_unpack(buffer[offset:offset + count * record.size]):
+                constants[address] = value
+            offset += count * record.size
+        count, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            address, size = STRING_CONSTANT.unpack_from(buffer, offset)
+            offset += STRING_CONSTANT.size
+            constants[address] = bytes(buffer[offset:offset + size]).decode('utf-8')
+            offset += size
+        return constants
+
+    def _read_functions(self, buffer, offset):
+        count, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        functions = {}
+        for _ in range(count):
+            name, offset = _unpack_name(buffer, offset)
+            return_type, offset = _unpack_name(buffer, offset)
+            start_quad, return_address, is_pure = FUNCTION.unpack_from(buffer, offset)
+            offset += FUNCTION.size
+            func = FunctionInfo(name, return_type, None)
+            func.start_quad = start_quad if start_quad != NONE else None
+            func.return_address = return_address if return_address != NONE else None
+            func.is_pure = bool(is_pure)
+            func.resource_needs, offset = _unpack_needs(buffer, offset)
+            variables, offset = _unpack_variables(buffer, offset)
+            for var_name, var_type, scope, address in variables:
+                if scope == 'param':
+                    func.add_parameter(var_name, var_type, None, address)
+                else:
+                    func.var_table.add_variable(var_name, var_type, scope, None, address)
+            functions[name] = func
+        return functions
+
+    def _read_metadata(self, buffer, offset):
+        name, offset = _unpack_name(buffer, offset)
+        count, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        layout = {}
+        for _ in range(count):
+            segment, offset = _unpack_name(buffer, offset)
+            type_, offset = _unpack_name(buffer, offset)
+            layout.setdefault(segment, {})[type_], = NEED.unpack_from(buffer, offset)
+            offset += NEED.size
+        count, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        ranges = []
+        for _ in range(count):
+            segment, offset = _unpack_name(buffer, offset)
+            type_, offset = _unpack_name(buffer, offset)
+            ranges.append((segment, type_, *RANGE.unpack_from(buffer, offset)))
+            offset += RANGE.size
+        main_needs, offset = _unpack_needs(buffer, offset)
+        variables, offset = _unpack_variables(buffer, offset)
+        global_vars = VariableTable('global')
+        for var_name, var_type, scope, address in variables:
+            global_vars.add_variable(var_name, var_type, scope, None, address)
+        return name, layout, ranges, main_needs, global_vars
+
+    def close(self):
+        self.quadruples.release()
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_bytecode(path):
+    """Map a file written by write_bytecode() and return it as a BytecodeProgram."""
+    return BytecodeProgram(path)
@@ -0,0 +1,430 @@
+import heapq
+from quadruple_generator import Quadruple, JUMP_TARGET_FIELDS, CALL_OPERATORS, get_reads, get_writes, get_jump_target
+
+
+def find_regions(quads, functions):
+    """(name, start, end) of every function body plus main, in quadruple order."""
+    main_start = 0
+    if quads and quads[0].operator == 'GOTO':
+        main_start = int(quads[0].result)
+
+    starts = {func.start_quad: name for name, func in functions.items()
+              if func.start_quad is not None}
+    boundaries = sorted(set(starts) | {main_start, len(quads)})
+    regions = []
+    for start in sorted(starts):
+        regions.append((starts[start], start, boundaries[boundaries.index(start) + 1]))
+    regions.append(('main', main_start, len(quads)))
+    return regions
+
+
+def set_jump_target(quad, target):
+    field = JUMP_TARGET_FIELDS[quad.operator]
+    # Jump targets filled by the parser are strings, GOSUB keeps ints
+    setattr(quad, field, str(target) if isinstance(getattr(quad, field), str) else target)
+
+
+def successors(quads, i, start, end):
+    """Indices control can reach right after quadruple i, inside quads[start:end]."""
+    quad = quads[i]
+    if quad.operator == 'ENDFUNC':
+        return []
+    # Calls come back to the next quadruple
+    target = get_jump_target(quad) if quad.operator not in CALL_OPERATORS else None
+    if quad.operator == 'GOTO':
+        following = [target]
+    elif target is not None:
+        following = [i + 1, target]
+    else:
+        following = [i + 1]
+    return [k for k in following if k is not None and start <= k < end]
+
+
+class BasicBlock:
+    """Quadruples start..end-1, entered only at start and left only after end - 1."""
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.successors = []
+        self.predecessors = []
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.start}..{self.end - 1})"
+
+
+class Loop:
+    """Natural loop: a header block, the blocks of its body and the blocks that jump back to the header."""
+
+    def __init__(self, header, blocks, back_edges):
+        self.header = header
+        self.blocks = blocks
+        self.back_edges = back_edges
+
+    def quadruples(self, cfg):
+        """Indices of every quadruple in the loop, header included."""
+        indices = set()
+        for index in self.blocks:
+            block = cfg.blocks[index]
+            indices.update(range(block.start, block.end))
+        return indices
+
+    def __repr__(self):
+        return f"Loop(header={self.header.start}, {len(self.blocks)} blocks)"
+
+
+class ControlFlowGraph:
+    """Basic blocks of one function (or main) and the edges between them.
+
+    Blocks start at the region start, at every jump target inside the
+    region and right after every jump or ENDFUNC. Calls do not end a
+    block, control comes back to the next quadruple. entry is the index
+    control comes in through, the region start unless given.
+    """
+
+    def __init__(self, quads, start, end, name=None, entry=None):
+        self.quadruples = quads
+        self.start = start
+        self.end = end
+        self.name = name
+
+        leaders = {start}
+        if entry is not None:
+            leaders.add(entry)
+        for i in range(start, end):
+            quad = quads[i]
+            if quad.operator in CALL_OPERATORS:
+                continue
+            target = get_jump_target(quad)
+            if target is not None and start <= target < end:
+                leaders.add(target)
+            if (target is not None or quad.operator == 'ENDFUNC') and i + 1 < end:
+                leaders.add(i + 1)
+        leaders = sorted(leaders) if start < end else []
+
+        self.blocks = []
+        # Block index of every quadruple, by i - start
+        self.block_of = [0] * (end - start)
+        for index, first in enumerate(leaders):
+            last = leaders[index + 1] if index + 1 < len(leaders) else end
+            self.blocks.append(BasicBlock(index, first, last))
+            self.block_of[first - start:last - start] = [index] * (last - first)
+        for block in self.blocks:
+            for following in successors(quads, block.end - 1, start, end):
+                successor = self.blocks[self.block_of[following - start]]
+                if successor not in block.successors:
+                    block.successors.append(successor)
+                    successor.predecessors.append(block)
+
+        self.entry = self.block_at(entry if entry is not None else start) if self.blocks else None
+        self._order = None
+        self._idom = None
+
+    def block_at(self, i):
+        """Block holding quadruple i."""
+        return self.blocks[self.block_of[i - self.start]]
+
+    def reverse_postorder(self):
+        """Blocks reachable from the entry, each one before its successors except along back edges."""
+        if self._order is None:
+            order = []
+            if self.entry is not None:
+                # Jump targets are walked before the fall through, so a loop body comes
+                # right after its header and before the code that follows the loop
+                visited = {self.entry.index}
+                stack = [(self.entry, reversed(self.entry.successors))]
+                while stack:
+                    block, pending = stack[-1]
+                    for following in pending:
+                        if following.index not in visited:
+                            visited.add(following.index)
+                            stack.append((following, reversed(following.successors)))
+                            break
+                    else:
+                        stack.pop()
+                        order.append(block)
+            order.reverse()
+            self._order = order
+        return self._order
+
+    def reachable(self):
+        """Indices of the blocks control can reach from the entry."""
+        return {block.index for block in self.reverse_postorder()}
+
+    def dominators(self):
+        """Immediate dominator of every block (by index), None for the entry and unreachable blocks.
+
+        Cooper, Harvey and Kennedy's iterative algorithm over the reverse
+        postorder; structured code settles in two or three sweeps.
+        """
+        if self._idom is None:
+            order = self.reverse_postorder()
+            number = {block.index: k for k, block in enumerate(order)}
+            idom = [None] * len(self.blocks)
+            if order:
+                idom[order[0].index] = order[0].index
+            changed = True
+            while changed:
+                changed = False
+                for block in order[1:]:
+                    new = None
+                    for predecessor in block.predecessors:
+                        if idom[predecessor.index] is None:
+                            continue
+                        if new is None:
+                            new = predecessor.index
+                            continue
+                        # Walk both fingers up the tree to the nearest common dominator
+                        a, b = predecessor.index, new
+                        while a != b:
+                            while number[a] > number[b]:
+                                a = idom[a]
+                            while number[b] > number[a]:
+                                b = idom[b]
+                        new = a
+                    if idom[block.index] != new:
+                        idom[block.index] = new
+                        changed = True
+            if order:
+                idom[order[0].index] = None
+            self._idom = idom
+        return self._idom
+
+    def dominates(self, a, b):
+        """Whether every path from the entry to block b goes through block a."""
+        idom = self.dominators()
+        index = b.index
+        while index is not None:
+            if index == a.index:
+                return True
+            index = idom[index]
+        return False
+
+    def natural_loops(self):
+        """Natural loops, one per header, smallest (innermost) first.
+
+        An edge to a block that dominates its source is a back edge; the
+        body is every block that reaches a back edge without going through
+        the header.
+        """
+        reachable = self.reachable()
+        number = {block.index: k for k, block in enumerate(self.reverse_postorder())}
+        tails = {}
+        for block in self.reverse_postorder():
+            for following in block.successors:
+                # Only an edge going back in the order can close a loop
+                if number[following.index] <= number[block.index] and self.dominates(following, block):
+                    tails.setdefault(following.index, []).append(block)
+
+        loops = []
+        for header, back_edges in tails.items():
+            body = {header}
+            pending = [tail.index for tail in back_edges]
+            while pending:
+                index = pending.pop()
+                if index in body or index not in reachable:
+                    continue
+                body.add(index)
+                pending.extend(predecessor.index for predecessor in self.blocks[index].predecessors)
+            loops.append(Loop(self.blocks[header], body, back_edges))
+        loops.sort(key=lambda loop: (len(loop.blocks), loop.header.start))
+        return loops
+
+    def __repr__(self):
+        return f"ControlFlowGraph({self.name}, {len(self.blocks)} blocks)"
+
+
+def build_cfgs(quads, functions):
+    """ControlFlowGraph of every function and main."""
+    return [ControlFlowGraph(quads, start, end, name) for name, start, end in find_regions(quads, functions)]
+
+
+def solve(cfg, transfer, meet, boundary, forward=True):
+    """Generic worklist dataflow solver over the blocks of cfg.
+
+    transfer(block, value) gives the value after the block from the value
+    before it (in the direction of the analysis); meet(values) combines
+    the values flowing into a block and must accept an empty list.
+    boundary flows into the entry (forward) or out of blocks without
+    successors (backward). Blocks are visited in reverse postorder (its
+    reverse for backward problems), then only those whose inputs changed.
+
+    Returns (before, after): the value at the start and at the end of
+    every block, by block index.
+    """
+    order = cfg.reverse_postorder()
+    seen = {block.index for block in order}
+    # Unreachable blocks still get a value, after everything else
+    order = order + [block for block in cfg.blocks if block.index not in seen]
+    if not forward:
+        order.reverse()
+    position = {block.index: k for k, block in enumerate(order)}
+
+    inputs = [None] * len(cfg.blocks)
+    outputs = [None] * len(cfg.blocks)
+    # Always take the earliest block in the order, a loop settles before the code after it is revisited
+    pending = list(range(len(order)))
+    queued = set(pending)
+    while pending:
+        block = order[heapq.heappop(pending)]
+        queued.discard(position[block.index])
+        sources = block.predecessors if forward else block.successors
+        values = [outputs[source.index] for source in sources if outputs[source.index] is not None]
+        if forward and block is cfg.entry or not forward and not block.successors:
+            values.append(boundary)
+        inputs[block.index] = meet(values)
+        value = transfer(block, inputs[block.index])
+        if value != outputs[block.index]:
+            outputs[block.index] = value
+            for following in (block.successors if forward else block.predecessors):
+                if position[following.index] not in queued:
+                    queued.add(position[following.index])
+                    heapq.heappush(pending, position[following.index])
+
+    if forward:
+        return inputs, outputs
+    return outputs, inputs
+
+
+def _union(values):
+    result = set()
+    for value in values:
+        result |= value
+    return result
+
+
+def _bits(values):
+    result = 0
+    for value in values:
+        result |= value
+    return result
+
+
+class ReachingDefinitions:
+    """Definitions reaching the start of every block of a ControlFlowGraph.
+
+    A definition is the index of a quadruple that writes an address. Sets
+    of definitions are kept as int bitsets (bit k is the k-th definition of
+    the graph), so programs with many writes to the same global stay
+    cheap; reaching(block) expands one block on demand.
+    """
+
+    def __init__(self, cfg, quads=None, track=None):
+        quads = quads if quads is not None else cfg.quadruples
+        # Definition number -> (quadruple index, address)
+        self.definitions = []
+        masks = {}
+        generated, killed = [], []
+        for block in cfg.blocks:
+            last = {}
+            for i in range(block.start, block.end):
+                for address in get_writes(quads[i]):
+                    if track is None or track(address):
+                        masks[address] = masks.get(address, 0) | (1 << len(self.definitions))
+                        last[address] = len(self.definitions)
+                        self.definitions.append((i, address))
+            generated.append(_bits(1 << number for number in last.values()))
+            killed.append(last)
+        # Every definition of the addresses a block writes, except its own last ones
+        killed = [_bits(masks[address] for address in last) & ~gen for last, gen in zip(killed, generated)]
+
+        self.before, self.after = solve(cfg, lambda block, value: generated[block.index] | (value & ~killed[block.index]),
+                                        _bits, 0)
+
+    def reaching(self, block):
+        """{address: set of quadruple indices} of the definitions reaching the start of block."""
+        value = self.before[block.index]
+        result = {}
+        while value:
+            low = value & -value
+            i, address = self.definitions[low.bit_length() - 1]
+            result.setdefault(address, set()).add(i)
+            value ^= low
+        return result
+
+
+def reaching_definitions(cfg, quads=None, track=None):
+    """ReachingDefinitions of cfg; track(address) picks the addresses to follow (all by default)."""
+    return ReachingDefinitions(cfg, quads, track)
+
+
+def liveness(cfg, quads=None, track=None):
+    """Addresses live after each quadruple of cfg, as a list of sets by i - cfg.start.
+
+    track(address) picks the addresses to follow (every address by default).
+    Liveness is solved per block and then walked back through each block.
+    """
+    quads = quads if quads is not None else cfg.quadruples
+    reads, writes = [], []
+    for i in range(cfg.start, cfg.end):
+        reads.append({a for a in get_reads(quads[i]) if track is None or track(a)})
+        writes.append({a for a in get_writes(quads[i]) if track is None or track(a)})
+
+    used, defined = [], []
+    for block in cfg.blocks:
+        use, define = set(), set()
+        for k in range(block.start - cfg.start, block.end - cfg.start):
+            use |= reads[k] - define
+            define |= writes[k]
+        used.append(use)
+        defined.append(define)
+
+    live_in, live_out = solve(cfg, lambda block, value: used[block.index] | (value - defined[block.index]),
+                              _union, set(), forward=False)
+
+    result = [None] * (cfg.end - cfg.start)
+    for block in cfg.blocks:
+        live = set(live_out[block.index])
+        for k in reversed(range(block.start - cfg.start, block.end - cfg.start)):
+            result[k] = set(live)
+            live = reads[k] | (live - writes[k])
+    return result
+
+
+def emit(quads, removed=(), insert=None, bypass=None):
+    """Renumbered copy of quads.
+
+    The quadruples at the indices in removed are dropped and insert[k] (a
+    list of quadruples) is placed right before k. Every jump is fixed: a
+    jump to k lands on what was inserted before k, except jumps from the
+    indices in bypass[k], which land on k itself; a jump to a removed
+    quadruple lands on the next one that is kept. Returns (new quadruples,
+    entry) where entry[k] is where a jump to the old index k now lands.
+    """
+    insert = insert or {}
+    bypass = bypass or {}
+    result = []
+    sources = []
+    inserted_at = {}
+    own = [None] * (len(quads) + 1)
+    for k in range(len(quads) + 1):
+        if k in insert:
+            inserted_at[k] = len(result)
+            for quad in insert[k]:
+                result.append(Quadruple(quad.operator, quad.operand1, quad.operand2, quad.result))
+                sources.append(None)
+        if k < len(quads) and k not in removed:
+            own[k] = len(result)
+            quad = quads[k]
+            result.append(Quadruple(quad.operator, quad.operand1, quad.operand2, quad.result))
+            sources.append(k)
+
+    entry = [0] * (len(quads) + 1)
+    inner = [0] * (len(quads) + 1)
+    entry[len(quads)] = inserted_at.get(len(quads), len(result))
+    inner[len(quads)] = len(result)
+    for k in reversed(range(len(quads))):
+        inner[k] = own[k] if own[k] is not None else entry[k + 1]
+        entry[k] = inserted_at.get(k, inner[k])
+
+    for quad, source in zip(result, sources):
+        target = get_jump_target(quad)
+        if target is None:
+            continue
+        skip = source is not None and source in bypass.get(target, ())
+        set_jump_target(quad, inner[target] if skip else entry[target])
+    return result, entry
@@ -0,0 +1,170 @@
+import io
+import os
+import pickle
+import hashlib
+import tempfile
+import contextlib
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules whose code decides what a source compiles to
+COMPILER_FILES = ('lexer.py', 'parser.py', 'semantic_analyzer.py', 'semantic_cube.py', 'quadruple_generator.py',
+                  'memory_manager.py', 'function_directory.py', 'variable_table.py', 'program.py', 'optimizer.py',
+                  'cfg.py')
+
+ENTRY_SUFFIX = '.pkl'
+
+# Options that change what a source compiles to (PatitoParser.compile_options() plus get_program())
+DEFAULT_OPTIONS = {'segment_sizes': None, 'fold_constants': True, 'recycle_temps': True}
+
+_compiler_version = None
+
+
+def compiler_version():
+    """Hash of the compiler sources; editing the compiler invalidates every cached program."""
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256()
+        for name in COMPILER_FILES:
+            with open(os.path.join(SRC_DIR, name), 'rb') as f:
+                digest.update(f.read())
+        _compiler_version = digest.hexdigest()
+    return _compiler_version
+
+
+class CompileCache:
+    """Content-addressed directory of compiled programs.
+
+    Entries are keyed by a hash of the source text, the compiler version
+    and the compile options, and hold the pickled CompiledProgram (quadruples, constants,
+    function directory...). Entries are written to a temporary file and
+    moved into place with os.replace, so workers sharing the directory
+    never read half-written entries. Once the directory grows past
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, options=None):
+        options = dict(DEFAULT_OPTIONS, **(options or {}))
+        digest = hashlib.sha256()
+        digest.update(compiler_version().encode())
+        for name in sorted(options):
+            value = options[name]
+            if isinstance(value, dict):
+                value = sorted(value.items())
+            digest.update(f"{name}={value!r};".encode())
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, source, options=None):
+        """Cached CompiledProgram for source compiled with options, or None."""
+        path = self._path(self.key(source, options))
+        try:
+            with open(path, 'rb') as f:
+                program = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Unreadable entry, drop it and compile again
+            self._remove(path)
+            self.misses += 1
+            return None
+        # The modification time is the LRU clock
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        self.hits += 1
+        return program
+
+    def put(self, source, program, options=None):
+        path = self._path(self.key(source, options))
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(program, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        self.stores += 1
+        self.evict()
+
+    def compile(self, source, parser=None, recycle_temps=True):
+        """CompiledProgram for source, running the parser only on a miss.
+
+        The parser's options are part of the key, so parsers configured
+        differently never share entries.
+        """
+        if parser is None:
+            from parser import PatitoParser
+            parser = PatitoParser()
+        options = dict(parser.compile_options(), recycle_temps=recycle_temps)
+        program = self.get(source, options)
+        if program is not None:
+            return program
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parse(source)
+        program = parser.get_program(recycle_temps=recycle_temps)
+        self.put(source, program, options)
+        return program
+
+    def entries(self):
+        """(mtime, size, path) of every entry, oldest first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by another worker meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            total -= size
+
+    def clear(self):
+        for mtime, size, path in self.entries():
+            self._remove(path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+        }
+
+    def __repr__(self):
+        return f"CompileCache({self.directory}, {self.hits} hits, {self.misses} misses)"
@@ -25,6 +25,8 @@ class FunctionInfo:
         self.start_quad = None
         self.return_address = None
         self.resource_needs = {}
+        # Set by find_pure_functions() once the quadruples exist
+        self.is_pure = False
 
     def add_parameter(self, name, param_type, line, address=None):
         if any(p.name == name for p in self.params):
@@ -0,0 +1,242 @@
+import io
+import contextlib
+import operator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from memory_manager import ADDRESS_RANGES
+from quadruple_generator import FUSED_BRANCHES
+from virtual_machine import VirtualMachine
+
+ARRAY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '>': operator.gt,
+    '<': operator.lt,
+    '!=': operator.ne,
+}
+
+BRANCH_OPERATORS = {fused: ARRAY_OPERATORS[comparison] for comparison, fused in FUSED_BRANCHES.items()}
+
+# Quadruples that need a call stack; programs using them run lane by lane
+CALL_OPERATORS = ('ERA', 'PARAM', 'GOSUB', 'CALL_AND_STORE', 'ENDFUNC')
+
+DTYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool'}
+
+# int64 wraps around here, the VM's Python ints keep growing
+INT64_LIMIT = 2.0 ** 63
+
+
+class LaneOverflow(Exception):
+    """An int lane left the int64 range; the lanes are run again on scalar VMs."""
+
+
+class LaneResults:
+    """Final globals and output of every lane run by run_lanes()."""
+
+    def __init__(self, globals_, outputs, vectorized):
+        # Global name -> array with one final value per lane
+        self.globals = globals_
+        # Everything each lane printed
+        self.outputs = outputs
+        # False when the program fell back to one scalar VM per lane
+        self.vectorized = vectorized
+
+    def __repr__(self):
+        mode = 'vectorized' if self.vectorized else 'scalar'
+        return f"LaneResults({len(self.outputs)} lanes, {mode})"
+
+
+def _address_type(address, address_ranges=ADDRESS_RANGES):
+    for segment, type_, first, limit in address_ranges:
+        if first <= address < limit:
+            return type_
+    return None
+
+
+def _lane_inputs(program, inputs):
+    """Address -> array of starting values, and the number of lanes."""
+    if program.global_vars is None:
+        raise ValueError("The program has no global variable table")
+    lanes = None
+    starting = {}
+    for name, values in inputs.items():
+        var_info = program.global_vars.lookup(name)
+        if var_info is None:
+            raise ValueError(f"Unknown global variable '{name}'")
+        values = np.asarray(values, dtype=DTYPES[var_info.var_type])
+        if lanes is not None and len(values) != lanes:
+            raise ValueError(f"Global '{name}' has {len(values)} lanes, expected {lanes}")
+        lanes = len(values)
+        starting[var_info.address] = values
+    if lanes is None:
+        raise ValueError("run_lanes() needs at least one input array")
+    return starting, lanes
+
+
+def run_lanes(program, inputs, vectorize=True, engine='dispatch'):
+    """Run a CompiledProgram once per lane, each lane starting from its own globals.
+
+    inputs maps global names (looked up in the program's global_vars) to
+    arrays of equal length, one element per lane. The quadruples run once
+    over NumPy arrays: arithmetic and comparisons become array operations
+    and diverging branches are handled with lane masks. Programs that call
+    functions run on a scalar VirtualMachine per lane instead, and so do
+    programs whose int lanes overflow int64; their results then come back
+    as object arrays of Python ints.
+    """
+    if np is None:
+        raise ImportError("run_lanes() requires numpy")
+    if engine not in ('loop', 'dispatch'):
+        raise ValueError("The scalar fallback runs on the 'loop' or 'dispatch' engine")
+    starting, lanes = _lane_inputs(program, inputs)
+
+    vectorized = vectorize and not any(quad.operator in CALL_OPERATORS for quad in program.quadruples)
+    if vectorized:
+        try:
+            memory, outputs = _run_vectorized(program, starting, lanes)
+        except LaneOverflow:
+            vectorized = False
+    if not vectorized:
+        memory, outputs = _run_scalar(program, starting, lanes, engine)
+
+    globals_ = {}
+    for var_info in program.global_vars.get_all_variables():
+        values = memory.get(var_info.address)
+        if values is None:
+            values = np.zeros(lanes, dtype=DTYPES[var_info.var_type])
+        globals_[var_info.name] = values
+    return LaneResults(globals_, outputs, vectorized)
+
+
+def _run_vectorized(program, starting, lanes):
+    """Execute the quadruples over arrays, always advancing the lanes with the lowest pc.
+
+    Lanes that took different branches wait at their own pc; running the
+    minimum first lets the lanes of a loop finish before the ones already
+    past it continue, so they meet again at the join point.
+    """
+    quads = program.quadruples
+    constants = program.constants
+    ranges = program.get_address_ranges()
+    memory = {address: values.copy() for address, values in starting.items()}
+    outputs = [[] for _ in range(lanes)]
+    end = len(quads)
+    pc = np.zeros(lanes, dtype='int64')
+
+    def read(address, mask):
+        address = int(address)
+        if address in constants:
+            return constants[address]
+        values = memory.get(address)
+        if values is None:
+            raise Exception(f"Address {address} read before being written")
+        return values[mask]
+
+    def write(address, mask, value):
+        address = int(address)
+        values = memory.get(address)
+        if values is None:
+            values = memory[address] = np.zeros(lanes, dtype=DTYPES[_address_type(address, ranges)])
+        dtype = np.result_type(values.dtype, value)
+        if dtype != values.dtype and dtype.kind in 'if':
+            # The VM keeps whatever Python value is assigned, e.g. a quotient in an int
+            values = memory[address] = values.astype(dtype)
+        values[mask] = value
+
+    def check_range(op, left, right):
+        # Exact in float64: a result reaching 2**63 never rounds below it
+        if op in ('+', '-', '*') and np.result_type(left, right).kind == 'i':
+            approx = ARRAY_OPERATORS[op](np.asarray(left, dtype='float64'), np.asarray(right, dtype='float64'))
+            if np.any(np.abs(approx) >= INT64_LIMIT):
+                raise LaneOverflow()
+
+    def emit(mask, value, ending):
+        lane_values = np.broadcast_to(value, (int(mask.sum()),))
+        for lane, item in zip(np.flatnonzero(mask), lane_values):
+            outputs[lane].append(f"{item}{ending}")
+
+    while True:
+        running = pc < end
+        if not running.any():
+            break
+        ip = int(pc[running].min())
+        mask = pc == ip
+        quad = quads[ip]
+        op = quad.operator
+        nxt = ip + 1
+
+        try:
+            if op in ARRAY_OPERATORS and not (op == '-' and quad.operand2 is None):
+                left, right = read(quad.operand1, mask), read(quad.operand2, mask)
+                if op == '/' and np.any(np.asarray(right) == 0):
+                    raise ZeroDivisionError("division by zero")
+                check_range(op, left, right)
+                write(quad.result, mask, ARRAY_OPERATORS[op](left, right))
+                pc[mask] = nxt
+            elif op in ('-', 'unary-'):
+                value = read(quad.operand1, mask)
+                check_range('-', 0, value)
+                write(quad.result, mask, -value)
+                pc[mask] = nxt
+            elif op == '=':
+                write(quad.result, mask, read(quad.operand1, mask))
+                pc[mask] = nxt
+            elif op == 'PRINT':
+                emit(mask, read(quad.operand1, mask), "\n")
+                pc[mask] = nxt
+            elif op == 'PRINT_ITEM':
+                emit(mask, read(quad.operand1, mask), " ")
+                pc[mask] = nxt
+            elif op == 'GOTO':
+                pc[mask] = int(quad.result)
+            elif op == 'GOTOF':
+                condition = np.broadcast_to(read(quad.operand1, mask), (int(mask.sum()),))
+                pc[mask] = np.where(condition.astype(bool), nxt, int(quad.result))
+            elif op in BRANCH_OPERATORS:
+                condition = BRANCH_OPERATORS[op](read(quad.operand1, mask), read(quad.operand2, mask))
+                condition = np.broadcast_to(condition, (int(mask.sum()),))
+                pc[mask] = np.where(condition, nxt, int(quad.result))
+            else:
+                raise Exception(f"Unknown operator: {op}")
+        except LaneOverflow:
+            raise
+        except Exception as e:
+            raise Exception(f"Error at quadruple {ip}: {quad}: {e}") from e
+
+    return memory, [''.join(parts) for parts in outputs]
+
+
+def _run_scalar(program, starting, lanes, engine):
+    """One VirtualMachine run per lane."""
+    addresses = [var_info.address for var_info in program.global_vars.get_all_variables()]
+    memory = {address: [] for address in addresses}
+    outputs = []
+    for lane in range(lanes):
+        output = io.StringIO()
+        vm = VirtualMachine(engine=engine, output=output)
+        vm.load_program(program)
+        vm.prepare_memory()
+        for address, values in starting.items():
+            vm.set_value(address, values[lane].item())
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.execute()
+        for address in addresses:
+            value = vm.get_value(address)
+            memory[address].append(0 if value is None else value)
+        outputs.append(output.getvalue())
+
+    ranges = program.get_address_ranges()
+    arrays = {}
+    for address, values in memory.items():
+        try:
+            arrays[address] = np.asarray(values, dtype=DTYPES[_address_type(address, ranges)])
+        except OverflowError:
+            # Python ints past int64
+            arrays[address] = np.asarray(values, dtype=object)
+    return arrays, outputs
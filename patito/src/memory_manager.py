@@ -1,11 +1,160 @@
+import sys
+
+# Segments in address order, with the types each one holds
+SEGMENT_TYPES = [
+    ('global', ('int', 'float')),
+    ('local', ('int', 'float')),
+    ('temp', ('int', 'float', 'bool')),
+    ('const', ('int', 'float', 'string')),
+]
+
+# Slots of every (segment, type) in the default layout
+DEFAULT_SEGMENT_SIZES = {
+    ('global', 'int'): 1000,
+    ('global', 'float'): 1000,
+    ('local', 'int'): 1000,
+    ('local', 'float'): 1000,
+    ('temp', 'int'): 1000,
+    ('temp', 'float'): 900,
+    ('temp', 'bool'): 100,
+    ('const', 'int'): 1000,
+    ('const', 'float'): 1000,
+    ('const', 'string'): 1000,
+}
+
+# Addresses below this one are never valid
+FIRST_ADDRESS = 1000
+
+
+def build_address_ranges(segment_sizes=None):
+    """(segment, type, first address, limit) of every range, laid out back to back.
+
+    segment_sizes maps (segment, type) to its number of slots; missing
+    entries keep their default size.
+    """
+    sizes = dict(DEFAULT_SEGMENT_SIZES)
+    sizes.update(segment_sizes or {})
+    ranges = []
+    address = FIRST_ADDRESS
+    for segment, types in SEGMENT_TYPES:
+        for type_ in types:
+            ranges.append((segment, type_, address, address + sizes[(segment, type_)]))
+            address += sizes[(segment, type_)]
+    return ranges
+
+
+# Address ranges per segment and type: (segment, type, first address, limit)
+ADDRESS_RANGES = build_address_ranges()
+
+
+def const_ranges(address_ranges):
+    """(type, first address, limit) of every constant range, in slot order."""
+    return [(type_, first, limit) for segment, type_, first, limit in address_ranges if segment == 'const']
+
+
+class ConstantPool:
+    """Constants of a program, each value stored once.
+
+    Every (type, value) pair gets one address from its type's range. The
+    index also keys on the Python type of the value, so the int 1 and the
+    float 1.0 never share a slot even though they compare equal. String
+    values are interned.
+    """
+
+    def __init__(self, address_ranges=ADDRESS_RANGES, strict=True):
+        self.address_ranges = address_ranges
+        self.strict = strict
+        self.overflowed = False
+        # Address -> value, what CompiledProgram.constants holds
+        self.memory = {}
+        # (type, python type, value) -> address
+        self.index = {}
+        self.ranges = {type_: (first, limit) for type_, first, limit in const_ranges(address_ranges)}
+        self.counts = {type_: 0 for type_ in self.ranges}
+
+    def add(self, type_, value):
+        """Address of the constant, allocating it the first time it is seen."""
+        if type_ not in self.ranges:
+            return None
+        key = (type_, type(value), value)
+        address = self.index.get(key)
+        if address is not None:
+            return address
+
+        first, limit = self.ranges[type_]
+        if first + self.counts[type_] >= limit:
+            if self.strict:
+                raise Exception(f"Error: Constant segment overflow, more than {limit - first} {type_} constants")
+            self.overflowed = True
+        if type_ == 'string':
+            value = sys.intern(value)
+        address = first + self.counts[type_]
+        self.counts[type_] += 1
+        self.index[key] = address
+        self.memory[address] = value
+        return address
+
+    def get_type(self, address):
+        for type_, (first, limit) in self.ranges.items():
+            if first <= address < limit:
+                return type_
+        return None
+
+    def export(self):
+        """Values in the order of the VM's constant segment."""
+        return export_constants(self.memory, self.counts, self.address_ranges)
+
+    def clear(self):
+        self.memory.clear()
+        self.index.clear()
+        self.counts = {type_: 0 for type_ in self.ranges}
+        self.overflowed = False
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __repr__(self):
+        counts = ', '.join(f"{type_}={count}" for type_, count in self.counts.items())
+        return f"ConstantPool({counts})"
+
+
+def export_constants(constants, counts, address_ranges=ADDRESS_RANGES):
+    """Pack an address -> value table into one list laid out like the VM's constant segment.
+
+    counts gives the slots of each type (memory_layout['const']); the int
+    slots come first, then the floats and the strings, each one at its
+    offset from the start of its range.
+    """
+    base = []
+    size = 0
+    for type_, first, limit in const_ranges(address_ranges):
+        count = counts.get(type_, 0)
+        base.append((first, limit, first + count, size))
+        size += count
+
+    values = [None] * size
+    for address, value in constants.items():
+        address = int(address)
+        for first, limit, end, offset in base:
+            if first <= address < limit:
+                if address >= end:
+                    raise Exception(f"Segmentation Fault: constant {address} is outside the memory layout")
+                values[offset + address - first] = value
+                break
+    return values
+
+
 class MemoryManager:
-    def __init__(self):
-        # Memory ranges
-        self.GLOBAL_BASE = 1000
-        self.LOCAL_BASE = 3000
-        self.TEMP_BASE = 5000
-        self.CONST_BASE = 7000
-        
+    def __init__(self, segment_sizes=None, strict=True):
+        # Memory ranges, see build_address_ranges()
+        self.address_ranges = build_address_ranges(segment_sizes)
+        self.ranges = {(segment, type_): (first, limit) for segment, type_, first, limit in self.address_ranges}
+
+        # Running out of slots is an error, unless strict is off: then it is
+        # only recorded so the program can be compiled again with bigger segments
+        self.strict = strict
+        self.overflowed = False
+
         # Counters for each segment and type
         # Global
         self.global_int = 0
@@ -21,84 +170,81 @@ class MemoryManager:
         self.temp_bool = 0 
         
         # Constants (persistent)
-        self.const_int = 0
-        self.const_float = 0
-        self.const_string = 0
-        
+        self.constant_pool = ConstantPool(self.address_ranges, strict)
+
         # Constant Memory Map (Address -> Value)
-        self.constant_memory = {}
-        
-        # Limits (optional, for safety)
-        self.SEGMENT_SIZE = 1000
+        self.constant_memory = self.constant_pool.memory
+
+        # Largest local/temporal usage seen in any function
+        self.max_local_usage = {}
+
+    def _address(self, segment, type_, count):
+        first, limit = self.ranges[(segment, type_)]
+        if first + count >= limit:
+            if self.strict:
+                raise Exception(f"Error: Segment overflow, more than {limit - first} {segment} {type_} slots "
+                                f"(enlarge segment_sizes[('{segment}', '{type_}')])")
+            self.overflowed = True
+        return first + count
 
     def get_global_address(self, type_):
         if type_ == 'int':
-            addr = self.GLOBAL_BASE + self.global_int
+            addr = self._address('global', 'int', self.global_int)
             self.global_int += 1
             return addr
         elif type_ == 'float':
-            addr = self.GLOBAL_BASE + 1000 + self.global_float
+            addr = self._address('global', 'float', self.global_float)
             self.global_float += 1
             return addr
         return None
 
     def get_local_address(self, type_):
         if type_ == 'int':
-            addr = self.LOCAL_BASE + self.local_int
+            addr = self._address('local', 'int', self.local_int)
             self.local_int += 1
             return addr
         elif type_ == 'float':
-            addr = self.LOCAL_BASE + 1000 + self.local_float
+            addr = self._address('local', 'float', self.local_float)
             self.local_float += 1
             return addr
         return None
 
     def get_temp_address(self, type_):
         if type_ == 'int':
-            addr = self.TEMP_BASE + self.temp_int
+            addr = self._address('temp', 'int', self.temp_int)
             self.temp_int += 1
             return addr
         elif type_ == 'float':
-            addr = self.TEMP_BASE + 1000 + self.temp_float
+            addr = self._address('temp', 'float', self.temp_float)
             self.temp_float += 1
             return addr
         elif type_ == 'bool':
-             addr = self.TEMP_BASE + 1900 + self.temp_bool
-             self.temp_bool += 1
-             return addr
+            addr = self._address('temp', 'bool', self.temp_bool)
+            self.temp_bool += 1
+            return addr
         return None
 
     def get_const_address(self, type_, value):
-        for addr, val in self.constant_memory.items():
-            if val == value and self._get_type_from_addr(addr) == type_:
-                return addr
-
-        if type_ == 'int':
-            addr = self.CONST_BASE + self.const_int
-            self.const_int += 1
-        elif type_ == 'float':
-            addr = self.CONST_BASE + 1000 + self.const_float
-            self.const_float += 1
-        elif type_ == 'string':
-            addr = self.CONST_BASE + 2000 + self.const_string
-            self.const_string += 1
-        else:
-            return None
-            
-        self.constant_memory[addr] = value
-        return addr
+        return self.constant_pool.add(type_, value)
 
     def _get_type_from_addr(self, addr):
-        if 7000 <= addr < 8000: return 'int'
-        if 8000 <= addr < 9000: return 'float'
-        if 9000 <= addr < 10000: return 'string'
-        return None
+        return self.constant_pool.get_type(addr)
+
+    def has_overflowed(self):
+        return self.overflowed or self.constant_pool.overflowed
+
+    def get_required_sizes(self):
+        """Slots every (segment, type) needs, whether or not they fit the current ranges."""
+        layout = self.get_memory_layout()
+        return {(segment, type_): count for segment, sizes in layout.items() for type_, count in sizes.items()}
 
     def get_constants(self):
         return self.constant_memory
 
     def reset_local_memory(self):
         """Resets local and temporal counters for a new function."""
+        for key, count in self.get_memory_usage().items():
+            self.max_local_usage[key] = max(self.max_local_usage.get(key, 0), count)
         self.local_int = 0
         self.local_float = 0
         self.temp_int = 0
@@ -114,3 +260,15 @@ class MemoryManager:
             'temp_float': self.temp_float,
             'temp_bool': self.temp_bool
         }
+
+    def get_memory_layout(self):
+        """Returns how many slots of each type every segment needs."""
+        usage = self.get_memory_usage()
+        for key, count in self.max_local_usage.items():
+            usage[key] = max(usage[key], count)
+        return {
+            'global': {'int': self.global_int, 'float': self.global_float},
+            'local': {'int': usage['local_int'], 'float': usage['local_float']},
+            'temp': {'int': usage['temp_int'], 'float': usage['temp_float'], 'bool': usage['temp_bool']},
+            'const': dict(self.constant_pool.counts),
+        }
@@ -0,0 +1,712 @@
+import copy
+from memory_manager import ADDRESS_RANGES
+from program import CompiledProgram
+from quadruple_generator import (Quadruple, FUSED_BRANCHES, CALL_OPERATORS, PRINT_OPERATORS,
+                                 read_fields, write_fields, get_reads, get_writes, get_jump_target)
+from cfg import ControlFlowGraph, find_regions, set_jump_target, liveness, emit
+
+
+def copy_program(program, quadruples):
+    """New CompiledProgram with its own quadruples and FunctionInfo copies."""
+    functions = {name: copy.copy(func) for name, func in program.functions.items()}
+    for func in functions.values():
+        func.resource_needs = dict(func.resource_needs)
+    layout = {segment: dict(sizes) for segment, sizes in program.memory_layout.items()}
+    return CompiledProgram(program.name, quadruples, program.constants, layout,
+                           functions, dict(program.main_resource_needs), program.global_vars,
+                           program.address_ranges)
+
+
+def function_regions(program):
+    """(name, start, end) of every function body plus main, in quadruple order."""
+    return find_regions(program.quadruples, program.functions)
+
+
+def jump_targets(quadruples):
+    """Set of indices some quadruple jumps or calls into."""
+    targets = set()
+    for quad in quadruples:
+        target = get_jump_target(quad)
+        if target is not None:
+            targets.add(target)
+    return targets
+
+
+def renumber(program, quadruples, removed):
+    """Drop the quadruples at the indices in removed and fix every jump.
+
+    A jump to a removed quadruple lands on the next one that is kept.
+    GOTO/GOTOF/GOSUB targets and FunctionInfo.start_quad are all updated.
+    Returns the new CompiledProgram.
+    """
+    result, entry = emit(quadruples, removed)
+    new_program = copy_program(program, result)
+    for func in new_program.functions.values():
+        if func.start_quad is not None:
+            func.start_quad = entry[func.start_quad]
+    return new_program
+
+
+def _temp_type(address, address_ranges=ADDRESS_RANGES):
+    for segment, type_, first, limit in address_ranges:
+        if segment == 'temp' and first <= address < limit:
+            return type_, first
+    return None, None
+
+
+def _address_type(address, address_ranges=ADDRESS_RANGES):
+    for segment, type_, first, limit in address_ranges:
+        if first <= address < limit:
+            return type_
+    return None
+
+
+def count_temps(program):
+    """Temporals used by each function (and main)."""
+    counts = {}
+    ranges = program.get_address_ranges()
+    for name, start, end in function_regions(program):
+        temps = set()
+        for quad in program.quadruples[start:end]:
+            for address in get_reads(quad) + get_writes(quad):
+                if _temp_type(address, ranges)[0] is not None:
+                    temps.add(address)
+        counts[name] = len(temps)
+    return counts
+
+
+def compact_temps(program):
+    """Renumber the temporals of every function densely from the segment base.
+
+    Temporals that disappeared from the code leave holes; closing them makes
+    every frame exactly as large as what its code uses. resource_needs and
+    the memory layout are updated to match.
+    """
+    quads = [Quadruple(q.operator, q.operand1, q.operand2, q.result) for q in program.quadruples]
+    new_program = copy_program(program, quads)
+    ranges = program.get_address_ranges()
+
+    for name, start, end in function_regions(new_program):
+        used = {}
+        for quad in quads[start:end]:
+            for address in get_reads(quad) + get_writes(quad):
+                type_, first = _temp_type(address, ranges)
+                if type_ is not None:
+                    used.setdefault(type_, set()).add(address)
+
+        mapping = {}
+        for type_, addresses in used.items():
+            first = _temp_type(min(addresses), ranges)[1]
+            for k, address in enumerate(sorted(addresses)):
+                mapping[address] = first + k
+
+        for quad in quads[start:end]:
+            for field in set(read_fields(quad) + write_fields(quad)):
+                address = int(getattr(quad, field))
+                if address in mapping:
+                    setattr(quad, field, mapping[address])
+
+        needs = new_program.main_resource_needs if name == 'main' \
+            else new_program.functions[name].resource_needs
+        for type_ in ('int', 'float', 'bool'):
+            needs[f'temp_{type_}'] = len(used.get(type_, ()))
+
+    all_needs = [func.resource_needs for func in new_program.functions.values()]
+    all_needs.append(new_program.main_resource_needs)
+    for type_ in ('int', 'float', 'bool'):
+        new_program.memory_layout['temp'][type_] = max(needs.get(f'temp_{type_}', 0) for needs in all_needs)
+    return new_program
+
+
+def temp_liveness(program, start, end):
+    """Temporals live after each quadruple of quads[start:end], as a list of sets."""
+    ranges = program.get_address_ranges()
+    cfg = ControlFlowGraph(program.quadruples, start, end)
+    return liveness(cfg, track=lambda address: _temp_type(address, ranges)[0] is not None)
+
+
+def recycle_temps(program):
+    """Reuse temporal slots once their value is dead.
+
+    A liveness pass over each function finds which temporals are alive
+    together; temporals that never are share a slot (greedy coloring of
+    the interference graph, one per type). Returns (new program, stats)
+    with each function's temporal count before and after.
+    """
+    quads = [Quadruple(q.operator, q.operand1, q.operand2, q.result) for q in program.quadruples]
+    new_program = copy_program(program, quads)
+    ranges = program.get_address_ranges()
+
+    for name, start, end in function_regions(program):
+        live_out = temp_liveness(program, start, end)
+        order = []
+        interference = {}
+        for k, quad in enumerate(quads[start:end]):
+            for address in get_reads(quad) + get_writes(quad):
+                if _temp_type(address, ranges)[0] is not None and address not in interference:
+                    order.append(address)
+                    interference[address] = set()
+            for written in get_writes(quad):
+                if written not in interference:
+                    continue
+                # A temporal written here must not land on one that is still needed
+                for alive in live_out[k]:
+                    if alive != written:
+                        interference[written].add(alive)
+                        interference[alive].add(written)
+
+        mapping = {}
+        slots = {}
+        for address in order:
+            type_, first = _temp_type(address, ranges)
+            taken = {slots[other] for other in interference[address]
+                     if other in slots and _temp_type(other, ranges)[0] == type_}
+            slot = 0
+            while slot in taken:
+                slot += 1
+            slots[address] = slot
+            mapping[address] = first + slot
+
+        for quad in quads[start:end]:
+            for field in set(read_fields(quad) + write_fields(quad)):
+                address = int(getattr(quad, field))
+                if address in mapping:
+                    setattr(quad, field, mapping[address])
+
+    # Slots are already dense, compact_temps() brings resource_needs and the layout up to date
+    new_program = compact_temps(new_program)
+    stats = {'temps_before': count_temps(program), 'temps_after': count_temps(new_program)}
+    return new_program, stats
+
+
+def _thread_jump(quads, target, start, end):
+    """Final destination of a jump to target once GOTO chains inside the region are followed."""
+    seen = set()
+    while start <= target < end and quads[target].operator == 'GOTO' and target not in seen:
+        seen.add(target)
+        target = get_jump_target(quads[target])
+    return target
+
+
+def _reachable(quads, entry, start, end):
+    """Indices of quads[start:end] that control can reach from entry."""
+    cfg = ControlFlowGraph(quads, start, end, entry=entry)
+    reached = set()
+    for block in cfg.reverse_postorder():
+        reached.update(range(block.start, block.end))
+    return reached
+
+
+def eliminate_dead_code(program):
+    """Thread jumps to their final destination and drop the quadruples they leave behind.
+
+    - A jump to a GOTO goes straight to where the chain of GOTOs ends,
+      and a GOTO to an ENDFUNC becomes the ENDFUNC itself.
+    - Quadruples no path from the entry of their function (or main)
+      reaches are removed: the ENDFUNC after a return, the GOTO over the
+      else of an if whose branches both return...
+    - A jump to the quadruple right after it does nothing and is removed.
+
+    Every jump and FunctionInfo.start_quad is renumbered. Returns
+    (new program, stats) with the number of quadruples removed.
+    """
+    quads = [Quadruple(q.operator, q.operand1, q.operand2, q.result) for q in program.quadruples]
+    regions = function_regions(program)
+    stats = {'jumps_threaded': 0, 'jumps_to_return': 0}
+
+    for name, start, end in regions:
+        # Jumps in code that is about to be removed are left alone
+        for i in sorted(_reachable(quads, start, start, end)):
+            quad = quads[i]
+            if quad.operator in CALL_OPERATORS:
+                continue
+            target = get_jump_target(quad)
+            if target is None:
+                continue
+            final = _thread_jump(quads, target, start, end)
+            if quad.operator == 'GOTO' and start <= final < end and quads[final].operator == 'ENDFUNC':
+                quads[i] = Quadruple('ENDFUNC', None, None, None)
+                stats['jumps_to_return'] += 1
+            elif final != target:
+                set_jump_target(quad, final)
+                stats['jumps_threaded'] += 1
+
+    removed = set()
+    for name, start, end in regions:
+        entry = start
+        if name == 'main' and quads and quads[0].operator == 'GOTO':
+            entry = _thread_jump(quads, start, start, end)
+        reached = _reachable(quads, entry, start, end)
+        if start in reached:
+            # Something still jumps to the old start of main, it has to stay where main begins
+            entry = start
+        elif entry != start:
+            set_jump_target(quads[0], entry)
+            stats['jumps_threaded'] += 1
+        removed.update(i for i in range(start, end) if i not in reached)
+    stats['unreachable'] = len(removed)
+
+    # Sweep backwards so landing[k] (first kept index >= k) is known for every later k
+    landing = [0] * (len(quads) + 1)
+    landing[len(quads)] = len(quads)
+    stats['jumps_to_next'] = 0
+    for i in reversed(range(len(quads))):
+        quad = quads[i]
+        target = get_jump_target(quad)
+        if i > 0 and i not in removed and quad.operator not in CALL_OPERATORS and target is not None \
+                and target > i and landing[target] == landing[i + 1]:
+            removed.add(i)
+            stats['jumps_to_next'] += 1
+        landing[i] = landing[i + 1] if i in removed else i
+
+    new_program = compact_temps(renumber(program, quads, removed))
+    stats['removed'] = len(removed)
+    stats['quadruples_before'] = len(program.quadruples)
+    stats['quadruples_after'] = len(new_program.quadruples)
+    return new_program, stats
+
+
+class _BlockFacts:
+    """Values known inside a basic block, each dropped once an address it depends on is written."""
+
+    def __init__(self):
+        self.values = {}
+        self.depends = {}
+
+    def add(self, key, value, addresses):
+        self.values[key] = value
+        for address in addresses:
+            self.depends.setdefault(address, set()).add(key)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def kill(self, addresses):
+        for address in addresses:
+            for key in self.depends.pop(address, ()):
+                self.values.pop(key, None)
+
+    def kill_globals(self, ranges):
+        # The callee of a call may write any global, temporals and locals belong to this frame
+        self.kill([address for address in self.depends if _segment(address, ranges) == 'global'])
+
+
+def _propagate_block(quads, first, end, ranges, return_slots):
+    """Rewrite reads of temporals copied with '=' inside one block to the copied address."""
+    copies = _BlockFacts()
+    rewritten = 0
+    for i in range(first, end):
+        quad = quads[i]
+        for field in read_fields(quad):
+            address = int(getattr(quad, field))
+            source = copies.get(address)
+            if source is not None:
+                setattr(quad, field, source)
+                rewritten += 1
+        copies.kill(get_writes(quad))
+        if quad.operator in CALL_OPERATORS:
+            copies.kill_globals(ranges)
+        if quad.operator == '=':
+            source, target = int(quad.operand1), int(quad.result)
+            if source != target and source not in return_slots and _temp_type(target, ranges)[0] is not None \
+                    and _address_type(source, ranges) == _address_type(target, ranges):
+                copies.add(target, source, (target, source))
+    return rewritten
+
+
+def _coalesce_block(quads, first, end, live_out, offset, ranges, return_slots, removed):
+    """Write temporals that are only moved to a variable straight into the variable."""
+    coalesced = 0
+    last_write = {}
+    for j in range(first, end):
+        quad = quads[j]
+        if quad.operator == '=' and int(quad.operand1) in last_write:
+            temp, target = int(quad.operand1), int(quad.result)
+            i = last_write[temp]
+            if temp not in live_out[j - offset] and _address_type(temp, ranges) == _address_type(target, ranges) \
+                    and all(temp not in get_reads(quads[k]) and target not in get_reads(quads[k])
+                            and target not in get_writes(quads[k]) and quads[k].operator not in CALL_OPERATORS
+                            for k in range(i + 1, j) if k not in removed):
+                quads[i].result = quad.result
+                removed.add(j)
+                coalesced += 1
+                del last_write[temp]
+                continue
+        for address in get_writes(quad):
+            last_write.pop(address, None)
+            if _temp_type(address, ranges)[0] is not None and write_fields(quad) == ['result']:
+                last_write[address] = j
+    return coalesced
+
+
+def propagate_copies(program):
+    """Copy propagation and removal of the moves it leaves dead.
+
+    - Inside a basic block, reads of a temporal copied with '=' from an
+      address of the same type read the address instead, until either of
+      them is written (a call counts as writing every global).
+    - A temporal computed only to be moved into a variable ('+' into t,
+      then '=' t into x, t dead afterwards) is computed straight into x.
+    - '=' into a temporal that is dead afterwards is removed.
+
+    res = fact(x) goes from GOSUB, '=' slot t, '=' t res to GOSUB, '=' slot
+    res; return a + b goes from '+' a b t, '=' t slot to '+' a b slot.
+    Return slots are only read right after their call (the Python backend
+    turns that pair into an assignment from the call), so reads of them
+    are never propagated. Returns (new program, stats).
+    """
+    quads = [Quadruple(q.operator, q.operand1, q.operand2, q.result) for q in program.quadruples]
+    new_program = copy_program(program, quads)
+    ranges = program.get_address_ranges()
+    regions = function_regions(program)
+    return_slots = {func.return_address for func in program.functions.values()
+                    if func.return_address is not None}
+    stats = {'rewritten': 0, 'coalesced': 0, 'dead_moves': 0}
+
+    removed = set()
+    for name, start, end in regions:
+        blocks = ControlFlowGraph(quads, start, end, name).blocks
+        for block in blocks:
+            stats['rewritten'] += _propagate_block(quads, block.start, block.end, ranges, return_slots)
+        live_out = temp_liveness(new_program, start, end)
+        for block in blocks:
+            stats['coalesced'] += _coalesce_block(quads, block.start, block.end, live_out, start, ranges,
+                                                  return_slots, removed)
+
+    new_program = renumber(program, quads, removed)
+    stats['removed'] = len(removed)
+    # Dropping a dead move can leave the move that fed it dead as well
+    while True:
+        dead = set()
+        quads = new_program.quadruples
+        for name, start, end in function_regions(new_program):
+            live_out = temp_liveness(new_program, start, end)
+            for i in range(start, end):
+                quad = quads[i]
+                if quad.operator == '=' and _temp_type(int(quad.result), ranges)[0] is not None \
+                        and int(quad.result) not in live_out[i - start]:
+                    dead.add(i)
+        if not dead:
+            break
+        stats['dead_moves'] += len(dead)
+        stats['removed'] += len(dead)
+        new_program = renumber(new_program, quads, dead)
+
+    new_program = compact_temps(new_program)
+    stats['quadruples_before'] = len(program.quadruples)
+    stats['quadruples_after'] = len(new_program.quadruples)
+    return new_program, stats
+
+
+# Quadruples whose result depends only on their operands
+VALUE_OPERATORS = ('+', '-', '*', '/', '<', '>', '!=', 'unary-')
+COMMUTATIVE_OPERATORS = ('+', '*', '!=')
+
+
+def _number_block(quads, first, end, ranges):
+    """Turn arithmetic already computed earlier in the block into a move of the earlier result."""
+    available = _BlockFacts()
+    # Temporal -> address it holds a copy of, so t = a * b; u = t + c matches a later a * b + c
+    copies = _BlockFacts()
+    eliminated = 0
+    for i in range(first, end):
+        quad = quads[i]
+        key = None
+        if quad.operator in VALUE_OPERATORS:
+            operands = tuple(copies.get(int(a), int(a)) if a is not None else None
+                             for a in (quad.operand1, quad.operand2))
+            if quad.operator in COMMUTATIVE_OPERATORS:
+                operands = tuple(sorted(operands))
+            key = (quad.operator,) + operands
+            holder = available.get(key)
+            if holder is not None and _address_type(holder, ranges) == _address_type(int(quad.result), ranges):
+                quads[i] = Quadruple('=', holder, None, quad.result)
+                eliminated += 1
+                key = None
+
+        written = get_writes(quads[i])
+        available.kill(written)
+        copies.kill(written)
+        if quad.operator in CALL_OPERATORS:
+            available.kill_globals(ranges)
+            copies.kill_globals(ranges)
+
+        result = quads[i]
+        if result.operator == '=':
+            source, target = int(result.operand1), int(result.result)
+            source = copies.get(source, source)
+            if source != target and _temp_type(target, ranges)[0] is not None \
+                    and _address_type(source, ranges) == _address_type(target, ranges):
+                copies.add(target, source, (target, source))
+        elif key is not None and not any(address in written for address in key[1:]):
+            holder = int(quad.result)
+            available.add(key, holder, [address for address in key[1:] if address is not None] + [holder])
+    return eliminated
+
+
+def eliminate_subexpressions(program):
+    """Local common subexpression elimination.
+
+    Value numbering over each basic block: an arithmetic or comparison
+    quadruple with the same operator and operand addresses as one earlier
+    in the block (operands swapped for '+', '*' and '!=') becomes a move of
+    the earlier result, as long as no operand nor that result was written
+    in between (a call counts as writing every global). propagate_copies()
+    then folds the moves away. Returns (new program, stats).
+    """
+    quads = [Quadruple(q.operator, q.operand1, q.operand2, q.result) for q in program.quadruples]
+    ranges = program.get_address_ranges()
+    eliminated = 0
+    for name, start, end in function_regions(program):
+        for block in ControlFlowGraph(quads, start, end, name).blocks:
+            eliminated += _number_block(quads, block.start, block.end, ranges)
+
+    new_program, copy_stats = propagate_copies(copy_program(program, quads))
+    stats = {'eliminated': eliminated, 'removed': copy_stats['removed'],
+             'quadruples_before': len(program.quadruples),
+             'quadruples_after': len(new_program.quadruples)}
+    return new_program, stats
+
+
+def function_global_writes(program):
+    """Globals each function may write, counting the functions it calls."""
+    quads = program.quadruples
+    ranges = program.get_address_ranges()
+    starts = {func.start_quad: name for name, func in program.functions.items()
+              if func.start_quad is not None}
+    writes, callees = {}, {}
+    for name, start, end in function_regions(program):
+        writes[name] = set()
+        callees[name] = set()
+        for quad in quads[start:end]:
+            writes[name].update(address for address in get_writes(quad) if _segment(address, ranges) == 'global')
+            if quad.operator in CALL_OPERATORS and int(quad.operand1) in starts:
+                callees[name].add(starts[int(quad.operand1)])
+
+    changed = True
+    while changed:
+        changed = False
+        for name in writes:
+            for callee in callees[name]:
+                if not writes[callee] <= writes[name]:
+                    writes[name] |= writes[callee]
+                    changed = True
+    return writes
+
+
+def _hoist(program, hoists):
+    """Move quadruples out of loops, hoists holds (header, loop body, indices to move).
+
+    The moved quadruples become a preheader right before the header. Jumps
+    to the header from outside the loop (and calls, and main's GOTO) enter
+    through the preheader, jumps from inside the loop skip it.
+    """
+    quads = program.quadruples
+    removed, insert, bypass = set(), {}, {}
+    for header, body, hoisted in hoists:
+        removed |= hoisted
+        insert[header] = [quads[k] for k in sorted(hoisted)]
+        bypass[header] = {k for k in body if quads[k].operator not in CALL_OPERATORS}
+    result, entry = emit(quads, removed, insert, bypass)
+    new_program = copy_program(program, result)
+    for func in new_program.functions.values():
+        if func.start_quad is not None:
+            func.start_quad = entry[func.start_quad]
+    return new_program
+
+
+def _invariant_quadruples(program, cfg, live_out, loop, body, written, ranges):
+    """Indices of the arithmetic in a loop that computes the same value on every iteration."""
+    quads = program.quadruples
+    # Temporals still holding a value when the loop goes around again
+    carried = set()
+    for tail in loop.back_edges:
+        carried |= live_out[tail.end - 1 - cfg.start]
+    definitions = {}
+    for k in body:
+        for address in get_writes(quads[k]):
+            definitions[address] = definitions.get(address, 0) + 1
+
+    invariant = set()
+    invariant_temps = set()
+    changed = True
+    while changed:
+        changed = False
+        for k in sorted(body):
+            quad = quads[k]
+            # '/' can fail on a divisor the loop would never have reached
+            if k in invariant or quad.operator not in VALUE_OPERATORS or quad.operator == '/':
+                continue
+            result = int(quad.result)
+            if _temp_type(result, ranges)[0] is None or definitions[result] != 1 or result in carried:
+                continue
+            if all(address not in written or address in invariant_temps for address in get_reads(quad)):
+                invariant.add(k)
+                invariant_temps.add(result)
+                changed = True
+    return invariant
+
+
+def hoist_invariants(program):
+    """Loop-invariant code motion for while loops.
+
+    Loops are the natural loops of each function's ControlFlowGraph, closed
+    by the back-edge GOTO of every while. Everything the loop writes is
+    collected, counting the globals written by the functions it calls
+    (function_global_writes()); arithmetic and comparisons into a
+    temporal written once in the loop, not alive around the back edge, and
+    whose operands are not written by the loop (or are such temporals) is
+    moved to a preheader in front of the header. The condition is part of
+    the loop, so 'i < limit * 2' computes limit * 2 once. '/' stays put,
+    it could fail on a path the loop never takes.
+
+    Like eliminate_subexpressions(), this wants the program before
+    recycle_temps(). Returns (new program, stats).
+    """
+    ranges = program.get_address_ranges()
+    global_writes = function_global_writes(program)
+    starts = {func.start_quad: name for name, func in program.functions.items()
+              if func.start_quad is not None}
+    stats = {'loops': 0, 'hoisted': 0}
+
+    is_temp = lambda address: _temp_type(address, ranges)[0] is not None
+    while True:
+        # Every loop that does not overlap one already taken is done in the same pass,
+        # inner loops first: the outer one gets its turn once their preheaders exist
+        quads = program.quadruples
+        hoists = []
+        taken = set()
+        for name, start, end in function_regions(program):
+            cfg = ControlFlowGraph(quads, start, end, name)
+            loops = cfg.natural_loops()
+            if not loops:
+                continue
+            live_out = liveness(cfg, track=is_temp)
+            for loop in loops:
+                body = loop.quadruples(cfg)
+                if not body.isdisjoint(taken):
+                    continue
+                written = set()
+                for k in body:
+                    written.update(get_writes(quads[k]))
+                    if quads[k].operator in CALL_OPERATORS:
+                        written |= global_writes.get(starts.get(int(quads[k].operand1)), set())
+                hoisted = _invariant_quadruples(program, cfg, live_out, loop, body, written, ranges)
+                if hoisted:
+                    hoists.append((loop.header.start, body, hoisted))
+                    taken |= body
+        if not hoists:
+            break
+        program = _hoist(program, hoists)
+        stats['hoisted'] += sum(len(hoisted) for header, body, hoisted in hoists)
+        stats['loops'] += len(hoists)
+
+    stats['quadruples'] = len(program.quadruples)
+    return program, stats
+
+
+def fuse_superinstructions(program):
+    """Rewrite fixed quadruple pairs into single fused instructions.
+
+    - '<', '>' or '!=' into a temporal immediately tested by GOTOF becomes
+      GOTO_IF_NOT_LT / GOTO_IF_NOT_GT / GOTO_IF_NOT_NE a b target.
+    - GOSUB followed by '=' from the callee's return slot becomes
+      CALL_AND_STORE start return_slot destination.
+
+    Returns (new program, stats). Each fusion removes one dispatch per
+    execution of the pair, and the comparison temporals disappear.
+    """
+    quads = program.quadruples
+    ranges = program.get_address_ranges()
+    targets = jump_targets(quads)
+    return_slots = {func.start_quad: func.return_address for func in program.functions.values()}
+
+    fused = list(quads)
+    removed = set()
+    stats = {'compare_branch': 0, 'call_store': 0}
+    for name, start, end in function_regions(program):
+        # Recycled temporals are read again later, the comparison only goes away if it is dead after the GOTOF
+        live_out = temp_liveness(program, start, end)
+
+        i = start
+        while i < end - 1:
+            quad, following = quads[i], quads[i + 1]
+            if i + 1 in targets:
+                i += 1
+                continue
+
+            if quad.operator in FUSED_BRANCHES and following.operator == 'GOTOF' \
+                    and following.operand1 == quad.result and int(quad.result) not in live_out[i + 1 - start] \
+                    and _temp_type(int(quad.result), ranges)[0] is not None:
+                fused[i] = Quadruple(FUSED_BRANCHES[quad.operator], quad.operand1, quad.operand2, following.result)
+                removed.add(i + 1)
+                stats['compare_branch'] += 1
+                i += 2
+                continue
+
+            if quad.operator == 'GOSUB' and following.operator == '=':
+                slot = return_slots.get(int(quad.operand1))
+                if slot is not None and int(following.operand1) == slot:
+                    fused[i] = Quadruple('CALL_AND_STORE', quad.operand1, slot, following.result)
+                    removed.add(i + 1)
+                    stats['call_store'] += 1
+                    i += 2
+                    continue
+            i += 1
+
+    temps_before = count_temps(program)
+    new_program = compact_temps(renumber(program, fused, removed))
+    stats['dispatches_removed'] = len(removed)
+    stats['quadruples_before'] = len(quads)
+    stats['quadruples_after'] = len(new_program.quadruples)
+    stats['temps_before'] = temps_before
+    stats['temps_after'] = count_temps(new_program)
+    return new_program, stats
+
+
+def _segment(address, address_ranges=ADDRESS_RANGES):
+    for segment, type_, first, limit in address_ranges:
+        if first <= address < limit:
+            return segment
+    return None
+
+
+def find_pure_functions(program):
+    """Names of the functions whose result depends only on their arguments.
+
+    A pure function returns a value, never PRINTs, reads no global except
+    the return slot of a pure function it calls, writes no global except
+    its own return slot and calls only pure functions. Recursive calls are
+    fine, so the set is found by discarding impure candidates until it
+    stops changing.
+    """
+    quads = program.quadruples
+    ranges = program.get_address_ranges()
+    regions = {name: (start, end) for name, start, end in function_regions(program) if name != 'main'}
+    starts = {func.start_quad: name for name, func in program.functions.items()
+              if func.start_quad is not None}
+
+    pure = {name for name in regions if program.functions[name].return_address is not None}
+    changed = True
+    while changed:
+        changed = False
+        return_slots = {program.functions[name].return_address for name in pure}
+        for name in sorted(pure):
+            start, end = regions[name]
+            own_slot = program.functions[name].return_address
+            for quad in quads[start:end]:
+                if quad.operator in PRINT_OPERATORS:
+                    break
+                if quad.operator in CALL_OPERATORS and starts.get(int(quad.operand1)) not in pure:
+                    break
+                if any(_segment(address, ranges) == 'global' and address not in return_slots
+                       for address in get_reads(quad)):
+                    break
+                if any(_segment(address, ranges) == 'global' and address != own_slot
+                       for address in get_writes(quad)):
+                    break
+            else:
+                continue
+            pure.discard(name)
+            changed = True
+    return pure
@@ -0,0 +1,57 @@
+import sys
+
+FLUSH_POLICIES = ('size', 'line', 'end')
+
+
+class OutputBuffer:
+    """Collects what a program prints and writes it to a sink in batches.
+
+    The sink is any object with write() (a file, io.StringIO...). When it
+    is None, sys.stdout is looked up at flush time. Flush policies:
+        'size' - once buffer_size characters are waiting, and at the end
+        'line' - after every complete line
+        'end'  - only at the end of the program or on flush()
+    """
+
+    def __init__(self, sink=None, flush_policy='size', buffer_size=8192):
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{flush_policy}', expected one of {FLUSH_POLICIES}")
+        self.sink = sink
+        self.flush_policy = flush_policy
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.size = 0
+        self.flushes = 0
+
+    def write_item(self, value):
+        """Item of a print statement that is followed by more items."""
+        text = f"{value} "
+        self.parts.append(text)
+        self.size += len(text)
+
+    def write_line(self, value):
+        """Last item of a print statement, ends the line."""
+        text = f"{value}\n"
+        self.parts.append(text)
+        self.size += len(text)
+        if self.flush_policy == 'line' or (self.flush_policy == 'size' and self.size >= self.buffer_size):
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        sink = self.sink if self.sink is not None else sys.stdout
+        sink.write(''.join(self.parts))
+        self.parts.clear()
+        self.size = 0
+        self.flushes += 1
+
+    def getvalue(self):
+        """Everything written to a capturing sink such as io.StringIO."""
+        self.flush()
+        sink = self.sink if self.sink is not None else sys.stdout
+        getvalue = getattr(sink, 'getvalue', None)
+        return getvalue() if getvalue is not None else None
+
+    def __repr__(self):
+        return f"OutputBuffer({self.flush_policy}, {self.size} chars pending)"
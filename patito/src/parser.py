@@ -2,18 +2,53 @@ import ply.yacc as yacc
 from lexer import PatitoLexer
 from semantic_analyzer import SemanticAnalyzer
 from quadruple_generator import QuadrupleGenerator
-
+from program import CompiledProgram
+from optimizer import find_pure_functions, recycle_temps as recycle_program_temps
+from tables import PARSETAB, LEXTAB, check_tables
+from memory_manager import DEFAULT_SEGMENT_SIZES
+
+# Operaciones que se pueden calcular al compilar cuando ambos operandos son constantes
+CONSTANT_OPERATIONS = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '/': lambda left, right: left / right,
+    '>': lambda left, right: left > right,
+    '<': lambda left, right: left < right,
+    '!=': lambda left, right: left != right,
+}
 
 
 class PatitoParser:
-    def __init__(self):
+    def __init__(self, optimize=False, segment_sizes=None, fold_constants=True):
+        '''
+        Las tablas del parser y del lexer se generan de antemano (python src/tables.py)
+        y se cargan en modo solo lectura. Con optimize=True no se validan las reglas
+        de PLY, pero las tablas deben coincidir con la gramatica.
+
+        segment_sizes fija los espacios de cada (segmento, tipo) y pasarse es un error
+        de compilacion. Sin segment_sizes los segmentos crecen segun lo que el programa
+        necesita.
+
+        Con fold_constants las operaciones entre constantes se calculan al compilar y
+        los if/while con condicion constante no generan GOTOF.
+        '''
+        self.segment_sizes = segment_sizes
+        self.fold_constants = fold_constants
         # Constuir el lexer
         self.lexer = PatitoLexer()
-        self.lexer.build()
         self.tokens = self.lexer.tokens
 
+        if optimize:
+            problems = check_tables(self, self.lexer)
+            if problems:
+                raise Exception(f"Parse tables out of date ({'; '.join(problems)}), run python src/tables.py")
+        self.lexer.build(optimize=optimize, lextab=LEXTAB)
+
         # Construir el parser, debug=True para ver la tabla de producciones
-        self.parser = yacc.yacc(module=self, debug=False)
+        # Si las tablas no coinciden se reconstruyen en memoria, nunca se escriben
+        self.parser = yacc.yacc(module=self, debug=False, tabmodule=PARSETAB,
+                                write_tables=False, optimize=optimize)
 
         # Declarar arreglo de errores
         self.errors = []
@@ -36,6 +71,8 @@ class PatitoParser:
     def p_programa(self, p):
         '''programa : PROGRAM ID SEMICOLON program_start vars funcs MAIN LPAREN RPAREN main_start body END'''
         self.semantic.set_program_name(p[2], p.lineno(2))
+        # Guardamos lo que necesita el registro de activacion de main
+        self.semantic.end_program()
         # Declaramos el nombre del programa
         p[0] = ('program', p[2])
 
@@ -48,6 +85,8 @@ class PatitoParser:
         '''main_start :'''
         # Regresa al cuadruplo del inicio para rellenar el salto porque ya sabemos donde empieza el programa
         self.quad_gen.fill_quad(self.main_jump, self.quad_gen.get_next_address())
+        # Main empieza con sus propios locales y temporales
+        self.semantic.start_main()
 
     def p_vars(self, p):
         '''vars : VAR var_decl_list
@@ -226,8 +265,8 @@ class PatitoParser:
         condition_type = self.type_stack.pop()
         # Resultado de la condicion
         result = self.operand_stack.pop()
-        # Generamos el cuadruplo de GOTOF
-        quad_idx = self.quad_gen.generate('GOTOF', result, None, None)
+        # Generamos el cuadruplo de GOTOF (nada si la condicion es constante)
+        quad_idx = self._generate_false_jump(result)
         # Guardamos nuestra semillita de salto porque aun no sabemos a donde tenemos que saltar
         self.jump_stack.append(quad_idx)
 
@@ -235,6 +274,10 @@ class PatitoParser:
         '''if_end :'''
         # Sacamos el valor de nuestro jump stack
         end = self.jump_stack.pop()
+        # Condicion constante: si el cuerpo nunca corre lo quitamos
+        if isinstance(end, tuple):
+            self._drop_dead_body(end)
+            return
         # Regresamos a rellenar el GOTOF con el siguiente address
         self.quad_gen.fill_quad(end, self.quad_gen.get_next_address())
 
@@ -242,6 +285,11 @@ class PatitoParser:
         '''else_start :'''
         # Sacamos el valor de nuestro jump stack
         false_jump = self.jump_stack.pop()
+        # Condicion constante: solo una de las dos ramas se queda y no hace falta el GOTO
+        if isinstance(false_jump, tuple):
+            self._drop_dead_body(false_jump)
+            self.jump_stack.append((not false_jump[0], self.quad_gen.get_next_address()))
+            return
         # Generamos el cuadruplo de GOTO
         goto_idx = self.quad_gen.generate('GOTO', None, None, None)
         # Guardamos nuestra semilla para rellenar el GOTO
@@ -265,8 +313,8 @@ class PatitoParser:
         condition_type = self.type_stack.pop()
         # Resultado de la condicion
         result = self.operand_stack.pop()
-        # Generamos cuadruplo de GOTOF
-        quad_idx = self.quad_gen.generate('GOTOF', result, None, None)
+        # Generamos cuadruplo de GOTOF (nada si la condicion es constante)
+        quad_idx = self._generate_false_jump(result)
         # Guardamos nuestra semilla en la pila de saltos para poder regresar
         self.jump_stack.append(quad_idx)
 
@@ -276,10 +324,15 @@ class PatitoParser:
         false_jump = self.jump_stack.pop()
         # Sacamos el start address de la pila de saltos
         start_addr = self.jump_stack.pop()
+        # Condicion constante falsa: el ciclo nunca corre y lo quitamos completo
+        if isinstance(false_jump, tuple) and not false_jump[0]:
+            self._drop_dead_body((False, start_addr))
+            return
         # Generamos el cuadruplo de goto para regresar al while
         self.quad_gen.generate('GOTO', None, None, start_addr)
         # Rellenamos el GOTOF con el siguiente address para saber que pasa si no se cumple la condicion
-        self.quad_gen.fill_quad(false_jump, self.quad_gen.get_next_address())
+        if not isinstance(false_jump, tuple):
+            self.quad_gen.fill_quad(false_jump, self.quad_gen.get_next_address())
 
     def p_print(self, p):
         '''print : PRINT LPAREN print_list RPAREN SEMICOLON'''
@@ -294,11 +347,13 @@ class PatitoParser:
             operands.insert(0, self.operand_stack.pop())
 
         operand_idx = 0
-        for item in print_items:
+        for index, item in enumerate(print_items):
+            # Solo el ultimo item termina la linea, los demas van separados por espacio
+            operator = 'PRINT' if index == len(print_items) - 1 else 'PRINT_ITEM'
             if isinstance(item, tuple) and item[0] == 'string_literal':
-                self.quad_gen.generate('PRINT', item[1], None, None)
+                self.quad_gen.generate(operator, item[1], None, None)
             else:
-                self.quad_gen.generate('PRINT', operands[operand_idx], None, None)
+                self.quad_gen.generate(operator, operands[operand_idx], None, None)
                 operand_idx += 1
 
         p[0] = ('print', p[3])
@@ -331,6 +386,64 @@ class PatitoParser:
         # Si el token es del tipo esperado entonces es verdadero
         return token_type == expected_type
 
+    def _fold_constants(self, operator, left_operand, right_operand, result_type):
+        '''
+        Direccion de la constante con el resultado de la operacion, o None si hay que
+        generar el cuadruplo. El valor es el mismo que calcularia la maquina virtual.
+        '''
+        if not self.fold_constants:
+            return None
+        constants = self.semantic.get_constants()
+        if left_operand not in constants or (right_operand is not None and right_operand not in constants):
+            return None
+        left = constants[left_operand]
+
+        if operator == 'unary-':
+            return self.semantic.get_const_address(result_type, -left)
+
+        right = constants[right_operand]
+        if operator in ('>', '<', '!='):
+            # La VM guarda un bool que el pool de constantes no tiene, solo lo usan if/while
+            return None
+        if operator == '/' and (right == 0 or result_type != 'float'):
+            # La division entre cero truena en ejecucion y int / int da un float en un temporal int
+            return None
+        return self.semantic.get_const_address(result_type, CONSTANT_OPERATIONS[operator](left, right))
+
+    def _constant_condition(self, result):
+        '''Valor de una condicion que se conoce al compilar, o None'''
+        if not self.fold_constants:
+            return None
+        constants = self.semantic.get_constants()
+        if result in constants:
+            return bool(constants[result])
+
+        # Comparacion entre constantes: quitamos su cuadruplo y usamos el valor
+        last = self.quad_gen.get_quadruple(self.quad_gen.size() - 1)
+        if last is None or last.result != result or last.operator not in ('>', '<', '!='):
+            return None
+        if last.operand1 not in constants or last.operand2 not in constants:
+            return None
+        self.quad_gen.truncate(self.quad_gen.size() - 1)
+        return bool(CONSTANT_OPERATIONS[last.operator](constants[last.operand1], constants[last.operand2]))
+
+    def _generate_false_jump(self, result):
+        '''
+        GOTOF de un if/while. Si la condicion es constante no se genera nada y se
+        regresa (se cumple, inicio del cuerpo) para quitar el cuerpo si nunca corre.
+        '''
+        condition = self._constant_condition(result)
+        if condition is None:
+            return self.quad_gen.generate('GOTOF', result, None, None)
+        return (condition, self.quad_gen.get_next_address())
+
+    def _drop_dead_body(self, constant_jump):
+        '''Quita los cuadruplos generados desde el inicio del cuerpo si la condicion nunca se cumple'''
+        runs, start = constant_jump
+        if not runs:
+            # Nadie salta dentro del cuerpo desde fuera, se puede cortar completo
+            self.quad_gen.truncate(start)
+
 # 4 lowest priority
     def p_expression(self, p):
         '''expression : exp
@@ -359,10 +472,13 @@ class PatitoParser:
             self.type_stack.pop()
             self.type_stack.pop()
 
-            # Direccion temporal para el resultado de la operacion
-            temp = self.semantic.get_temp_address(result_type)
-            # Generamos el cuadruplo de la operacion
-            self.quad_gen.generate(operator, left_operand, right_operand, temp)
+            # Si ambos operandos son constantes el resultado se calcula al compilar
+            temp = self._fold_constants(operator, left_operand, right_operand, result_type)
+            if temp is None:
+                # Direccion temporal para el resultado de la operacion
+                temp = self.semantic.get_temp_address(result_type)
+                # Generamos el cuadruplo de la operacion
+                self.quad_gen.generate(operator, left_operand, right_operand, temp)
             # Agregamos el resultado de la operacion a la pila de operands
             self.operand_stack.append(temp)
             # Agregamos el tipo de resultado a la pila de tipos
@@ -397,10 +513,13 @@ class PatitoParser:
             # Sacamos los tipos de la pila de tipos
             self.type_stack.pop()
 
-            # Direccion temporal para el resultado de la operacion
-            temp = self.semantic.get_temp_address(result_type)
-            # Generamos el cuadruplo de la operacion
-            self.quad_gen.generate(operator, left_operand, right_operand, temp)
+            # Si ambos operandos son constantes el resultado se calcula al compilar
+            temp = self._fold_constants(operator, left_operand, right_operand, result_type)
+            if temp is None:
+                # Direccion temporal para el resultado de la operacion
+                temp = self.semantic.get_temp_address(result_type)
+                # Generamos el cuadruplo de la operacion
+                self.quad_gen.generate(operator, left_operand, right_operand, temp)
             # Agregamos el resultado a la pila de oerands
             self.operand_stack.append(temp)
             # Agregamos el tipo de resultado a la pila de tipos
@@ -436,10 +555,13 @@ class PatitoParser:
             # Sacamos los tipos de la pila de tipos
             self.type_stack.pop()
 
-            # Direccion temporal para el resultado de la operacion
-            temp = self.semantic.get_temp_address(result_type)
-            # Generamos el cuadruplo de la operacion
-            self.quad_gen.generate(operator, left_operand, right_operand, temp)
+            # Si ambos operandos son constantes el resultado se calcula al compilar
+            temp = self._fold_constants(operator, left_operand, right_operand, result_type)
+            if temp is None:
+                # Direccion temporal para el resultado de la operacion
+                temp = self.semantic.get_temp_address(result_type)
+                # Generamos el cuadruplo de la operacion
+                self.quad_gen.generate(operator, left_operand, right_operand, temp)
             # Agregamos el resultado de la operacion a la pila de operands
             self.operand_stack.append(temp)
             # Agregamos el tipo de resultado a la pila de tipos
@@ -475,10 +597,13 @@ class PatitoParser:
                 operand = self.operand_stack.pop()
                 # tipo
                 self.type_stack.pop()
-                # Direccion temporal para el resultado de la operacion
-                temp = self.semantic.get_temp_address(factor_type)
-                # Generamos cuadruplo de unary- porque es un factor negativo como -5
-                self.quad_gen.generate('unary-', operand, None, temp)
+                # Si el operando es constante lo negamos al compilar
+                temp = self._fold_constants('unary-', operand, None, factor_type)
+                if temp is None:
+                    # Direccion temporal para el resultado de la operacion
+                    temp = self.semantic.get_temp_address(factor_type)
+                    # Generamos cuadruplo de unary- porque es un factor negativo como -5
+                    self.quad_gen.generate('unary-', operand, None, temp)
                 # Agregamos el resultado de la operacion a la pila de operands
                 self.operand_stack.append(temp)
                 # Agregamos el tipo de resultado a la pila de tipos
@@ -649,6 +774,25 @@ class PatitoParser:
             raise Exception(error_msg)
 
     def parse(self, data):
+        if self.segment_sizes is not None:
+            self.semantic.segment_sizes, self.semantic.strict = self.segment_sizes, True
+            return self._parse(data)
+
+        # Primero con los segmentos por defecto, anotando si alguno se desborda
+        self.semantic.segment_sizes, self.semantic.strict = None, False
+        result = self._parse(data)
+        memory_manager = self.semantic.memory_manager
+        if not memory_manager.has_overflowed():
+            return result
+
+        # Compilamos otra vez con los segmentos del tamaño que hace falta
+        required = memory_manager.get_required_sizes()
+        self.semantic.segment_sizes = {key: max(size, required.get(key, 0))
+                                       for key, size in DEFAULT_SEGMENT_SIZES.items()}
+        self.semantic.strict = True
+        return self._parse(data)
+
+    def _parse(self, data):
         # Limpiamos lista de errores
         self.errors = []
         # Reset semantica
@@ -668,6 +812,10 @@ class PatitoParser:
         except Exception as e:
             raise
 
+    def compile_options(self):
+        '''Opciones que cambian el programa que se genera (la cache de compilacion las usa en su llave)'''
+        return {'segment_sizes': self.segment_sizes, 'fold_constants': self.fold_constants}
+
     def print_semantic_info(self):
         # Imprimimos la informacion semantica
         self.semantic.print_semantic_info()
@@ -682,6 +830,36 @@ class PatitoParser:
         # Obtenemos la lista de cuadruplos generados
         return self.quad_gen.get_quadruples()
 
+    def get_program(self, recycle_temps=True):
+        '''
+        Empaqueta los cuadruplos con las constantes y la informacion de las funciones.
+
+        Con recycle_temps se reusan los temporales cuyo valor ya no se lee (ver
+        optimizer.recycle_temps); los temporales de cada funcion antes y despues
+        quedan en self.temp_stats.
+        '''
+        # Empaquetamos todo lo que la maquina virtual necesita para correr
+        memory_manager = self.semantic.memory_manager
+        functions = {func.name: func for func in self.semantic.function_directory.get_all_functions()}
+        program = CompiledProgram(
+            self.semantic.program_name,
+            self.quad_gen.get_quadruples(),
+            memory_manager.get_constants(),
+            memory_manager.get_memory_layout(),
+            functions,
+            self.semantic.main_resource_needs,
+            self.semantic.global_vars,
+            memory_manager.address_ranges,
+        )
+        # Marcamos las funciones puras para que la VM pueda memoizarlas
+        for name in find_pure_functions(program):
+            functions[name].is_pure = True
+        # Reusamos los temporales que ya no estan vivos, los registros de activacion se encogen
+        self.temp_stats = None
+        if recycle_temps:
+            program, self.temp_stats = recycle_program_temps(program)
+        return program
+
 
 def build_parser():
     # Devolvemos el objeto PatitoParser
@@ -0,0 +1,10 @@
+# patito_lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('COLON', 'COMMA', 'CTE_FLOAT', 'CTE_INT', 'CTE_STRING', 'DIV', 'DO', 'ELSE', 'END', 'EQ', 'FLOAT', 'GT', 'ID', 'IF', 'INT', 'LBRACE', 'LBRACKET', 'LPAREN', 'LT', 'MAIN', 'MINUS', 'MULT', 'NEQ', 'PLUS', 'PRINT', 'PROGRAM', 'RBRACE', 'RBRACKET', 'RETURN', 'RPAREN', 'SEMICOLON', 'VAR', 'VOID', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_CTE_STRING>"(?:\\\\.|[^"\\\\])*")|(?P<t_CTE_FLOAT>[+-]?\\d+\\.\\d+)|(?P<t_CTE_INT>[+-]?\\d+)|(?P<t_ID>[A-Za-z][A-Za-z0-9_]*)|(?P<t_COMMENT_LINE>//[^\\n]*)|(?P<t_COMMENT_BLOCK>/\\*([^*]|\\*+[^*/])*\\*+/)|(?P<t_newline>\\n+)|(?P<t_LBRACE>\\{)|(?P<t_LBRACKET>\\[)|(?P<t_LPAREN>\\()|(?P<t_MULT>\\*)|(?P<t_NEQ>!=)|(?P<t_PLUS>\\+)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_DIV>/)|(?P<t_EQ>=)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)|(?P<t_SEMICOLON>;)', [None, ('t_CTE_STRING', 'CTE_STRING'), ('t_CTE_FLOAT', 'CTE_FLOAT'), ('t_CTE_INT', 'CTE_INT'), ('t_ID', 'ID'), ('t_COMMENT_LINE', 'COMMENT_LINE'), ('t_COMMENT_BLOCK', 'COMMENT_BLOCK'), None, ('t_newline', 'newline'), (None, 'LBRACE'), (None, 'LBRACKET'), (None, 'LPAREN'), (None, 'MULT'), (None, 'NEQ'), (None, 'PLUS'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'COLON'), (None, 'COMMA'), (None, 'DIV'), (None, 'EQ'), (None, 'GT'), (None, 'LT'), (None, 'MINUS'), (None, 'SEMICOLON')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
@@ -0,0 +1,100 @@
+
+# patito_parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'COLON COMMA CTE_FLOAT CTE_INT CTE_STRING DIV DO ELSE END EQ FLOAT GT ID IF INT LBRACE LBRACKET LPAREN LT MAIN MINUS MULT NEQ PLUS PRINT PROGRAM RBRACE RBRACKET RETURN RPAREN SEMICOLON VAR VOID WHILEprograma : PROGRAM ID SEMICOLON program_start vars funcs MAIN LPAREN RPAREN main_start body ENDprogram_start :main_start :vars : VAR var_decl_list\n                | emptyvar_decl_list : var_decl var_decl_list\n                         | var_declvar_decl : id_list COLON type SEMICOLONid_list : ID COMMA id_list\n                   | IDtype : INT\n                | FLOATfuncs : func funcs\n                 | emptyfunc_start : VOID ID LPAREN\n                      | type ID LPARENfunc : func_start params RPAREN LBRACE vars func_code_start body RBRACE SEMICOLONfunc_code_start :params : param_list\n                  | emptyparam_list : ID COLON type COMMA param_list\n                      | ID COLON typebody : LBRACE statement_list RBRACEstatement_list : statement statement_list\n                          | emptystatement : assign\n                     | condition\n                     | cycle\n                     | f_call SEMICOLON\n                     | print\n                     | return_stmtreturn_stmt : RETURN expression SEMICOLONassign : ID EQ expression SEMICOLONcondition : IF LPAREN expression RPAREN if_test body if_end\n                     | IF LPAREN expression RPAREN if_test body ELSE else_start body if_endif_test :if_end :else_start :cycle : WHILE while_start LPAREN expression RPAREN while_test DO body while_endwhile_start :while_test :while_end :print : PRINT LPAREN print_list RPAREN SEMICOLONprint_list : print_item COMMA print_list\n                      | print_itemprint_item : expression\n                      | CTE_STRINGexpression : exp\n                      | exp GT exp\n                      | exp LT exp\n                      | exp NEQ expexp : termino\n               | exp PLUS termino\n               | exp MINUS terminotermino : factor\n                   | termino MULT factor\n                   | termino DIV factorfactor : LPAREN expression RPAREN\n                  | PLUS factor\n                  | MINUS factor\n                  | f_call\n                  | cte\n                  | IDcte : CTE_INT\n               | CTE_FLOATf_call : ID LPAREN expression_list RPAREN\n                  | ID LPAREN RPARENexpression_list : expression COMMA expression_list\n                           | expressionempty :'
+    
+_lr_action_items = {'PROGRAM':([0,],[2,]),'$end':([1,50,],[0,-1,]),'ID':([2,7,12,13,14,15,16,18,31,35,36,42,45,47,52,54,55,56,58,59,64,66,68,69,70,71,73,77,78,80,92,97,98,99,100,101,102,103,104,109,111,115,127,129,131,135,136,137,138,],[3,20,26,27,28,-11,-12,20,20,-15,-16,-8,26,60,60,-26,-27,-28,-30,-31,83,-23,-29,83,83,83,83,83,83,83,83,-32,83,83,83,83,83,83,83,-33,83,83,-43,-37,-34,-42,-37,-39,-35,]),'SEMICOLON':([3,15,16,37,57,74,75,76,79,81,82,83,84,85,86,87,89,105,106,110,114,116,117,118,119,120,121,122,123,],[4,-11,-12,42,68,97,-48,-52,-55,-61,-62,-63,-64,-65,108,109,-67,-59,-60,-66,127,-49,-50,-51,-53,-54,-56,-57,-58,]),'VAR':([4,5,40,],[-2,7,7,]),'VOID':([4,5,6,8,10,17,18,29,42,108,],[-2,-70,13,-5,13,-4,-7,-6,-8,-17,]),'INT':([4,5,6,8,10,17,18,29,30,34,42,108,],[-2,-70,15,-5,15,-4,-7,-6,15,15,-8,-17,]),'FLOAT':([4,5,6,8,10,17,18,29,30,34,42,108,],[-2,-70,16,-5,16,-4,-7,-6,16,16,-8,-17,]),'MAIN':([4,5,6,8,9,10,11,17,18,22,29,42,108,],[-2,-70,-70,-5,21,-70,-14,-4,-7,-13,-6,-8,-17,]),'LBRACE':([8,17,18,29,33,39,40,42,43,44,48,112,125,132,133,134,],[-5,-4,-7,-6,40,-3,-70,-8,47,-18,47,-36,47,-38,47,47,]),'RPAREN':([12,15,16,23,24,25,32,35,36,41,49,70,75,76,79,81,82,83,84,85,88,89,90,91,93,94,95,96,105,106,107,110,113,116,117,118,119,120,121,122,123,124,128,],[-70,-11,-12,33,-19,-20,39,-15,-16,-22,-21,89,-48,-52,-55,-61,-62,-63,-64,-65,110,-67,-69,112,114,-45,-46,-47,-59,-60,123,-66,126,-49,-50,-51,-53,-54,-56,-57,-58,-68,-44,]),'COMMA':([15,16,20,41,75,76,79,81,82,83,84,85,89,90,94,95,96,105,106,110,116,117,118,119,120,121,122,123,],[-11,-12,31,45,-48,-52,-55,-61,-62,-63,-64,-65,-67,111,115,-46,-47,-59,-60,-66,-49,-50,-51,-53,-54,-56,-57,-58,]),'COLON':([19,20,26,38,],[30,-10,34,-9,]),'LPAREN':([21,27,28,60,61,62,63,64,69,70,71,72,73,77,78,80,83,92,98,99,100,101,102,103,104,111,115,],[32,35,36,70,71,-40,73,80,80,80,80,92,80,80,80,80,70,80,80,80,80,80,80,80,80,80,80,]),'END':([46,66,],[50,-23,]),'RBRACE':([47,51,52,53,54,55,56,58,59,65,66,67,68,97,109,127,129,131,135,136,137,138,],[-70,66,-70,-25,-26,-27,-28,-30,-31,86,-23,-24,-29,-32,-33,-43,-37,-34,-42,-37,-39,-35,]),'IF':([47,52,54,55,56,58,59,66,68,97,109,127,129,131,135,136,137,138,],[61,61,-26,-27,-28,-30,-31,-23,-29,-32,-33,-43,-37,-34,-42,-37,-39,-35,]),'WHILE':([47,52,54,55,56,58,59,66,68,97,109,127,129,131,135,136,137,138,],[62,62,-26,-27,-28,-30,-31,-23,-29,-32,-33,-43,-37,-34,-42,-37,-39,-35,]),'PRINT':([47,52,54,55,56,58,59,66,68,97,109,127,129,131,135,136,137,138,],[63,63,-26,-27,-28,-30,-31,-23,-29,-32,-33,-43,-37,-34,-42,-37,-39,-35,]),'RETURN':([47,52,54,55,56,58,59,66,68,97,109,127,129,131,135,136,137,138,],[64,64,-26,-27,-28,-30,-31,-23,-29,-32,-33,-43,-37,-34,-42,-37,-39,-35,]),'EQ':([60,],[69,]),'PLUS':([64,69,70,71,73,75,76,77,78,79,80,81,82,83,84,85,89,92,98,99,100,101,102,103,104,105,106,110,111,115,116,117,118,119,120,121,122,123,],[77,77,77,77,77,101,-52,77,77,-55,77,-61,-62,-63,-64,-65,-67,77,77,77,77,77,77,77,77,-59,-60,-66,77,77,101,101,101,-53,-54,-56,-57,-58,]),'MINUS':([64,69,70,71,73,75,76,77,78,79,80,81,82,83,84,85,89,92,98,99,100,101,102,103,104,105,106,110,111,115,116,117,118,119,120,121,122,123,],[78,78,78,78,78,102,-52,78,78,-55,78,-61,-62,-63,-64,-65,-67,78,78,78,78,78,78,78,78,-59,-60,-66,78,78,102,102,102,-53,-54,-56,-57,-58,]),'CTE_INT':([64,69,70,71,73,77,78,80,92,98,99,100,101,102,103,104,111,115,],[84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,]),'CTE_FLOAT':([64,69,70,71,73,77,78,80,92,98,99,100,101,102,103,104,111,115,],[85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,]),'ELSE':([66,129,],[-23,132,]),'CTE_STRING':([73,115,],[96,96,]),'GT':([75,76,79,81,82,83,84,85,89,105,106,110,119,120,121,122,123,],[98,-52,-55,-61,-62,-63,-64,-65,-67,-59,-60,-66,-53,-54,-56,-57,-58,]),'LT':([75,76,79,81,82,83,84,85,89,105,106,110,119,120,121,122,123,],[99,-52,-55,-61,-62,-63,-64,-65,-67,-59,-60,-66,-53,-54,-56,-57,-58,]),'NEQ':([75,76,79,81,82,83,84,85,89,105,106,110,119,120,121,122,123,],[100,-52,-55,-61,-62,-63,-64,-65,-67,-59,-60,-66,-53,-54,-56,-57,-58,]),'MULT':([76,79,81,82,83,84,85,89,105,106,110,119,120,121,122,123,],[103,-55,-61,-62,-63,-64,-65,-67,-59,-60,-66,103,103,-56,-57,-58,]),'DIV':([76,79,81,82,83,84,85,89,105,106,110,119,120,121,122,123,],[104,-55,-61,-62,-63,-64,-65,-67,-59,-60,-66,104,104,-56,-57,-58,]),'DO':([126,130,],[-41,133,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'programa':([0,],[1,]),'program_start':([4,],[5,]),'vars':([5,40,],[6,44,]),'empty':([5,6,10,12,40,47,52,],[8,11,11,25,8,53,53,]),'funcs':([6,10,],[9,22,]),'func':([6,10,],[10,10,]),'func_start':([6,10,],[12,12,]),'type':([6,10,30,34,],[14,14,37,41,]),'var_decl_list':([7,18,],[17,29,]),'var_decl':([7,18,],[18,18,]),'id_list':([7,18,31,],[19,19,38,]),'params':([12,],[23,]),'param_list':([12,45,],[24,49,]),'main_start':([39,],[43,]),'body':([43,48,125,133,134,],[46,65,129,135,136,]),'func_code_start':([44,],[48,]),'statement_list':([47,52,],[51,67,]),'statement':([47,52,],[52,52,]),'assign':([47,52,],[54,54,]),'condition':([47,52,],[55,55,]),'cycle':([47,52,],[56,56,]),'f_call':([47,52,64,69,70,71,73,77,78,80,92,98,99,100,101,102,103,104,111,115,],[57,57,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,]),'print':([47,52,],[58,58,]),'return_stmt':([47,52,],[59,59,]),'while_start':([62,],[72,]),'expression':([64,69,70,71,73,80,92,111,115,],[74,87,90,91,95,107,113,90,95,]),'exp':([64,69,70,71,73,80,92,98,99,100,111,115,],[75,75,75,75,75,75,75,116,117,118,75,75,]),'termino':([64,69,70,71,73,80,92,98,99,100,101,102,111,115,],[76,76,76,76,76,76,76,76,76,76,119,120,76,76,]),'factor':([64,69,70,71,73,77,78,80,92,98,99,100,101,102,103,104,111,115,],[79,79,79,79,79,105,106,79,79,79,79,79,79,79,121,122,79,79,]),'cte':([64,69,70,71,73,77,78,80,92,98,99,100,101,102,103,104,111,115,],[82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,]),'expression_list':([70,111,],[88,124,]),'print_list':([73,115,],[93,128,]),'print_item':([73,115,],[94,94,]),'if_test':([112,],[125,]),'while_test':([126,],[130,]),'if_end':([129,136,],[131,138,]),'else_start':([132,],[134,]),'while_end':([135,],[137,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> programa","S'",1,None,None,None),
+  ('programa -> PROGRAM ID SEMICOLON program_start vars funcs MAIN LPAREN RPAREN main_start body END','programa',12,'p_programa','parser.py',52),
+  ('program_start -> <empty>','program_start',0,'p_program_start','parser.py',60),
+  ('main_start -> <empty>','main_start',0,'p_main_start','parser.py',65),
+  ('vars -> VAR var_decl_list','vars',2,'p_vars','parser.py',72),
+  ('vars -> empty','vars',1,'p_vars','parser.py',73),
+  ('var_decl_list -> var_decl var_decl_list','var_decl_list',2,'p_var_decl_list','parser.py',78),
+  ('var_decl_list -> var_decl','var_decl_list',1,'p_var_decl_list','parser.py',79),
+  ('var_decl -> id_list COLON type SEMICOLON','var_decl',4,'p_var_decl','parser.py',88),
+  ('id_list -> ID COMMA id_list','id_list',3,'p_id_list','parser.py',100),
+  ('id_list -> ID','id_list',1,'p_id_list','parser.py',101),
+  ('type -> INT','type',1,'p_type','parser.py',110),
+  ('type -> FLOAT','type',1,'p_type','parser.py',111),
+  ('funcs -> func funcs','funcs',2,'p_funcs','parser.py',116),
+  ('funcs -> empty','funcs',1,'p_funcs','parser.py',117),
+  ('func_start -> VOID ID LPAREN','func_start',3,'p_func_start','parser.py',126),
+  ('func_start -> type ID LPAREN','func_start',3,'p_func_start','parser.py',127),
+  ('func -> func_start params RPAREN LBRACE vars func_code_start body RBRACE SEMICOLON','func',9,'p_func_with_start','parser.py',139),
+  ('func_code_start -> <empty>','func_code_start',0,'p_func_code_start','parser.py',148),
+  ('params -> param_list','params',1,'p_params','parser.py',153),
+  ('params -> empty','params',1,'p_params','parser.py',154),
+  ('param_list -> ID COLON type COMMA param_list','param_list',5,'p_param_list','parser.py',159),
+  ('param_list -> ID COLON type','param_list',3,'p_param_list','parser.py',160),
+  ('body -> LBRACE statement_list RBRACE','body',3,'p_body','parser.py',176),
+  ('statement_list -> statement statement_list','statement_list',2,'p_statement_list','parser.py',181),
+  ('statement_list -> empty','statement_list',1,'p_statement_list','parser.py',182),
+  ('statement -> assign','statement',1,'p_statement','parser.py',191),
+  ('statement -> condition','statement',1,'p_statement','parser.py',192),
+  ('statement -> cycle','statement',1,'p_statement','parser.py',193),
+  ('statement -> f_call SEMICOLON','statement',2,'p_statement','parser.py',194),
+  ('statement -> print','statement',1,'p_statement','parser.py',195),
+  ('statement -> return_stmt','statement',1,'p_statement','parser.py',196),
+  ('return_stmt -> RETURN expression SEMICOLON','return_stmt',3,'p_return_stmt','parser.py',201),
+  ('assign -> ID EQ expression SEMICOLON','assign',4,'p_assign','parser.py',216),
+  ('condition -> IF LPAREN expression RPAREN if_test body if_end','condition',7,'p_condition','parser.py',237),
+  ('condition -> IF LPAREN expression RPAREN if_test body ELSE else_start body if_end','condition',10,'p_condition','parser.py',238),
+  ('if_test -> <empty>','if_test',0,'p_if_test','parser.py',243),
+  ('if_end -> <empty>','if_end',0,'p_if_end','parser.py',254),
+  ('else_start -> <empty>','else_start',0,'p_else_start','parser.py',261),
+  ('cycle -> WHILE while_start LPAREN expression RPAREN while_test DO body while_end','cycle',9,'p_cycle','parser.py',272),
+  ('while_start -> <empty>','while_start',0,'p_while_start','parser.py',277),
+  ('while_test -> <empty>','while_test',0,'p_while_test','parser.py',282),
+  ('while_end -> <empty>','while_end',0,'p_while_end','parser.py',293),
+  ('print -> PRINT LPAREN print_list RPAREN SEMICOLON','print',5,'p_print','parser.py',304),
+  ('print_list -> print_item COMMA print_list','print_list',3,'p_print_list','parser.py',328),
+  ('print_list -> print_item','print_list',1,'p_print_list','parser.py',329),
+  ('print_item -> expression','print_item',1,'p_print_item','parser.py',338),
+  ('print_item -> CTE_STRING','print_item',1,'p_print_item','parser.py',339),
+  ('expression -> exp','expression',1,'p_expression','parser.py',357),
+  ('expression -> exp GT exp','expression',3,'p_expression','parser.py',358),
+  ('expression -> exp LT exp','expression',3,'p_expression','parser.py',359),
+  ('expression -> exp NEQ exp','expression',3,'p_expression','parser.py',360),
+  ('exp -> termino','exp',1,'p_exp','parser.py',396),
+  ('exp -> exp PLUS termino','exp',3,'p_exp','parser.py',397),
+  ('exp -> exp MINUS termino','exp',3,'p_exp','parser.py',398),
+  ('termino -> factor','termino',1,'p_termino','parser.py',435),
+  ('termino -> termino MULT factor','termino',3,'p_termino','parser.py',436),
+  ('termino -> termino DIV factor','termino',3,'p_termino','parser.py',437),
+  ('factor -> LPAREN expression RPAREN','factor',3,'p_factor','parser.py',473),
+  ('factor -> PLUS factor','factor',2,'p_factor','parser.py',474),
+  ('factor -> MINUS factor','factor',2,'p_factor','parser.py',475),
+  ('factor -> f_call','factor',1,'p_factor','parser.py',476),
+  ('factor -> cte','factor',1,'p_factor','parser.py',477),
+  ('factor -> ID','factor',1,'p_factor','parser.py',478),
+  ('cte -> CTE_INT','cte',1,'p_cte','parser.py',531),
+  ('cte -> CTE_FLOAT','cte',1,'p_cte','parser.py',532),
+  ('f_call -> ID LPAREN expression_list RPAREN','f_call',4,'p_f_call','parser.py',552),
+  ('f_call -> ID LPAREN RPAREN','f_call',3,'p_f_call','parser.py',553),
+  ('expression_list -> expression COMMA expression_list','expression_list',3,'p_expression_list','parser.py',623),
+  ('expression_list -> expression','expression_list',1,'p_expression_list','parser.py',624),
+  ('empty -> <empty>','empty',0,'p_empty','parser.py',657),
+]
@@ -0,0 +1,93 @@
+import json
+from cfg import find_regions
+
+
+class Profile:
+    """Counts and timings collected by VirtualMachine.execute_profiled()."""
+
+    def __init__(self, quadruples, functions, counts, calls, inclusive, exclusive, total_time):
+        self.quadruples = quadruples
+        # Executions of every quadruple, by index
+        self.counts = counts
+        # Per function name (main included): calls and seconds spent
+        self.calls = calls
+        self.inclusive = inclusive
+        self.exclusive = exclusive
+        self.total_time = total_time
+
+        # Quadruple index -> function it belongs to, from FunctionInfo.start_quad
+        self.owner = [None] * len(quadruples)
+        for name, start, end in find_regions(quadruples, functions):
+            for i in range(start, end):
+                self.owner[i] = name
+        # The initial GOTO to main sits before every function
+        self.owner = [name or 'main' for name in self.owner]
+
+    def get_instruction_count(self):
+        return sum(self.counts)
+
+    def hot_quadruples(self, limit=None):
+        """(index, count) of executed quadruples, most executed first."""
+        hot = sorted(((i, count) for i, count in enumerate(self.counts) if count),
+                     key=lambda item: (-item[1], item[0]))
+        return hot[:limit] if limit is not None else hot
+
+    def functions_by_time(self):
+        return sorted(self.calls, key=lambda name: (-self.exclusive[name], name))
+
+    def loops(self):
+        """Back-edge counts of every while loop, keyed by the loop header."""
+        loops = []
+        for i, quad in enumerate(self.quadruples):
+            if quad.operator == 'GOTO' and quad.result is not None and str(quad.result).isdigit() \
+                    and int(quad.result) <= i:
+                loops.append({'header': int(quad.result), 'back_edge': i,
+                              'function': self.owner[i], 'iterations': self.counts[i]})
+        loops.sort(key=lambda loop: (-loop['iterations'], loop['header']))
+        return loops
+
+    def to_dict(self):
+        return {
+            'total_time': self.total_time,
+            'instructions': self.get_instruction_count(),
+            'functions': {name: {'calls': self.calls[name],
+                                 'inclusive_time': self.inclusive[name],
+                                 'exclusive_time': self.exclusive[name]}
+                          for name in self.functions_by_time()},
+            'loops': self.loops(),
+            'quadruples': [{'index': i, 'count': count, 'function': self.owner[i],
+                            'quadruple': str(self.quadruples[i])}
+                           for i, count in self.hot_quadruples()],
+        }
+
+    def format_report(self, limit=20):
+        lines = [f"Total: {self.get_instruction_count()} instructions in {self.total_time:.6f}s", ""]
+
+        lines.append(f"{'Function':<20} {'Calls':>10} {'Inclusive':>12} {'Exclusive':>12}")
+        for name in self.functions_by_time():
+            lines.append(f"{name:<20} {self.calls[name]:>10} "
+                         f"{self.inclusive[name]:>12.6f} {self.exclusive[name]:>12.6f}")
+
+        loops = self.loops()
+        if loops:
+            lines.append("")
+            lines.append(f"{'Loop header':<12} {'Function':<20} {'Iterations':>10}")
+            for loop in loops:
+                lines.append(f"{loop['header']:<12} {loop['function']:<20} {loop['iterations']:>10}")
+
+        lines.append("")
+        lines.append(f"{'Quadruple':<10} {'Function':<20} {'Count':>10}  Instruction")
+        for i, count in self.hot_quadruples(limit):
+            lines.append(f"{i:<10} {self.owner[i]:<20} {count:>10}  {self.quadruples[i]}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path, limit=20):
+        with open(path, 'w') as f:
+            f.write(self.format_report(limit))
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def __repr__(self):
+        return f"Profile({self.get_instruction_count()} instructions, {len(self.calls)} functions)"
@@ -0,0 +1,33 @@
+from memory_manager import ADDRESS_RANGES
+
+
+class CompiledProgram:
+    """Everything the virtual machine needs to run a compiled Patito program."""
+
+    def __init__(self, name, quadruples, constants, memory_layout, functions, main_resource_needs,
+                 global_vars=None, address_ranges=None):
+        self.name = name
+        self.quadruples = quadruples
+        self.constants = constants
+        self.memory_layout = memory_layout
+        # Function name -> FunctionInfo (start_quad, params, resource_needs...)
+        self.functions = functions
+        self.main_resource_needs = main_resource_needs
+        # VariableTable of the globals, to find them by name
+        self.global_vars = global_vars
+        # (segment, type, first, limit) of every address range; None is the default layout
+        self.address_ranges = address_ranges
+
+    def get_address_ranges(self):
+        return self.address_ranges if self.address_ranges is not None else ADDRESS_RANGES
+
+    def get_function(self, name):
+        return self.functions.get(name)
+
+    def get_global_address(self, name):
+        if self.global_vars is None:
+            return None
+        return self.global_vars.get_address(name)
+
+    def __repr__(self):
+        return f"CompiledProgram({self.name}, {len(self.quadruples)} quadruples, {len(self.functions)} functions)"
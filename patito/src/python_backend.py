@@ -0,0 +1,505 @@
+import sys
+from memory_manager import ADDRESS_RANGES
+from quadruple_generator import CALL_OPERATORS
+from output_buffer import OutputBuffer
+
+# Name of the file the generated code is compiled under, used to map
+# tracebacks back to quadruples
+GENERATED_FILENAME = '<patito>'
+
+BINARY_OPERATORS = ('+', '-', '*', '/', '>', '<', '!=')
+
+# Jumps taken when a condition is false, with the comparison of fused branches
+CONDITIONAL_JUMPS = {
+    'GOTOF': None,
+    'GOTO_IF_NOT_LT': '<',
+    'GOTO_IF_NOT_GT': '>',
+    'GOTO_IF_NOT_NE': '!=',
+}
+
+
+class UnstructuredCode(Exception):
+    """Raised when a range of quadruples does not follow the if/while patterns."""
+
+
+class PythonProgram:
+    """A Patito program translated to Python source and compiled with compile()."""
+
+    def __init__(self, source, line_map, global_addresses):
+        self.source = source
+        # Line of the generated source -> quadruple index
+        self.line_map = line_map
+        self.global_addresses = global_addresses
+        self.code = compile(source, GENERATED_FILENAME, 'exec')
+        self.namespace = None
+
+    def run(self, recursion_limit=100000, memo=None, output=None):
+        """Run main() of the generated module and return its namespace.
+
+        memo maps function names to caches whose wrap() memoizes them.
+        Printed values go to output, an OutputBuffer; without one they are
+        written to stdout when main() returns.
+        """
+        own_output = output is None
+        if own_output:
+            output = OutputBuffer()
+        self.namespace = {'__name__': 'patito_program',
+                          'write_item': output.write_item, 'write_line': output.write_line}
+        exec(self.code, self.namespace)
+        for name, cache in (memo or {}).items():
+            # Calls resolve f_name through the module globals, recursive ones too
+            self.namespace[f'f_{name}'] = cache.wrap(self.namespace[f'f_{name}'])
+
+        previous_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(previous_limit, recursion_limit))
+        try:
+            self.namespace['main']()
+        finally:
+            sys.setrecursionlimit(previous_limit)
+            if own_output:
+                output.flush()
+        return self.namespace
+
+    def get_globals(self):
+        """Final value of every Patito global, by address."""
+        return {address: self.namespace.get(f'g{address}') for address in self.global_addresses}
+
+    def quad_from_traceback(self, tb):
+        """Index of the quadruple that was running when an exception was raised."""
+        quad = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == GENERATED_FILENAME:
+                quad = self.line_map.get(tb.tb_lineno, quad)
+            tb = tb.tb_next
+        return quad
+
+
+class PythonCodeGenerator:
+    """Translate the quadruples of a Patito program into Python source.
+
+    Every Patito function becomes a Python function, locals and temporals
+    become Python locals, globals become module variables and constants are
+    inlined. GOTO/GOTOF patterns produced by the parser are turned back into
+    while/if statements; code that does not follow them is emitted as a
+    block-dispatch loop instead.
+    """
+
+    def __init__(self, quadruples, constants, functions=None, address_ranges=ADDRESS_RANGES):
+        self.quadruples = quadruples
+        self.constants = constants
+        self.functions = functions or {}
+        self.address_ranges = address_ranges
+
+        self.line_map = {}
+        self.global_addresses = set()
+
+        self.regions = []
+        self.function_names = {}
+        self.param_addresses = {}
+        self.return_addresses = {}
+
+        # Names used by the function being generated
+        self.local_names = set()
+        self.written_globals = set()
+
+    # ------------------------------------------------------------------
+    # Program layout
+    # ------------------------------------------------------------------
+
+    def _find_regions(self):
+        """Split the quadruples into one (name, start, end) region per function."""
+        quads = self.quadruples
+        main_start = 0
+        if quads and quads[0].operator == 'GOTO':
+            main_start = int(quads[0].result)
+
+        starts = {}
+        for name, func_info in self.functions.items():
+            if func_info.start_quad is not None:
+                starts[func_info.start_quad] = name
+                self.param_addresses[name] = [func_info.var_table.get_address(param.name)
+                                              for param in func_info.params]
+                self.return_addresses[name] = func_info.return_address
+
+        # Without metadata every GOSUB target starts a function
+        for quad in quads:
+            if quad.operator in CALL_OPERATORS and int(quad.operand1) not in starts:
+                name = f"func_{int(quad.operand1)}"
+                starts[int(quad.operand1)] = name
+
+        boundaries = sorted(set(starts) | {main_start, len(quads)})
+        for start in sorted(starts):
+            end = boundaries[boundaries.index(start) + 1]
+            self.regions.append((starts[start], start, end))
+            self.function_names[start] = starts[start]
+        self.regions.append(('main', main_start, len(quads)))
+
+        for name, start, end in self.regions:
+            if name == 'main' or name in self.return_addresses:
+                continue
+            # Without metadata, a global written right before ENDFUNC is the return slot
+            self.param_addresses[name] = []
+            self.return_addresses[name] = None
+            for i in range(start, end - 1):
+                if quads[i].operator == '=' and quads[i + 1].operator == 'ENDFUNC' \
+                        and self._segment(quads[i].result) == 'global':
+                    self.return_addresses[name] = int(quads[i].result)
+
+    def _segment(self, address):
+        address = int(address)
+        for segment, type_, first, limit in self.address_ranges:
+            if first <= address < limit:
+                return segment
+        raise Exception(f"Segmentation Fault: Address {address} out of range")
+
+    def _value(self, address):
+        """Python expression that reads an address."""
+        segment = self._segment(address)
+        address = int(address)
+        if segment == 'const':
+            return repr(self.constants[address])
+        if segment == 'global':
+            self.global_addresses.add(address)
+            return f"g{address}"
+        if segment == 'local':
+            self.local_names.add(f"l{address}")
+            return f"l{address}"
+        return f"t{address}"
+
+    def _target(self, address):
+        """Python name that an address is written to."""
+        segment = self._segment(address)
+        if segment == 'const':
+            raise Exception("Segmentation Fault: Cannot write to constant memory")
+        name = self._value(address)
+        if segment == 'global':
+            self.written_globals.add(name)
+        return name
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _statement(self, i, context):
+        """Python statements for the non-jump quadruple at i.
+
+        Returns (statements, next index). A call sequence ERA/PARAM/GOSUB
+        and the copy of its return value are consumed as a single statement.
+        """
+        quad = self.quadruples[i]
+        op = quad.operator
+
+        if op in BINARY_OPERATORS and not (op == '-' and quad.operand2 is None):
+            return [(i, f"{self._target(quad.result)} = {self._value(quad.operand1)} {op} {self._value(quad.operand2)}")], i + 1
+        if op in ('-', 'unary-'):
+            return [(i, f"{self._target(quad.result)} = -{self._value(quad.operand1)}")], i + 1
+        if op == '=':
+            if i + 1 < context['end'] and i + 1 not in context['targets'] \
+                    and self.quadruples[i + 1].operator == 'ENDFUNC' \
+                    and context['return_address'] is not None \
+                    and int(quad.result) == context['return_address']:
+                # Return statement: '=' into the return slot followed by ENDFUNC
+                return [(i, f"return {self._value(quad.operand1)}")], i + 2
+            return [(i, f"{self._target(quad.result)} = {self._value(quad.operand1)}")], i + 1
+        if op == 'PRINT':
+            return [(i, f"write_line({self._value(quad.operand1)})")], i + 1
+        if op == 'PRINT_ITEM':
+            return [(i, f"write_item({self._value(quad.operand1)})")], i + 1
+        if op == 'ENDFUNC':
+            return [(i, context['fall_through'])], i + 1
+        if op == 'ERA':
+            return self._call(i)
+        raise UnstructuredCode(f"Unexpected {op} at quadruple {i}")
+
+    def _call(self, i):
+        quads = self.quadruples
+        name = quads[i].operand1
+        args = {}
+        j = i + 1
+        while quads[j].operator == 'PARAM':
+            args[int(quads[j].result.replace('param', ''))] = self._value(quads[j].operand1)
+            j += 1
+        if quads[j].operator not in CALL_OPERATORS:
+            raise UnstructuredCode(f"ERA at quadruple {i} is not followed by GOSUB")
+
+        callee = self.function_names[int(quads[j].operand1)]
+        call = f"f_{callee}({', '.join(args[k] for k in sorted(args))})"
+        if quads[j].operator == 'CALL_AND_STORE':
+            return [(i, f"{self._target(quads[j].result)} = {call}")], j + 1
+        return_address = self.return_addresses.get(callee)
+        after = j + 1
+        if return_address is not None and after < len(quads) and quads[after].operator == '=' \
+                and int(quads[after].operand1) == return_address:
+            return [(i, f"{self._target(quads[after].result)} = {call}")], after + 1
+        return [(i, call)], after
+
+    # ------------------------------------------------------------------
+    # Structured control flow
+    # ------------------------------------------------------------------
+
+    def _find_loops(self, start, end):
+        """Map each while header to the index of its backward GOTO."""
+        loops = {}
+        for j in range(start, end):
+            quad = self.quadruples[j]
+            if quad.operator == 'GOTO' and quad.result is not None and int(quad.result) <= j:
+                header = int(quad.result)
+                loops[header] = max(loops.get(header, j), j)
+        return loops
+
+    def _find_targets(self, start, end):
+        return {int(self.quadruples[j].result) for j in range(start, end)
+                if (self.quadruples[j].operator == 'GOTO' or self.quadruples[j].operator in CONDITIONAL_JUMPS)
+                and self.quadruples[j].result is not None}
+
+    def _condition(self, quad):
+        """Python expression a conditional jump tests."""
+        comparison = CONDITIONAL_JUMPS[quad.operator]
+        if comparison is None:
+            return self._value(quad.operand1)
+        return f"({self._value(quad.operand1)} {comparison} {self._value(quad.operand2)})"
+
+    def _structured(self, lo, hi, depth, context):
+        """Emit [lo, hi) as nested if/while statements.
+
+        Returns (lines, terminates) where lines are (quad, depth, text) and
+        terminates tells whether every path through the range returns.
+        """
+        quads = self.quadruples
+        lines = []
+        terminates = False
+        p = lo
+        while p < hi:
+            if terminates:
+                # Unreachable code after a return (e.g. the GOTO of an if/else)
+                p += 1
+                continue
+
+            back_edge = context['loops'].get(p)
+            if back_edge is not None and back_edge < hi:
+                exit_jump = None
+                for k in range(p, back_edge):
+                    if quads[k].operator == 'GOTO' or quads[k].operator in CONDITIONAL_JUMPS:
+                        if quads[k].operator in CONDITIONAL_JUMPS and int(quads[k].result) == back_edge + 1:
+                            exit_jump = k
+                        break
+                if exit_jump is None:
+                    raise UnstructuredCode(f"Loop at quadruple {p} has no exit test")
+                lines.append((p, depth, "while True:"))
+                cond_lines, _ = self._structured_straight(p, exit_jump, depth + 1, context)
+                lines.extend(cond_lines)
+                lines.append((exit_jump, depth + 1, f"if not {self._condition(quads[exit_jump])}:"))
+                lines.append((exit_jump, depth + 2, "break"))
+                body, _ = self._structured(exit_jump + 1, back_edge, depth + 1, context)
+                lines.extend(body)
+                p = back_edge + 1
+                continue
+
+            quad = quads[p]
+            if quad.operator in CONDITIONAL_JUMPS:
+                target = int(quad.result)
+                if not p < target <= hi:
+                    raise UnstructuredCode(f"GOTOF at quadruple {p} leaves its block")
+                lines_if, terminates, p = self._structured_if(p, target, hi, depth, context)
+                lines.extend(lines_if)
+                continue
+            if quad.operator == 'GOTO':
+                raise UnstructuredCode(f"Unexpected GOTO at quadruple {p}")
+
+            statements, p = self._statement(p, context)
+            for quad_index, text in statements:
+                lines.append((quad_index, depth, text))
+                if text.startswith('return'):
+                    terminates = True
+        return lines, terminates
+
+    def _structured_straight(self, lo, hi, depth, context):
+        lines = []
+        p = lo
+        while p < hi:
+            statements, p = self._statement(p, context)
+            lines.extend((quad_index, depth, text) for quad_index, text in statements)
+        return lines, False
+
+    def _structured_if(self, p, target, hi, depth, context):
+        quads = self.quadruples
+        cond = self._condition(quads[p])
+        else_jump = target - 1
+
+        # if/else: the then branch ends with a forward GOTO over the else branch
+        if else_jump > p and quads[else_jump].operator == 'GOTO' and quads[else_jump].result is not None:
+            end = int(quads[else_jump].result)
+            if target <= end <= hi:
+                try:
+                    then_lines, then_returns = self._structured(p + 1, else_jump, depth + 1, context)
+                    else_lines, else_returns = self._structured(target, end, depth + 1, context)
+                except UnstructuredCode:
+                    pass
+                else:
+                    lines = [(p, depth, f"if {cond}:")]
+                    lines.extend(then_lines or [(p, depth + 1, "pass")])
+                    if else_lines:
+                        lines.append((else_jump, depth, "else:"))
+                        lines.extend(else_lines)
+                    return lines, then_returns and else_returns, end
+
+        then_lines, _ = self._structured(p + 1, target, depth + 1, context)
+        lines = [(p, depth, f"if {cond}:")]
+        lines.extend(then_lines or [(p, depth + 1, "pass")])
+        return lines, False, target
+
+    # ------------------------------------------------------------------
+    # Block-dispatch fallback
+    # ------------------------------------------------------------------
+
+    def _dispatch_loop(self, lo, hi, depth, context):
+        """Emit [lo, hi) as a loop over basic blocks selected by a pc variable."""
+        quads = self.quadruples
+        leaders = {lo}
+        for i in range(lo, hi):
+            op = quads[i].operator
+            if op == 'GOTO' or op in CONDITIONAL_JUMPS:
+                target = int(quads[i].result)
+                if not lo <= target <= hi:
+                    raise Exception(f"Jump at quadruple {i} leaves its function")
+                leaders.add(target)
+                leaders.add(i + 1)
+            elif op == 'ENDFUNC':
+                leaders.add(i + 1)
+        leaders = sorted(leader for leader in leaders if leader < hi)
+
+        lines = [(lo, depth, f"pc = {lo}"), (lo, depth, "while True:")]
+        for n, leader in enumerate(leaders):
+            block_end = leaders[n + 1] if n + 1 < len(leaders) else hi
+            keyword = 'if' if n == 0 else 'elif'
+            lines.append((leader, depth + 1, f"{keyword} pc == {leader}:"))
+            p = leader
+            ended = False
+            while p < block_end:
+                quad = quads[p]
+                if quad.operator == 'GOTO':
+                    lines.append((p, depth + 2, f"pc = {int(quad.result)}"))
+                    lines.append((p, depth + 2, "continue"))
+                    ended = True
+                    break
+                if quad.operator in CONDITIONAL_JUMPS:
+                    lines.append((p, depth + 2, f"if not {self._condition(quad)}:"))
+                    lines.append((p, depth + 3, f"pc = {int(quad.result)}"))
+                    lines.append((p, depth + 3, "continue"))
+                    p += 1
+                    continue
+                statements, p = self._statement(p, context)
+                for quad_index, text in statements:
+                    lines.append((quad_index, depth + 2, text))
+                    if text.startswith('return'):
+                        ended = True
+                if ended:
+                    break
+            if not ended:
+                if block_end >= hi:
+                    lines.append((block_end - 1, depth + 2, context['fall_through']))
+                else:
+                    lines.append((block_end - 1, depth + 2, f"pc = {block_end}"))
+        if leaders:
+            # Jumps to hi leave the region
+            lines.append((hi - 1, depth + 1, "else:"))
+            lines.append((hi - 1, depth + 2, context['fall_through']))
+        return lines, False
+
+    # ------------------------------------------------------------------
+    # Functions
+    # ------------------------------------------------------------------
+
+    def _function(self, name, start, end):
+        return_address = None if name == 'main' else self.return_addresses.get(name)
+        known = name != 'main' and name in self.functions
+        self.local_names = set()
+        self.written_globals = set()
+
+        slot = f"g{return_address}" if return_address is not None else None
+        context = {
+            'loops': self._find_loops(start, end),
+            'targets': self._find_targets(start, end),
+            'end': end,
+            'return_address': return_address,
+            'fall_through': f"return {slot}" if slot else "return",
+        }
+        try:
+            body, terminates = self._structured(start, end, 1, context)
+        except UnstructuredCode:
+            body, terminates = self._dispatch_loop(start, end, 1, context)
+
+        # A return only has to update the global slot when the function can
+        # also end without one, since callers would then read the slot.
+        # Without metadata the slot is always kept up to date.
+        if slot and (not known or not terminates):
+            body = self._write_return_slot(body, slot)
+            self.written_globals.add(slot)
+            self.global_addresses.add(return_address)
+
+        if name == 'main':
+            params = []
+            header = [(start, 0, "def main():")]
+        else:
+            if known:
+                params = [f"l{address}" for address in self.param_addresses[name]]
+            else:
+                # Legacy programs pass arguments to 3000 + position
+                params = [f"l{3000 + k}" for k in range(self._param_count(start))]
+            header = [(start, 0, f"def f_{name}({', '.join(params)}):")]
+
+        prologue = []
+        if self.written_globals:
+            prologue.append((start, 1, f"global {', '.join(sorted(self.written_globals))}"))
+        local_names = sorted(self.local_names - set(params))
+        if local_names:
+            # Patito locals start undefined, like the VM's None slots
+            prologue.append((start, 1, f"{' = '.join(local_names)} = None"))
+        return header + prologue + (body or [(start, 1, "pass")])
+
+    def _write_return_slot(self, body, slot):
+        """Make every 'return x' also store x in the function's global slot."""
+        result = []
+        for quad_index, depth, text in body:
+            if text.startswith('return ') and text != f"return {slot}":
+                result.append((quad_index, depth, f"{slot} = {text[len('return '):]}"))
+                result.append((quad_index, depth, f"return {slot}"))
+            else:
+                result.append((quad_index, depth, text))
+        return result
+
+    def _param_count(self, start):
+        count = 0
+        for i, quad in enumerate(self.quadruples):
+            if quad.operator in CALL_OPERATORS and int(quad.operand1) == start:
+                j = i - 1
+                while j >= 0 and self.quadruples[j].operator == 'PARAM':
+                    count = max(count, int(self.quadruples[j].result.replace('param', '')))
+                    j -= 1
+        return count
+
+    def generate(self):
+        self._find_regions()
+        function_lines = []
+        for name, start, end in self.regions:
+            function_lines.append(self._function(name, start, end))
+
+        lines = [(0, 0, "# Generated from Patito quadruples")]
+        for address in sorted(self.global_addresses):
+            lines.append((0, 0, f"g{address} = None"))
+        for function in function_lines:
+            lines.append((function[0][0], 0, ""))
+            lines.extend(function)
+
+        source = []
+        for number, (quad_index, depth, text) in enumerate(lines, start=1):
+            source.append("    " * depth + text)
+            self.line_map[number] = quad_index
+        return "\n".join(source) + "\n"
+
+
+def compile_to_python(quadruples, constants, functions=None, address_ranges=ADDRESS_RANGES):
+    """Translate quadruples to Python source and compile it."""
+    generator = PythonCodeGenerator(quadruples, constants, functions, address_ranges)
+    source = generator.generate()
+    return PythonProgram(source, generator.line_map, sorted(generator.global_addresses))
@@ -44,6 +44,9 @@ class QuadrupleGenerator:
     def get_next_address(self):
         return len(self.quadruples)
 
+    def truncate(self, index):
+        del self.quadruples[index:]
+
     def fill_quad(self, index, value):
         if 0 <= index < len(self.quadruples):
             self.quadruples[index].result = str(value)
@@ -74,3 +77,90 @@ class QuadrupleGenerator:
         """String representation."""
         return f"QuadrupleGenerator({len(self.quadruples)} quadruples)"
 
+
+
+# Fused instructions produced by the optimizer
+FUSED_BRANCHES = {
+    '<': 'GOTO_IF_NOT_LT',
+    '>': 'GOTO_IF_NOT_GT',
+    '!=': 'GOTO_IF_NOT_NE',
+}
+
+# Field that holds the target quadruple of every control transfer
+JUMP_TARGET_FIELDS = {
+    'GOTO': 'result',
+    'GOTOF': 'result',
+    'GOTO_IF_NOT_LT': 'result',
+    'GOTO_IF_NOT_GT': 'result',
+    'GOTO_IF_NOT_NE': 'result',
+    'GOSUB': 'operand1',
+    'CALL_AND_STORE': 'operand1',
+}
+
+CALL_OPERATORS = ('GOSUB', 'CALL_AND_STORE')
+
+# PRINT ends the line, PRINT_ITEM is followed by more items of the same statement
+PRINT_OPERATORS = ('PRINT', 'PRINT_ITEM')
+
+# Fields read and written as memory addresses, when they differ from
+# the default (read operand1/operand2, write result)
+READ_FIELDS = {
+    '=': ('operand1',),
+    'unary-': ('operand1',),
+    'PRINT': ('operand1',),
+    'PRINT_ITEM': ('operand1',),
+    'GOTOF': ('operand1',),
+    'PARAM': ('operand1',),
+    'GOTO': (),
+    'ERA': (),
+    'GOSUB': (),
+    'ENDFUNC': (),
+    'CALL_AND_STORE': ('operand2',),
+}
+
+WRITE_FIELDS = {
+    'PRINT': (),
+    'PRINT_ITEM': (),
+    'GOTO': (),
+    'GOTOF': (),
+    'GOTO_IF_NOT_LT': (),
+    'GOTO_IF_NOT_GT': (),
+    'GOTO_IF_NOT_NE': (),
+    'ERA': (),
+    'PARAM': (),
+    'GOSUB': (),
+    'ENDFUNC': (),
+}
+
+
+def read_fields(quad):
+    """Names of the fields a quadruple reads as addresses."""
+    return [field for field in READ_FIELDS.get(quad.operator, ('operand1', 'operand2'))
+            if getattr(quad, field) is not None]
+
+
+def write_fields(quad):
+    """Names of the fields a quadruple writes as addresses."""
+    return [field for field in WRITE_FIELDS.get(quad.operator, ('result',))
+            if getattr(quad, field) is not None]
+
+
+def get_reads(quad):
+    """Addresses a quadruple reads."""
+    return [int(getattr(quad, field)) for field in read_fields(quad)]
+
+
+def get_writes(quad):
+    """Addresses a quadruple writes."""
+    return [int(getattr(quad, field)) for field in write_fields(quad)]
+
+
+def get_jump_target(quad):
+    """Index a quadruple can transfer control to, or None."""
+    field = JUMP_TARGET_FIELDS.get(quad.operator)
+    if field is None or getattr(quad, field) is None:
+        return None
+    value = getattr(quad, field)
+    if isinstance(value, str) and not value.isdigit():
+        return None
+    return int(value)
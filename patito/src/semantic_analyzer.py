@@ -4,13 +4,17 @@ from function_directory import FunctionDirectory
 from memory_manager import MemoryManager
 
 class SemanticAnalyzer:
-    def __init__(self):
+    def __init__(self, segment_sizes=None, strict=True):
         self.semantic_cube = SemanticCube()
         self.global_vars = VariableTable('global')
         self.function_directory = FunctionDirectory()
-        self.memory_manager = MemoryManager()
+        # Tamaño de los segmentos de memoria, ver build_address_ranges()
+        self.segment_sizes = segment_sizes
+        self.strict = strict
+        self.memory_manager = MemoryManager(segment_sizes, strict)
         self.current_function = None
         self.program_name = None
+        self.main_resource_needs = {}
 
     def set_program_name(self, name, line):
         '''Nombre del programa'''
@@ -62,9 +66,20 @@ class SemanticAnalyzer:
 
     def exit_function(self):
         '''Salir de una funcion'''
+        # Guardamos el tamaño exacto del registro de activacion
+        func_info = self.function_directory.get_function(self.current_function)
+        func_info.resource_needs = self.memory_manager.get_memory_usage()
         self.current_function = None
         self.function_directory.end_function()
 
+    def start_main(self):
+        '''Empezar main con su propio registro de activacion'''
+        self.memory_manager.reset_local_memory()
+
+    def end_program(self):
+        '''Guardar lo que necesita main'''
+        self.main_resource_needs = self.memory_manager.get_memory_usage()
+
     def add_parameter(self, name, param_type, line):
         '''Agregar un parametro a la funcion'''
         address = self.memory_manager.get_local_address(param_type)
@@ -164,13 +179,18 @@ class SemanticAnalyzer:
         '''Obtener direccion de constante'''
         return self.memory_manager.get_const_address(type_, value)
 
+    def get_constants(self):
+        '''Direccion -> valor de las constantes'''
+        return self.memory_manager.get_constants()
+
     def reset(self):
         '''Reset semantica'''
         self.global_vars = VariableTable('global')
         self.function_directory = FunctionDirectory()
-        self.memory_manager = MemoryManager()
+        self.memory_manager = MemoryManager(self.segment_sizes, self.strict)
         self.current_function = None
         self.program_name = None
+        self.main_resource_needs = {}
 
 
 class ExpressionInfo:
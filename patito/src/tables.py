@@ -0,0 +1,92 @@
+import os
+import sys
+import importlib
+import ply.lex as lex
+import ply.yacc as yacc
+
+# Generated tables shipped next to the sources (regenerate with: python src/tables.py)
+TABLES_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSETAB = 'patito_parsetab'
+LEXTAB = 'patito_lextab'
+
+
+def _module_dict(module):
+    # Same reflection PLY does when given an instance as module
+    return {name: getattr(module, name) for name in dir(module)}
+
+
+def parser_signature(parser):
+    """Grammar signature PLY stores in the parse tables as _lr_signature."""
+    pinfo = yacc.ParserReflect(_module_dict(parser), log=yacc.NullLogger())
+    pinfo.get_all()
+    return pinfo.signature()
+
+
+def lexer_signature(lexer):
+    """Master regular expression PLY builds from the lexer rules, in rule order."""
+    linfo = lex.LexerReflect(_module_dict(lexer), log=lex.NullLogger())
+    linfo.get_all()
+    rules = []
+    for name, rule in linfo.funcsym['INITIAL']:
+        rules.append('(?P<%s>%s)' % (name, lex._get_regex(rule)))
+    for name, regex in linfo.strsym['INITIAL']:
+        rules.append('(?P<%s>%s)' % (name, regex))
+    return '|'.join(rules)
+
+
+def _import_table(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def check_tables(parser, lexer):
+    """List of reasons the shipped tables can't be used for this grammar; empty when they can."""
+    problems = []
+    parsetab = _import_table(PARSETAB)
+    if parsetab is None:
+        problems.append(f"missing {PARSETAB}.py")
+    elif getattr(parsetab, '_tabversion', None) != yacc.__tabversion__:
+        problems.append(f"{PARSETAB}.py was generated by another PLY version")
+    elif parsetab._lr_signature != parser_signature(parser):
+        problems.append(f"{PARSETAB}.py does not match the grammar")
+
+    lextab = _import_table(LEXTAB)
+    if lextab is None:
+        problems.append(f"missing {LEXTAB}.py")
+    elif getattr(lextab, '_tabversion', None) != lex.__tabversion__:
+        problems.append(f"{LEXTAB}.py was generated by another PLY version")
+    else:
+        # The master regex may be split in several groups, joining them gives it back
+        shipped = '|'.join(pattern for pattern, names in lextab._lexstatere['INITIAL'])
+        if shipped != lexer_signature(lexer) or lextab._lextokens != set(lexer.tokens) \
+                or lextab._lexstateignore.get('INITIAL') != getattr(lexer, 't_ignore', ''):
+            problems.append(f"{LEXTAB}.py does not match the lexer rules")
+    return problems
+
+
+def write_tables(outputdir=TABLES_DIR):
+    """Generate the parse and lexer tables into outputdir."""
+    # Imported here, parser.py imports this module
+    from parser import PatitoParser
+    from lexer import PatitoLexer
+
+    for name in (PARSETAB, LEXTAB):
+        path = os.path.join(outputdir, name + '.py')
+        if os.path.exists(path):
+            os.remove(path)
+        sys.modules.pop(name, None)
+
+    # lex only writes its table in optimized mode
+    lex.lex(module=PatitoLexer(), optimize=1, lextab=LEXTAB, outputdir=outputdir)
+    # Only the tokens and p_ rules are needed, not the rest of PatitoParser.__init__
+    parser = PatitoParser.__new__(PatitoParser)
+    parser.tokens = PatitoLexer.tokens
+    yacc.yacc(module=parser, debug=False, tabmodule=PARSETAB, outputdir=outputdir)
+    return [os.path.join(outputdir, name + '.py') for name in (PARSETAB, LEXTAB)]
+
+
+if __name__ == "__main__":
+    for path in write_tables():
+        print(f"Wrote {path}")
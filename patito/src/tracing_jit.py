@@ -0,0 +1,107 @@
+from quadruple_generator import FUSED_BRANCHES
+
+SEGMENT_NAMES = ('g', 'l', 't')
+
+ARITHMETIC = ('+', '-', '*', '/', '>', '<', '!=')
+
+# Comparison tested by each fused branch
+BRANCH_COMPARISONS = {fused: comparison for comparison, fused in FUSED_BRANCHES.items()}
+
+# Operators a trace can contain; anything else aborts the recording
+TRACEABLE = ARITHMETIC + ('=', 'unary-', 'PRINT', 'PRINT_ITEM', 'GOTO', 'GOTOF') + tuple(BRANCH_COMPARISONS)
+
+
+class HotLoop:
+    """Back-edge counter and compiled trace of one while loop."""
+
+    def __init__(self, header, back_edge):
+        self.header = header
+        self.back_edge = back_edge
+        # The parser's GOTOF leaves the loop right after the backward GOTO
+        self.exit = back_edge + 1
+        self.hits = 0
+        self.trace = None
+        self.source = None
+        self.aborted = False
+        self.bailouts = 0
+
+    def __repr__(self):
+        state = 'aborted' if self.aborted else 'compiled' if self.trace else 'counting'
+        return f"HotLoop({self.header}..{self.back_edge}, hits={self.hits}, {state})"
+
+
+def compile_trace(quadruples, path, loop, locate, constants, output, fuel=None):
+    """Compile one recorded iteration of a loop into a Python function.
+
+    path holds the indices executed from the loop header up to (not
+    including) the backward GOTO. Every address has a static type, so the
+    trace needs no type guards: only the branches are guarded, and a
+    branch going the other way returns the quadruple the interpreter must
+    resume at. The function loops until a guard fails and returns that
+    index; loop.exit means the loop ended normally.
+
+    With a fuel tank (a one-element list) every iteration is charged the
+    loop's length and the trace stops at the back edge once it runs dry.
+    """
+    def value(address):
+        segment, offset = locate(address)
+        if segment == 3:
+            # Constants never change, inline them
+            return repr(constants[int(address)])
+        return f"{SEGMENT_NAMES[segment]}[{offset}]"
+
+    def exit_to(index):
+        # The remaining fuel lives in a local while the trace runs
+        if fuel is not None:
+            return [f"    fuel[0] = budget", f"    return {index}"]
+        return [f"    return {index}"]
+
+    body = []
+    for k, ip in enumerate(path):
+        quad = quadruples[ip]
+        op = quad.operator
+        following = path[k + 1] if k + 1 < len(path) else loop.back_edge
+
+        if op in ARITHMETIC and not (op == '-' and quad.operand2 is None):
+            body.append(f"{value(quad.result)} = {value(quad.operand1)} {op} {value(quad.operand2)}")
+        elif op in ('-', 'unary-'):
+            body.append(f"{value(quad.result)} = -{value(quad.operand1)}")
+        elif op == '=':
+            body.append(f"{value(quad.result)} = {value(quad.operand1)}")
+        elif op == 'PRINT':
+            body.append(f"write_line({value(quad.operand1)})")
+        elif op == 'PRINT_ITEM':
+            body.append(f"write_item({value(quad.operand1)})")
+        elif op == 'GOTO':
+            # Already followed while recording
+            continue
+        else:
+            if op == 'GOTOF':
+                condition = value(quad.operand1)
+            else:
+                condition = f"{value(quad.operand1)} {BRANCH_COMPARISONS[op]} {value(quad.operand2)}"
+            if following == ip + 1:
+                body.append(f"if not ({condition}):")
+                body.extend(exit_to(int(quad.result)))
+            else:
+                body.append(f"if {condition}:")
+                body.extend(exit_to(ip + 1))
+
+    if fuel is not None:
+        body.append(f"budget -= {loop.back_edge - loop.header + 1}")
+        body.append("if budget < 0:")
+        body.extend(exit_to(loop.back_edge))
+
+    lines = [f"def trace_{loop.header}(segs):",
+             "    g = segs[0]",
+             "    l = segs[1]",
+             "    t = segs[2]"]
+    if fuel is not None:
+        lines.append("    budget = fuel[0]")
+    lines.append("    while True:")
+    lines.extend("        " + line for line in body or ["pass"])
+    source = "\n".join(lines) + "\n"
+
+    namespace = {'write_item': output.write_item, 'write_line': output.write_line, 'fuel': fuel}
+    exec(compile(source, f"<trace {loop.header}>", 'exec'), namespace)
+    return namespace[f"trace_{loop.header}"], source
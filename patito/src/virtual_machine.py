@@ -1,73 +1,528 @@
 import sys
+import time
+import asyncio
+import operator
+from collections import OrderedDict
+from memory_manager import ADDRESS_RANGES, export_constants
+from cfg import find_regions
+from quadruple_generator import get_reads, get_writes, CALL_OPERATORS
+from python_backend import compile_to_python
+from profiler import Profile
+from output_buffer import OutputBuffer
+from tracing_jit import HotLoop, TRACEABLE, compile_trace
+
+# Integer opcodes used by the dispatch engine
+OPCODES = {
+    '+': 0,
+    '-': 1,
+    '*': 2,
+    '/': 3,
+    '=': 4,
+    '>': 5,
+    '<': 6,
+    '!=': 7,
+    'PRINT': 8,
+    'GOTO': 9,
+    'GOTOF': 10,
+    'ERA': 11,
+    'PARAM': 12,
+    'GOSUB': 13,
+    'ENDFUNC': 14,
+    'unary-': 15,
+    'GOTO_IF_NOT_LT': 16,
+    'GOTO_IF_NOT_GT': 17,
+    'GOTO_IF_NOT_NE': 18,
+    'CALL_AND_STORE': 19,
+    'PRINT_ITEM': 20,
+}
+
+# Memory segments, each one a contiguous list addressed by offset
+SEG_GLOBAL = 0
+SEG_LOCAL = 1
+SEG_TEMP = 2
+SEG_CONST = 3
+
+SEGMENT_INDEX = {
+    'global': SEG_GLOBAL,
+    'local': SEG_LOCAL,
+    'temp': SEG_TEMP,
+    'const': SEG_CONST,
+}
+
+ENGINES = ('loop', 'dispatch', 'python')
+
+# Returned by MemoCache.lookup() when the arguments were never seen
+MISSING = object()
+
+
+class FrameShape:
+    """Size of a function's activation record plus its free-list of frames."""
+
+    def __init__(self, local_size, temp_size, param_offsets):
+        self.local_size = local_size
+        self.temp_size = temp_size
+        # Local offset that receives each PARAM, by position
+        self.param_offsets = param_offsets
+        self.blank_locals = [None] * local_size
+        self.pool = []
+        # MemoCache of the function when memoization is on and it is pure
+        self.memo = None
+
+    def __repr__(self):
+        return f"FrameShape(local={self.local_size}, temp={self.temp_size}, free={len(self.pool)})"
+
+
+class ResourceLimitExceeded(Exception):
+    """A program went over one of the limits given to the VirtualMachine."""
+
+    def __init__(self, limit, maximum, instruction_pointer):
+        super().__init__(f"{limit} limit of {maximum} exceeded at quadruple {instruction_pointer}")
+        # 'instructions', 'call_depth' or 'frame_slots'
+        self.limit = limit
+        self.maximum = maximum
+        self.instruction_pointer = instruction_pointer
+
+    def to_dict(self):
+        return {'limit': self.limit, 'maximum': self.maximum,
+                'instruction_pointer': self.instruction_pointer}
+
+
+class MemoCache:
+    """Results of a pure function by argument values, evicting the least recently used."""
+
+    def __init__(self, max_size, return_address):
+        self.max_size = max_size
+        self.return_address = return_address
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        value = self.entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def wrap(self, function):
+        """Memoized version of a function generated by the python backend."""
+        def memoized(*args):
+            value = self.lookup(args)
+            if value is MISSING:
+                value = function(*args)
+                self.store(args, value)
+            return value
+        return memoized
+
+    def __repr__(self):
+        return f"MemoCache(size={len(self.entries)}/{self.max_size}, hits={self.hits}, misses={self.misses})"
+
 
 class VirtualMachine:
-    def __init__(self):
+    def __init__(self, engine='loop', memoize=False, memo_size=1024, profile=False,
+                 jit=True, jit_threshold=100, output=None, flush_policy='size', buffer_size=8192,
+                 max_instructions=None, max_call_depth=None, max_frame_slots=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        self.engine = engine
+
+        # Limits for untrusted programs. Fuel is charged on backward jumps
+        # (the loop's length) and on calls (the callee's length), never per
+        # quadruple, and only the loop and dispatch engines enforce them.
+        self.max_instructions = max_instructions
+        self.max_call_depth = max_call_depth
+        self.max_frame_slots = max_frame_slots
+        self.limited = max_instructions is not None or max_call_depth is not None \
+            or max_frame_slots is not None
+        if self.limited and engine == 'python':
+            raise ValueError("Resource limits are only enforced by the 'loop' and 'dispatch' engines")
+        self.fuel = [0]
+        self.live_slots = 0
+        self.function_sizes = {}
+
+        # Profiled runs use their own loop, so the other engines pay nothing
+        self.profile = profile
+        self.last_profile = None
+
+        # Everything the program prints goes through this buffer into output
+        self.output = OutputBuffer(output, flush_policy, buffer_size)
+
+        # Dispatch engine: compile while loops whose back edge runs jit_threshold times
+        self.jit = jit
+        self.jit_threshold = jit_threshold
+        self.hot_loops = {}
+        self.jit_stats = {'traces_compiled': 0, 'traces_aborted': 0, 'trace_runs': 0,
+                          'bailouts': 0, 'retraced': 0}
+
+        # Cache the results of pure functions (FunctionInfo.is_pure), opt-in
+        self.memoize = memoize
+        self.memo_size = memo_size
+        self.memo_caches = {}
+        self.memo_keys = []
+
         self.quadruples = []
         self.instruction_pointer = 0
-        
-        self.global_memory = {}
-        self.constant_memory = {}
-        
+
+        # Global, current local, current temp and constant storage.
+        # The list object itself never changes so decoded handlers can keep it.
+        self.segments = [[], [], [], []]
+        self.constants = {}
+
+        # Slots per type in every segment, and address -> (segment, offset)
+        self.memory_layout = None
+        # (segment, type, first, limit) of every address range of the loaded program
+        self.address_ranges = ADDRESS_RANGES
+        self.address_table = []
+        self.segment_sizes = [0, 0, 0, 0]
+        self.memory_ready = False
+
+        # Function metadata and pre-sized frames per function
+        self.functions = {}
+        self.main_resource_needs = None
+        self.type_offsets = {}
+        self.frame_shapes = {}
+        self.default_frame_shape = None
+        self.frames_allocated = 0
+        self.frames_reused = 0
+
+        # Activation records are (locals, temps, FrameShape) tuples
+        self.current_record = None
         self.memory_stack = []
-        self.current_local_memory = {}
-        self.current_temp_memory = {}
-        
+
         self.pending_activation_record = None
-        
+
         self.return_stack = []
 
+        # Decoded program for the dispatch engine
+        self.opcodes = []
+        self.code = []
+
+        # start()/step() run the decoded program in slices; traces are not
+        # used then because a whole loop would run inside one slice
+        self.resumable = False
+        self.finished = True
+
+        # Program translated to Python for the python engine
+        self.python_program = None
+
+    @property
+    def global_memory(self):
+        return self.segments[SEG_GLOBAL]
+
+    @property
+    def constant_memory(self):
+        return self.segments[SEG_CONST]
+
+    @property
+    def current_local_memory(self):
+        return self.segments[SEG_LOCAL]
+
+    @current_local_memory.setter
+    def current_local_memory(self, memory):
+        self.segments[SEG_LOCAL] = memory
+
+    @property
+    def current_temp_memory(self):
+        return self.segments[SEG_TEMP]
+
+    @current_temp_memory.setter
+    def current_temp_memory(self, memory):
+        self.segments[SEG_TEMP] = memory
+
+    def load_program(self, program):
+        """Load a CompiledProgram, including per-function frame sizes."""
+        self.load_quadruples(program.quadruples)
+        self.set_constants(program.constants)
+        self.set_memory_layout(program.memory_layout)
+        self.address_ranges = program.get_address_ranges()
+        self.functions = program.functions
+        self.main_resource_needs = program.main_resource_needs
+        self.python_program = None
+        self.memo_caches = {}
+        if self.memoize:
+            for name, func_info in self.functions.items():
+                if func_info.is_pure:
+                    self.memo_caches[name] = MemoCache(self.memo_size, func_info.return_address)
+
     def load_quadruples(self, quadruples):
         self.quadruples = quadruples
+        # load_program() replaces them with the program's own ranges
+        self.address_ranges = ADDRESS_RANGES
+        self.memory_ready = False
+        self.code = []
+        self.python_program = None
 
     def set_constants(self, constants):
-        self.constant_memory = constants
+        self.constants = constants
+        self.memory_ready = False
+        self.code = []
+        self.python_program = None
+
+    def set_memory_layout(self, layout):
+        """Use the segment sizes reported by MemoryManager.get_memory_layout()."""
+        self.memory_layout = layout
+        self.memory_ready = False
+        self.code = []
+
+    def prepare_memory(self):
+        """Allocate one contiguous list per segment and build the address table.
+
+        Each type gets a run of slots inside its segment, so an address is
+        translated once into (segment, offset) and accessed by list indexing.
+        """
+        layout = self.memory_layout or self._infer_memory_layout()
+
+        if not self.functions:
+            # Without function metadata PARAM writes to 3000 + position,
+            # make sure those slots exist
+            param_count = 0
+            for quad in self.quadruples:
+                if quad.operator == 'PARAM':
+                    param_count = max(param_count, int(quad.result.replace('param', '')))
+            local_layout = dict(layout['local'])
+            local_layout['int'] = max(local_layout.get('int', 0), param_count)
+            layout = dict(layout, local=local_layout)
+
+        table_size = 0
+        for segment, type_, first, limit in self.address_ranges:
+            if layout[segment].get(type_, 0):
+                table_size = max(table_size, first + layout[segment][type_])
+        table = [None] * table_size
+
+        sizes = [0, 0, 0, 0]
+        type_offsets = {}
+        for segment, type_, first, limit in self.address_ranges:
+            count = layout[segment].get(type_, 0)
+            if count > limit - first:
+                raise Exception(f"Segmentation Fault: {segment} {type_} segment needs {count} slots")
+            index = SEGMENT_INDEX[segment]
+            type_offsets[(segment, type_)] = sizes[index]
+            for slot in range(count):
+                table[first + slot] = (index, sizes[index] + slot)
+            sizes[index] += count
+
+        self.address_table = table
+        self.segment_sizes = sizes
+        self.type_offsets = type_offsets
+
+        constant_memory = export_constants(self.constants, layout['const'], self.address_ranges)
+
+        self.segments[SEG_GLOBAL] = [None] * sizes[SEG_GLOBAL]
+        self.segments[SEG_CONST] = constant_memory
+        self._prepare_frames()
+        self.memory_ready = True
+
+    def _instructions(self):
+        """(ip, quad) for every instruction.
+
+        Bytecode programs hand out one reused cursor instead of building a
+        Quadruple per instruction, so callers read the fields right away.
+        """
+        cursor = getattr(self.quadruples, 'cursor', None)
+        if cursor is not None:
+            return cursor()
+        return enumerate(self.quadruples)
+
+    def _prepare_frames(self):
+        """Build the frame shape of every function from its resource_needs."""
+        default_params = []
+        for ip, quad in self._instructions():
+            if quad.operator == 'PARAM':
+                position = int(quad.result.replace('param', ''))
+                while len(default_params) < position:
+                    default_params.append(self.locate(3000 + len(default_params))[1])
+        self.default_frame_shape = FrameShape(self.segment_sizes[SEG_LOCAL],
+                                              self.segment_sizes[SEG_TEMP], default_params)
+
+        self.frame_shapes = {}
+        for name, func_info in self.functions.items():
+            if not func_info.resource_needs:
+                continue
+            param_offsets = [self.locate(func_info.var_table.get_address(param.name))[1]
+                             for param in func_info.params]
+            self.frame_shapes[name] = FrameShape(self._frame_size('local', func_info.resource_needs),
+                                                 self._frame_size('temp', func_info.resource_needs),
+                                                 param_offsets)
+            self.frame_shapes[name].memo = self.memo_caches.get(name)
+
+        if self.main_resource_needs:
+            main_shape = FrameShape(self._frame_size('local', self.main_resource_needs),
+                                    self._frame_size('temp', self.main_resource_needs), [])
+        else:
+            main_shape = self.default_frame_shape
+        self.current_record = ([None] * main_shape.local_size, [None] * main_shape.temp_size, main_shape)
+        self.segments[SEG_LOCAL] = self.current_record[0]
+        self.segments[SEG_TEMP] = self.current_record[1]
+        self.memory_stack.clear()
+        self.return_stack.clear()
+        self.memo_keys.clear()
+        if self.limited:
+            # Fuel charged per call: the length of the callee's body
+            self.function_sizes = {start: end - start for name, start, end
+                                   in find_regions(self.quadruples, self.functions)}
+
+    def _frame_size(self, segment, needs):
+        """Slots a frame needs to cover every offset used by a function."""
+        size = 0
+        for seg, type_, first, limit in self.address_ranges:
+            count = needs.get(f'{segment}_{type_}', 0)
+            if seg == segment and count:
+                size = max(size, self.type_offsets[(seg, type_)] + count)
+        return size
+
+    def _infer_memory_layout(self):
+        """Size every segment from the addresses the program actually uses."""
+        layout = {segment: {} for segment in SEGMENT_INDEX}
+        addresses = [int(address) for address in self.constants]
+        for quad in self.quadruples:
+            addresses.extend(get_reads(quad))
+            addresses.extend(get_writes(quad))
+
+        for address in addresses:
+            for segment, type_, first, limit in self.address_ranges:
+                if first <= address < limit:
+                    used = address - first + 1
+                    layout[segment][type_] = max(layout[segment].get(type_, 0), used)
+                    break
+        return layout
+
+    def allocate_frame(self, func_name):
+        """Take a frame for func_name from its free-list, or build a new one."""
+        shape = self.frame_shapes.get(func_name) or self.default_frame_shape
+        if shape.pool:
+            self.frames_reused += 1
+            record = shape.pool.pop()
+            # Locals start undefined on every call, temps are always written first
+            record[0][:] = shape.blank_locals
+            return record
+        self.frames_allocated += 1
+        return ([None] * shape.local_size, [None] * shape.temp_size, shape)
+
+    def release_frame(self, record):
+        record[2].pool.append(record)
+
+    def get_frame_stats(self):
+        """Frames built versus frames taken from a free-list."""
+        return {
+            'allocated': self.frames_allocated,
+            'reused': self.frames_reused,
+            'pooled': {name: len(shape.pool) for name, shape in self.frame_shapes.items()},
+        }
+
+    def flush_output(self):
+        """Write whatever the program printed and is still buffered."""
+        self.output.flush()
+
+    def get_output(self):
+        """Captured output when the VM was given a sink such as io.StringIO."""
+        return self.output.getvalue()
+
+    def reset_limits(self):
+        """Refill the fuel tank before a run."""
+        self.fuel[0] = self.max_instructions if self.max_instructions is not None else 0
+        self.live_slots = 0
+
+    def get_fuel_used(self):
+        if self.max_instructions is None:
+            return None
+        return self.max_instructions - self.fuel[0]
+
+    def _charge(self, cost, ip):
+        fuel = self.fuel
+        fuel[0] -= cost
+        if fuel[0] < 0:
+            raise ResourceLimitExceeded('instructions', self.max_instructions, ip)
+
+    def _enter_call(self, ip, start):
+        """Account for a call that just switched to the callee's frame."""
+        if self.max_instructions is not None:
+            self._charge(self.function_sizes.get(start, 1), ip)
+        if self.max_call_depth is not None and len(self.memory_stack) > self.max_call_depth:
+            raise ResourceLimitExceeded('call_depth', self.max_call_depth, ip)
+        if self.max_frame_slots is not None:
+            shape = self.current_record[2]
+            self.live_slots += shape.local_size + shape.temp_size
+            if self.live_slots > self.max_frame_slots:
+                raise ResourceLimitExceeded('frame_slots', self.max_frame_slots, ip)
+
+    def _leave_call(self):
+        if self.max_frame_slots is not None:
+            shape = self.current_record[2]
+            self.live_slots -= shape.local_size + shape.temp_size
+
+    def get_memo_stats(self):
+        """Hits, misses and cached results of every memoized function."""
+        return {name: {'hits': memo.hits, 'misses': memo.misses, 'size': len(memo.entries)}
+                for name, memo in self.memo_caches.items()}
+
+    def _memo_call(self, record):
+        """Answer a call from the callee's cache, or remember its key for ENDFUNC."""
+        memo = record[2].memo
+        key = tuple(record[0][offset] for offset in record[2].param_offsets)
+        value = memo.lookup(key)
+        if value is MISSING:
+            self.memo_keys.append(key)
+            return False
+        self.release_frame(record)
+        self.pending_activation_record = None
+        self.set_value(memo.return_address, value)
+        return True
+
+    def locate(self, address):
+        """Translate an address into its (segment, offset) pair."""
+        address = int(address)
+        if 0 <= address < len(self.address_table):
+            location = self.address_table[address]
+            if location is not None:
+                return location
+        raise Exception(f"Segmentation Fault: Address {address} out of range")
 
     def get_value(self, address):
         address = int(address)
-        
-        # Global: 1000-2999
-        if 1000 <= address < 3000:
-            return self.global_memory.get(address)
-            
-        # Local: 3000-4999
-        elif 3000 <= address < 5000:
-            return self.current_local_memory.get(address)
-            
-        # Temp: 5000-6999
-        elif 5000 <= address < 7000:
-            return self.current_temp_memory.get(address)
-            
-        # Constant: 7000-9999
-        elif 7000 <= address < 10000:
-            return self.constant_memory.get(address)
-            
-        else:
-            raise Exception(f"Segmentation Fault: Address {address} out of range")
+        if address >= 0:
+            try:
+                segment, offset = self.address_table[address]
+            except (IndexError, TypeError):
+                pass
+            else:
+                return self.segments[segment][offset]
+        raise Exception(f"Segmentation Fault: Address {address} out of range")
 
     def set_value(self, address, value):
         address = int(address)
-        
-        # Global
-        if 1000 <= address < 3000:
-            self.global_memory[address] = value
-            
-        # Local
-        elif 3000 <= address < 5000:
-            self.current_local_memory[address] = value
-            
-        # Temp
-        elif 5000 <= address < 7000:
-            self.current_temp_memory[address] = value
-            
-        # Constant (Should be read-only, but for initialization...)
-        elif 7000 <= address < 10000:
-            raise Exception("Segmentation Fault: Cannot write to constant memory")
-            
-        else:
-            raise Exception(f"Segmentation Fault: Address {address} out of range")
+        if address >= 0:
+            try:
+                segment, offset = self.address_table[address]
+            except (IndexError, TypeError):
+                pass
+            else:
+                # Constant (read-only)
+                if segment == SEG_CONST:
+                    raise Exception("Segmentation Fault: Cannot write to constant memory")
+                self.segments[segment][offset] = value
+                return
+        raise Exception(f"Segmentation Fault: Address {address} out of range")
 
     def execute(self):
+        self.reset_limits()
+        if self.profile:
+            return self.execute_profiled()
+        if self.engine == 'dispatch':
+            return self.execute_dispatch()
+        if self.engine == 'python':
+            return self.execute_python()
+
         print("--- VIRTUAL MACHINE ---")
+        if not self.memory_ready:
+            self.prepare_memory()
         self.instruction_pointer = 0
         
         while self.instruction_pointer < len(self.quadruples):
@@ -93,6 +548,11 @@ class VirtualMachine:
                         self.set_value(res, val_l - val_r)
                     self.instruction_pointer += 1
                     
+                elif op == 'unary-':
+                    val_l = self.get_value(left)
+                    self.set_value(res, -val_l)
+                    self.instruction_pointer += 1
+
                 elif op == '*':
                     val_l = self.get_value(left)
                     val_r = self.get_value(right)
@@ -130,11 +590,19 @@ class VirtualMachine:
                     
                 elif op == 'PRINT':
                     val = self.get_value(left)
-                    print(val)
+                    self.output.write_line(val)
+                    self.instruction_pointer += 1
+                    
+                elif op == 'PRINT_ITEM':
+                    val = self.get_value(left)
+                    self.output.write_item(val)
                     self.instruction_pointer += 1
                     
                 elif op == 'GOTO':
-                    self.instruction_pointer = int(res)
+                    target = int(res)
+                    if target <= self.instruction_pointer and self.max_instructions is not None:
+                        self._charge(self.instruction_pointer - target + 1, self.instruction_pointer)
+                    self.instruction_pointer = target
                     
                 elif op == 'GOTOF':
                     cond = self.get_value(left)
@@ -143,47 +611,714 @@ class VirtualMachine:
                     else:
                         self.instruction_pointer += 1
                         
+                elif op == 'GOTO_IF_NOT_LT':
+                    if not (self.get_value(left) < self.get_value(right)):
+                        self.instruction_pointer = int(res)
+                    else:
+                        self.instruction_pointer += 1
+                        
+                elif op == 'GOTO_IF_NOT_GT':
+                    if not (self.get_value(left) > self.get_value(right)):
+                        self.instruction_pointer = int(res)
+                    else:
+                        self.instruction_pointer += 1
+                        
+                elif op == 'GOTO_IF_NOT_NE':
+                    if not (self.get_value(left) != self.get_value(right)):
+                        self.instruction_pointer = int(res)
+                    else:
+                        self.instruction_pointer += 1
+                        
                 elif op == 'ERA':
                     # Create a new memory context
-                    self.pending_activation_record = {'local': {}, 'temp': {}}
+                    self.pending_activation_record = self.allocate_frame(left)
                     self.instruction_pointer += 1
                     
                 elif op == 'PARAM':
                     val = self.get_value(left)
                     param_index = int(res.replace('param', '')) - 1
-                    target_addr = 3000 + param_index
+                    record = self.pending_activation_record
+                    offset = record[2].param_offsets[param_index]
                     
-                    self.pending_activation_record['local'][target_addr] = val
+                    record[0][offset] = val
                     self.instruction_pointer += 1
                     
                 elif op == 'GOSUB':
+                    record = self.pending_activation_record
+                    if record[2].memo is not None and self._memo_call(record):
+                        self.instruction_pointer += 1
+                        continue
+                    
                     # Save current state
-                    self.memory_stack.append((self.current_local_memory, self.current_temp_memory))
+                    self.memory_stack.append(self.current_record)
                     self.return_stack.append(self.instruction_pointer + 1)
                     
                     # Switch to new state
-                    self.current_local_memory = self.pending_activation_record['local']
-                    self.current_temp_memory = self.pending_activation_record['temp']
+                    self.current_record = self.pending_activation_record
+                    self.current_local_memory = self.current_record[0]
+                    self.current_temp_memory = self.current_record[1]
                     self.pending_activation_record = None
                     
                     func_name = left
 
+                    if self.limited:
+                        self._enter_call(self.instruction_pointer, int(left))
+                    self.instruction_pointer = int(left)
+                    
+                elif op == 'CALL_AND_STORE':
+                    # GOSUB that also copies the return slot into res on return
+                    record = self.pending_activation_record
+                    if record[2].memo is not None and self._memo_call(record):
+                        self.set_value(res, self.get_value(right))
+                        self.instruction_pointer += 1
+                        continue
+                    
+                    self.memory_stack.append(self.current_record)
+                    self.return_stack.append((self.instruction_pointer + 1, right, res))
+                    
+                    self.current_record = self.pending_activation_record
+                    self.current_local_memory = self.current_record[0]
+                    self.current_temp_memory = self.current_record[1]
+                    self.pending_activation_record = None
+                    
+                    if self.limited:
+                        self._enter_call(self.instruction_pointer, int(left))
                     self.instruction_pointer = int(left)
                     
                 elif op == 'ENDFUNC':
-                    prev_local, prev_temp = self.memory_stack.pop()
-                    self.current_local_memory = prev_local
-                    self.current_temp_memory = prev_temp
+                    memo = self.current_record[2].memo
+                    if memo is not None:
+                        memo.store(self.memo_keys.pop(), self.get_value(memo.return_address))
+                    if self.limited:
+                        self._leave_call()
+                    self.release_frame(self.current_record)
+                    self.current_record = self.memory_stack.pop()
+                    self.current_local_memory = self.current_record[0]
+                    self.current_temp_memory = self.current_record[1]
                     
                     ret_addr = self.return_stack.pop()
+                    if isinstance(ret_addr, tuple):
+                        ret_addr, source, target = ret_addr
+                        self.set_value(target, self.get_value(source))
                     self.instruction_pointer = ret_addr
                     
                 else:
                     raise Exception(f"Unknown operator: {op}")
                     
+            except ResourceLimitExceeded:
+                self.output.flush()
+                raise
             except Exception as e:
+                self.output.flush()
                 print(f"Error at quadruple {self.instruction_pointer}: {quad}")
                 print(e)
                 sys.exit(1)
 
+        self.output.flush()
+        print("--- PROGRAM FINISHED ---")
+
+    # ------------------------------------------------------------------
+    # Python engine
+    # ------------------------------------------------------------------
+
+    def execute_python(self):
+        """Run the program translated ahead of time to Python source."""
+        print("--- VIRTUAL MACHINE ---")
+        if not self.memory_ready:
+            self.prepare_memory()
+        if self.python_program is None:
+            self.python_program = compile_to_python(self.quadruples, self.constants, self.functions,
+                                                    self.address_ranges)
+
+        try:
+            self.python_program.run(memo=self.memo_caches, output=self.output)
+        except Exception as e:
+            ip = self.python_program.quad_from_traceback(e.__traceback__)
+            quad = self.quadruples[ip] if ip is not None else None
+            self.output.flush()
+            print(f"Error at quadruple {ip}: {quad}")
+            print(e)
+            sys.exit(1)
+
+        # Leave the final globals where the other engines would
+        for address, value in self.python_program.get_globals().items():
+            segment, offset = self.locate(address)
+            self.segments[segment][offset] = value
+        self.instruction_pointer = len(self.quadruples)
+        self.output.flush()
+        print("--- PROGRAM FINISHED ---")
+
+    # ------------------------------------------------------------------
+    # Dispatch engine
+    # ------------------------------------------------------------------
+
+    def decode(self):
+        """Turn the quadruple list into integer opcodes and pre-bound handlers.
+
+        Every handler is a closure with its operands already resolved to a
+        (segment, offset) pair; calling it performs the instruction and returns
+        the index of the next one.
+        """
+        if not self.memory_ready:
+            self.prepare_memory()
+        factories = self._handler_factories()
+
+        self.hot_loops = {}
+        self.opcodes = []
+        self.code = []
+        # ERA index -> function, PARAM handlers look up the frame being filled
+        self.era_functions = {}
+        for ip, quad in self._instructions():
+            opcode = OPCODES.get(quad.operator)
+            if opcode is None:
+                raise Exception(f"Unknown operator: {quad.operator} at quadruple {ip}")
+            if opcode == OPCODES['ERA']:
+                self.era_functions[ip] = quad.operand1
+            self.opcodes.append(opcode)
+            self.code.append(factories[opcode](ip, quad))
+        return self.code
+
+    def execute_dispatch(self):
+        print("--- VIRTUAL MACHINE ---")
+        if self.resumable:
+            # Decoded for start()/step(), without the tracing JIT
+            self.resumable = False
+            self.code = []
+        if not self.code:
+            self.decode()
+        self.instruction_pointer = 0
+
+        code = self.code
+        end = len(code)
+        ip = 0
+        try:
+            while ip < end:
+                ip = code[ip]()
+        except ResourceLimitExceeded:
+            self.instruction_pointer = ip
+            self.output.flush()
+            raise
+        except Exception as e:
+            self.instruction_pointer = ip
+            self.output.flush()
+            print(f"Error at quadruple {ip}: {self.quadruples[ip]}")
+            print(e)
+            sys.exit(1)
+
+        self.instruction_pointer = ip
+        self.output.flush()
+        print("--- PROGRAM FINISHED ---")
+
+    # ------------------------------------------------------------------
+    # Resumable execution
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Begin a run that step() advances a slice at a time."""
+        print("--- VIRTUAL MACHINE ---")
+        self.reset_limits()
+        if not self.resumable:
+            self.resumable = True
+            self.code = []
+        if not self.code:
+            self.decode()
+        if self.finished:
+            self.instruction_pointer = 0
+        self.finished = False
+
+    def step(self, n=1000):
+        """Run at most n instructions and return True while the program has more.
+
+        All the state (instruction_pointer, memory_stack, return_stack and
+        the current frames) lives on the VM, so a run can be resumed at any
+        point and several VMs can be interleaved. Unlike execute(), errors
+        are raised after being reported so one session can fail alone.
+        """
+        code = self.code
+        end = len(code)
+        ip = self.instruction_pointer
+        try:
+            while n > 0 and ip < end:
+                ip = code[ip]()
+                n -= 1
+        except Exception as e:
+            self.instruction_pointer = ip
+            self.finished = True
+            self.output.flush()
+            if not isinstance(e, ResourceLimitExceeded):
+                print(f"Error at quadruple {ip}: {self.quadruples[ip]}")
+                print(e)
+            raise
+
+        self.instruction_pointer = ip
+        if ip < end:
+            return True
+        self.finished = True
+        self.output.flush()
+        print("--- PROGRAM FINISHED ---")
+        return False
+
+    async def run(self, slice_size=1000):
+        """Run the program, yielding to the event loop every slice_size instructions."""
+        self.start()
+        while self.step(slice_size):
+            await asyncio.sleep(0)
+
+    def execute_profiled(self):
+        """Run the decoded program counting quadruples and timing function calls."""
+        print("--- VIRTUAL MACHINE ---")
+        if not self.code:
+            self.decode()
+        self.instruction_pointer = 0
+
+        code = self.code
+        opcodes = self.opcodes
+        end = len(code)
+        counts = [0] * end
+        call_opcodes = (OPCODES['GOSUB'], OPCODES['CALL_AND_STORE'])
+        endfunc = OPCODES['ENDFUNC']
+        names = {func_info.start_quad: name for name, func_info in self.functions.items()}
+        calls = {'main': 1}
+        inclusive = {'main': 0.0}
+        exclusive = {'main': 0.0}
+        clock = time.perf_counter
+        # Active calls per function, so recursion adds inclusive time only once
+        depth = {}
+
+        # [function, start time, time spent in callees] for every active call
+        started = clock()
+        active = [['main', started, 0.0]]
+        ip = 0
+        try:
+            while ip < end:
+                counts[ip] += 1
+                opcode = opcodes[ip]
+                nxt = code[ip]()
+                if opcode in call_opcodes and nxt != ip + 1:
+                    # A memoized call answered from the cache never enters the callee
+                    name = names.get(nxt, f"func_{nxt}")
+                    calls[name] = calls.get(name, 0) + 1
+                    depth[name] = depth.get(name, 0) + 1
+                    active.append([name, clock(), 0.0])
+                elif opcode == endfunc:
+                    name, start, children = active.pop()
+                    elapsed = clock() - start
+                    depth[name] -= 1
+                    if not depth[name]:
+                        inclusive[name] = inclusive.get(name, 0.0) + elapsed
+                    exclusive[name] = exclusive.get(name, 0.0) + elapsed - children
+                    active[-1][2] += elapsed
+                ip = nxt
+        except ResourceLimitExceeded:
+            self.instruction_pointer = ip
+            self.output.flush()
+            raise
+        except Exception as e:
+            self.instruction_pointer = ip
+            self.output.flush()
+            print(f"Error at quadruple {ip}: {self.quadruples[ip]}")
+            print(e)
+            sys.exit(1)
+
+        total = clock() - started
+        inclusive['main'] = total
+        exclusive['main'] = total - active[0][2]
+        self.last_profile = Profile(self.quadruples, self.functions, counts, calls,
+                                    inclusive, exclusive, total)
+        self.instruction_pointer = ip
+        self.output.flush()
         print("--- PROGRAM FINISHED ---")
+
+    def get_profile(self):
+        """Profile of the last profiled run, or None."""
+        return self.last_profile
+
+    def _handler_factories(self):
+        factories = [None] * len(OPCODES)
+        factories[OPCODES['+']] = self._binary_handler(operator.add)
+        factories[OPCODES['-']] = self._binary_handler(operator.sub)
+        factories[OPCODES['*']] = self._binary_handler(operator.mul)
+        factories[OPCODES['/']] = self._binary_handler(operator.truediv)
+        factories[OPCODES['>']] = self._binary_handler(operator.gt)
+        factories[OPCODES['<']] = self._binary_handler(operator.lt)
+        factories[OPCODES['!=']] = self._binary_handler(operator.ne)
+        factories[OPCODES['=']] = self._make_assign
+        factories[OPCODES['unary-']] = self._make_negate
+        factories[OPCODES['PRINT']] = self._make_print
+        factories[OPCODES['PRINT_ITEM']] = self._make_print
+        factories[OPCODES['GOTO']] = self._make_goto
+        factories[OPCODES['GOTOF']] = self._make_gotof
+        factories[OPCODES['ERA']] = self._make_era
+        factories[OPCODES['PARAM']] = self._make_param
+        factories[OPCODES['GOSUB']] = self._make_gosub
+        factories[OPCODES['ENDFUNC']] = self._make_endfunc
+        factories[OPCODES['GOTO_IF_NOT_LT']] = self._branch_handler(operator.lt)
+        factories[OPCODES['GOTO_IF_NOT_GT']] = self._branch_handler(operator.gt)
+        factories[OPCODES['GOTO_IF_NOT_NE']] = self._branch_handler(operator.ne)
+        factories[OPCODES['CALL_AND_STORE']] = self._make_call_and_store
+        if self.limited:
+            for name in CALL_OPERATORS:
+                factories[OPCODES[name]] = self._metered_call(factories[OPCODES[name]])
+            factories[OPCODES['ENDFUNC']] = self._metered_return(factories[OPCODES['ENDFUNC']])
+        return factories
+
+    def _metered_call(self, factory):
+        def metered_factory(ip, quad):
+            call = factory(ip, quad)
+            memory_stack = self.memory_stack
+            fuel = self.fuel
+            cost = self.function_sizes.get(int(quad.operand1), 1)
+            charge_fuel = self.max_instructions is not None
+            max_depth = self.max_call_depth if self.max_call_depth is not None else float('inf')
+            count_slots = self.max_frame_slots is not None
+            nxt = ip + 1
+
+            def handler():
+                target = call()
+                if target != nxt:
+                    # Entered the callee (not answered from a memo cache)
+                    if charge_fuel:
+                        fuel[0] -= cost
+                        if fuel[0] < 0:
+                            raise ResourceLimitExceeded('instructions', self.max_instructions, ip)
+                    if len(memory_stack) > max_depth:
+                        raise ResourceLimitExceeded('call_depth', self.max_call_depth, ip)
+                    if count_slots:
+                        shape = self.current_record[2]
+                        self.live_slots += shape.local_size + shape.temp_size
+                        if self.live_slots > self.max_frame_slots:
+                            raise ResourceLimitExceeded('frame_slots', self.max_frame_slots, ip)
+                return target
+            return handler
+        return metered_factory
+
+    def _metered_return(self, factory):
+        def metered_factory(ip, quad):
+            endfunc = factory(ip, quad)
+            if self.max_frame_slots is None:
+                return endfunc
+
+            def handler():
+                shape = self.current_record[2]
+                self.live_slots -= shape.local_size + shape.temp_size
+                return endfunc()
+            return handler
+        return metered_factory
+
+    def _binary_handler(self, fn):
+        def factory(ip, quad):
+            segs = self.segments
+            if quad.operand2 is None:
+                # '-' may arrive as unary minus with no right operand
+                return self._make_negate(ip, quad)
+            sl, kl = self.locate(quad.operand1)
+            sr, kr = self.locate(quad.operand2)
+            sd, kd = self.locate(quad.result)
+            nxt = ip + 1
+
+            def handler():
+                segs[sd][kd] = fn(segs[sl][kl], segs[sr][kr])
+                return nxt
+            return handler
+        return factory
+
+    def _branch_handler(self, fn):
+        def factory(ip, quad):
+            segs = self.segments
+            sl, kl = self.locate(quad.operand1)
+            sr, kr = self.locate(quad.operand2)
+            target = int(quad.result)
+            nxt = ip + 1
+
+            def handler():
+                if fn(segs[sl][kl], segs[sr][kr]):
+                    return nxt
+                return target
+            return handler
+        return factory
+
+    def _make_assign(self, ip, quad):
+        segs = self.segments
+        ss, ks = self.locate(quad.operand1)
+        sd, kd = self.locate(quad.result)
+        nxt = ip + 1
+
+        def handler():
+            segs[sd][kd] = segs[ss][ks]
+            return nxt
+        return handler
+
+    def _make_negate(self, ip, quad):
+        segs = self.segments
+        ss, ks = self.locate(quad.operand1)
+        sd, kd = self.locate(quad.result)
+        nxt = ip + 1
+
+        def handler():
+            segs[sd][kd] = -segs[ss][ks]
+            return nxt
+        return handler
+
+    def _make_print(self, ip, quad):
+        segs = self.segments
+        ss, ks = self.locate(quad.operand1)
+        write = self.output.write_line if quad.operator == 'PRINT' else self.output.write_item
+        nxt = ip + 1
+
+        def handler():
+            write(segs[ss][ks])
+            return nxt
+        return handler
+
+    def _make_goto(self, ip, quad):
+        target = int(quad.result)
+        if target <= ip and self.jit and not self.profile and not self.resumable:
+            return self._make_back_edge(ip, target)
+        if target <= ip and self.max_instructions is not None:
+            charge = self._charge
+            cost = ip - target + 1
+
+            def metered_handler():
+                charge(cost, ip)
+                return target
+            return metered_handler
+
+        def handler():
+            return target
+        return handler
+
+    def _make_back_edge(self, ip, header):
+        """Backward GOTO of a while loop that counts its hits and runs the loop's trace."""
+        segs = self.segments
+        stats = self.jit_stats
+        threshold = self.jit_threshold
+        loop = self.hot_loops[header] = HotLoop(header, ip)
+        metered = self.max_instructions is not None
+        fuel = self.fuel
+        charge = self._charge
+        cost = ip - header + 1
+
+        def handler():
+            if metered:
+                charge(cost, ip)
+            trace = loop.trace
+            if trace is not None:
+                stats['trace_runs'] += 1
+                nxt = trace(segs)
+                if metered and fuel[0] < 0:
+                    raise ResourceLimitExceeded('instructions', self.max_instructions, ip)
+                if nxt != loop.exit:
+                    stats['bailouts'] += 1
+                    loop.bailouts += 1
+                    if loop.bailouts >= threshold:
+                        # The recorded path is not the common one any more
+                        stats['retraced'] += 1
+                        loop.trace = None
+                        loop.hits = loop.bailouts = 0
+                return nxt
+            loop.hits += 1
+            if loop.hits >= threshold and not loop.aborted:
+                return self._record_trace(loop)
+            return header
+        return handler
+
+    def _record_trace(self, loop):
+        """Run one iteration of a hot loop through the handlers, recording its path.
+
+        Returns the index the interpreter continues at. The recording is
+        abandoned for loops that call functions or contain other loops.
+        """
+        code = self.code
+        quadruples = self.quadruples
+        path = []
+        ip = loop.header
+        while ip != loop.back_edge:
+            if not loop.header <= ip < loop.back_edge:
+                # Left the loop while recording, try again next time
+                return ip
+            if quadruples[ip].operator not in TRACEABLE:
+                loop.aborted = True
+                self.jit_stats['traces_aborted'] += 1
+                return ip
+            nxt = code[ip]()
+            path.append(ip)
+            if nxt <= ip:
+                # Inner loop; only innermost loops are traced
+                loop.aborted = True
+                self.jit_stats['traces_aborted'] += 1
+                return nxt
+            ip = nxt
+
+        loop.trace, loop.source = compile_trace(
+            quadruples, path, loop, self.locate, self.constants, self.output,
+            self.fuel if self.max_instructions is not None else None)
+        self.jit_stats['traces_compiled'] += 1
+        return loop.back_edge
+
+    def get_jit_stats(self):
+        """Traces compiled and aborted, trace runs and guard bailouts."""
+        return dict(self.jit_stats)
+
+    def _make_gotof(self, ip, quad):
+        segs = self.segments
+        ss, ks = self.locate(quad.operand1)
+        target = int(quad.result)
+        nxt = ip + 1
+
+        def handler():
+            if segs[ss][ks]:
+                return nxt
+            return target
+        return handler
+
+    def _make_era(self, ip, quad):
+        shape = self.frame_shapes.get(quad.operand1) or self.default_frame_shape
+        pool = shape.pool
+        blank_locals = shape.blank_locals
+        local_size = shape.local_size
+        temp_size = shape.temp_size
+        nxt = ip + 1
+
+        def handler():
+            if pool:
+                self.frames_reused += 1
+                record = pool.pop()
+                record[0][:] = blank_locals
+            else:
+                self.frames_allocated += 1
+                record = ([None] * local_size, [None] * temp_size, shape)
+            self.pending_activation_record = record
+            return nxt
+        return handler
+
+    def _make_param(self, ip, quad):
+        segs = self.segments
+        ss, ks = self.locate(quad.operand1)
+        # PARAM always follows the ERA of the function being called
+        era = ip
+        while self.opcodes[era] != OPCODES['ERA']:
+            era -= 1
+        shape = self.frame_shapes.get(self.era_functions[era]) or self.default_frame_shape
+        target = shape.param_offsets[int(quad.result.replace('param', '')) - 1]
+        nxt = ip + 1
+
+        def handler():
+            self.pending_activation_record[0][target] = segs[ss][ks]
+            return nxt
+        return handler
+
+    def _callee_memo(self, start):
+        for name, func_info in self.functions.items():
+            if func_info.start_quad == start:
+                return self.memo_caches.get(name)
+        return None
+
+    def _make_memo_call(self, ip, quad, memo):
+        """GOSUB / CALL_AND_STORE into a memoized function."""
+        segs = self.segments
+        memory_stack = self.memory_stack
+        return_stack = self.return_stack
+        memo_keys = self.memo_keys
+        lookup = memo.lookup
+        target = int(quad.operand1)
+        sg, kg = self.locate(memo.return_address)
+        nxt = ip + 1
+        ret = nxt
+        sd = kd = None
+        if quad.operator == 'CALL_AND_STORE':
+            sd, kd = self.locate(quad.result)
+            ret = (nxt, sg, kg, sd, kd)
+
+        def handler():
+            record = self.pending_activation_record
+            key = tuple([record[0][offset] for offset in record[2].param_offsets])
+            value = lookup(key)
+            if value is not MISSING:
+                record[2].pool.append(record)
+                self.pending_activation_record = None
+                segs[sg][kg] = value
+                if sd is not None:
+                    segs[sd][kd] = value
+                return nxt
+            memo_keys.append(key)
+            memory_stack.append(self.current_record)
+            return_stack.append(ret)
+            self.current_record = record
+            segs[SEG_LOCAL] = record[0]
+            segs[SEG_TEMP] = record[1]
+            self.pending_activation_record = None
+            return target
+        return handler
+
+    def _make_gosub(self, ip, quad):
+        memo = self._callee_memo(int(quad.operand1))
+        if memo is not None:
+            return self._make_memo_call(ip, quad, memo)
+        segs = self.segments
+        memory_stack = self.memory_stack
+        return_stack = self.return_stack
+        target = int(quad.operand1)
+        nxt = ip + 1
+
+        def handler():
+            memory_stack.append(self.current_record)
+            return_stack.append(nxt)
+            record = self.current_record = self.pending_activation_record
+            segs[SEG_LOCAL] = record[0]
+            segs[SEG_TEMP] = record[1]
+            self.pending_activation_record = None
+            return target
+        return handler
+
+    def _make_call_and_store(self, ip, quad):
+        memo = self._callee_memo(int(quad.operand1))
+        if memo is not None:
+            return self._make_memo_call(ip, quad, memo)
+        segs = self.segments
+        memory_stack = self.memory_stack
+        return_stack = self.return_stack
+        target = int(quad.operand1)
+        ss, ks = self.locate(quad.operand2)
+        sd, kd = self.locate(quad.result)
+        # ENDFUNC performs the store once the caller's frame is back
+        ret = (ip + 1, ss, ks, sd, kd)
+
+        def handler():
+            memory_stack.append(self.current_record)
+            return_stack.append(ret)
+            record = self.current_record = self.pending_activation_record
+            segs[SEG_LOCAL] = record[0]
+            segs[SEG_TEMP] = record[1]
+            self.pending_activation_record = None
+            return target
+        return handler
+
+    def _make_endfunc(self, ip, quad):
+        segs = self.segments
+        memory_stack = self.memory_stack
+        return_stack = self.return_stack
+
+        def handler():
+            record = self.current_record
+            record[2].pool.append(record)
+            record = self.current_record = memory_stack.pop()
+            segs[SEG_LOCAL] = record[0]
+            segs[SEG_TEMP] = record[1]
+            ret = return_stack.pop()
+            if ret.__class__ is tuple:
+                nxt, ss, ks, sd, kd = ret
+                segs[sd][kd] = segs[ss][ks]
+                return nxt
+            return ret
+
+        if not self.memo_caches:
+            return handler
+        memo_keys = self.memo_keys
+        plain = handler
+
+        def memo_handler():
+            memo = self.current_record[2].memo
+            if memo is not None:
+                memo.store(memo_keys.pop(), self.get_value(memo.return_address))
+            return plain()
+        return memo_handler
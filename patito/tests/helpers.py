@@ -0,0 +1,39 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+def read_file(file_name):
+    with open(os.path.join(current_dir, file_name)) as f:
+        return f.read()
+
+def parse_source(codigo, **options):
+    parser = PatitoParser(**options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(codigo)
+    return parser
+
+def compile_source(codigo, recycle_temps=True, **options):
+    return parse_source(codigo, **options).get_program(recycle_temps=recycle_temps)
+
+def compile_file(file_name, recycle_temps=True, **options):
+    return compile_source(read_file(file_name), recycle_temps, **options)
+
+def execute(program, engine='loop', **options):
+    # Solo lo que imprime el programa, sin los encabezados de la VM
+    output = io.StringIO()
+    vm = VirtualMachine(engine=engine, output=output, **options)
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    return output.getvalue(), vm
+
+def run_vm(program, engine='loop', **options):
+    return execute(program, engine, **options)[0]
@@ -0,0 +1,72 @@
+import sys
+import os
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source, run_vm
+from optimizer import fuse_superinstructions
+from bytecode import write_bytecode, load_bytecode
+from memory_manager import ADDRESS_RANGES, DEFAULT_SEGMENT_SIZES, build_address_ranges
+
+def big_program(statements, var_type='int', step='1'):
+    lines = ["program big;", f"var c : {var_type};", "main() {", "    c = 0;"]
+    for _ in range(statements):
+        lines.append(f"    c = c + {step};")
+    lines += ["    print(c);", "}", "end"]
+    return "\n".join(lines)
+
+def test_default_layout_unchanged():
+    print("="*60)
+    print("TEST: LAYOUT POR DEFECTO")
+    print("="*60)
+
+    assert build_address_ranges()[4] == ('temp', 'int', 5000, 6000)
+    assert build_address_ranges()[6] == ('temp', 'bool', 6900, 7000)
+    program = compile_source(big_program(10))
+    assert program.get_address_ranges() == ADDRESS_RANGES
+
+def test_segments_grow_with_the_program():
+    print("="*60)
+    print("TEST: SEGMENTOS QUE CRECEN")
+    print("="*60)
+
+    # 1500 temporales enteros o 1000 flotantes no caben en el layout por defecto;
+    # antes los flotantes pasados de 900 caian sobre los booleanos
+    for codigo, expected in [(big_program(1500), "1500\n"), (big_program(1000, 'float', '1.5'), "1500.0\n")]:
+        program = compile_source(codigo)
+        ranges = {(segment, type_): limit - first for segment, type_, first, limit in program.get_address_ranges()}
+        print(ranges[('temp', 'int')], ranges[('temp', 'float')])
+        assert program.get_address_ranges() != ADDRESS_RANGES
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(program, engine) == expected
+        assert run_vm(fuse_superinstructions(program)[0], 'dispatch') == expected
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'big.ptc')
+            write_bytecode(program, path)
+            with load_bytecode(path) as loaded:
+                assert loaded.get_address_ranges() == program.get_address_ranges()
+                assert run_vm(loaded, 'dispatch') == expected
+
+def test_fixed_segments_overflow_at_compile_time():
+    print("="*60)
+    print("TEST: DESBORDE DE SEGMENTO")
+    print("="*60)
+
+    try:
+        compile_source(big_program(1500), segment_sizes=DEFAULT_SEGMENT_SIZES)
+        assert False, "Expected a segment overflow"
+    except Exception as e:
+        print(e)
+        assert "Segment overflow" in str(e) and "temp int" in str(e)
+
+    program = compile_source(big_program(1500), segment_sizes={('temp', 'int'): 2000})
+    assert run_vm(program, 'dispatch') == "1500\n"
+
+if __name__ == "__main__":
+    test_default_layout_unchanged()
+    test_segments_grow_with_the_program()
+    test_fixed_segments_overflow_at_compile_time()
@@ -0,0 +1,65 @@
+import sys
+import os
+import io
+import asyncio
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file
+from virtual_machine import VirtualMachine
+
+def test_step_resumes():
+    print("="*60)
+    print("TEST: EJECUCION POR PASOS")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito')
+    vm = VirtualMachine(output=io.StringIO())
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.start()
+        assert vm.step(5000)
+        # Entre pasos el estado queda guardado en la VM, a media recursion
+        assert vm.memory_stack and vm.return_stack
+        slices = 1
+        while vm.step(5000):
+            slices += 1
+    print(f"{slices} pasos")
+    assert slices == 207967 // 5000
+    assert vm.get_output() == "fib(20) = 6765\n"
+    assert not vm.memory_stack and not vm.return_stack
+
+def test_async_sessions_interleave():
+    print("="*60)
+    print("TEST: SESIONES ASYNCIO")
+    print("="*60)
+
+    programs = [compile_file('fib_recursive.patito'), compile_file('factorial.patito'),
+                compile_file('fibonacci.patito')]
+    finished = []
+
+    async def session(name, program):
+        vm = VirtualMachine(output=io.StringIO())
+        vm.load_program(program)
+        await vm.run(slice_size=100)
+        finished.append(name)
+        return vm.get_output()
+
+    async def main():
+        return await asyncio.gather(*(session(i, program) for i, program in enumerate(programs)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        outputs = asyncio.run(main())
+    print(finished)
+    assert outputs[0] == "fib(20) = 6765\n"
+    assert outputs[1] == "Factorial of 5 is 120\nFactorial of 6 is 720\n"
+    assert outputs[2].endswith("34\n")
+    # Las sesiones cortas no esperan a que termine la larga
+    assert finished[-1] == 0
+
+if __name__ == "__main__":
+    test_step_resumes()
+    test_async_sessions_interleave()
@@ -0,0 +1,72 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import read_file
+from parser import PatitoParser
+from quadruple_generator import Quadruple
+from batch import run_many, run_program
+
+BROKEN = """
+program broken;
+var x : int;
+main() {
+    x = ;
+}
+end
+"""
+
+def test_run_many():
+    print("="*60)
+    print("TEST: EJECUCION EN LOTE")
+    print("="*60)
+
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(read_file('factorial.patito'))
+    compiled = parser.get_program()
+
+    programs = [
+        read_file('fibonacci.patito'),
+        read_file('fib_recursive.patito'),
+        compiled,
+        ([Quadruple('PRINT_ITEM', 9000, None, None), Quadruple('PRINT', 9001, None, None)],
+         {9000: 'hola', 9001: 'mundo'}),
+        BROKEN,
+    ]
+    results = {result.index: result for result in run_many(programs, max_workers=2, engine='dispatch')}
+    for index in sorted(results):
+        print(results[index], repr(results[index].output[:30]))
+
+    assert len(results) == len(programs)
+    assert results[0].ok and results[0].output.endswith("34\n")
+    assert results[1].output == "fib(20) = 6765\n"
+    assert results[2].output == "Factorial of 5 is 120\nFactorial of 6 is 720\n"
+    assert results[3].output == "hola mundo\n"
+    assert results[4].status == 'compile_error'
+    assert results[4].exit_code == 1
+
+def test_run_program_reports_failures():
+    print("="*60)
+    print("TEST: EJECUCION EN LOTE - ERRORES")
+    print("="*60)
+
+    # Division entre cero en tiempo de ejecucion
+    quads = [Quadruple('/', 7000, 7001, 6000), Quadruple('PRINT', 6000, None, None)]
+    result = run_program(0, (quads, {7000: 1, 7001: 0}), {'engine': 'loop'})
+    print(result, result.error)
+    assert result.status == 'runtime_error'
+    assert result.exit_code == 1
+
+    loop = [Quadruple('GOTO', None, None, '0')]
+    result = run_program(1, (loop, {}), {'max_instructions': 100})
+    assert result.status == 'limit_exceeded'
+
+if __name__ == "__main__":
+    test_run_many()
+    test_run_program_reports_failures()
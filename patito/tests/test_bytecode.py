@@ -0,0 +1,107 @@
+import sys
+import os
+import io
+import tempfile
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, run_vm
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from optimizer import fuse_superinstructions
+from bytecode import write_bytecode, load_bytecode, HEADER, INSTRUCTION
+
+def test_bytecode_round_trip():
+    print("="*60)
+    print("TEST: BYTECODE BINARIO")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fib_recursive.patito', 'fibonacci.patito', 'normal.patito']:
+        program, stats = fuse_superinstructions(compile_file(file_name))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'program.ptc')
+            write_bytecode(program, path)
+            with load_bytecode(path) as loaded:
+                print(file_name, loaded, os.path.getsize(path), "bytes")
+                assert os.path.getsize(path) > HEADER.size + len(program.quadruples) * INSTRUCTION.size
+                # Nada se decodifica hasta que se lee
+                assert loaded.quadruples.decoded.count(None) == len(program.quadruples)
+                assert loaded.constants == program.constants
+                assert loaded.memory_layout == program.memory_layout
+                for name, func in program.functions.items():
+                    copy = loaded.functions[name]
+                    assert (copy.start_quad, copy.return_address, copy.is_pure) == \
+                        (func.start_quad, func.return_address, func.is_pure)
+                    assert [p.name for p in copy.params] == [p.name for p in func.params]
+                for original, decoded in zip(program.quadruples[1:], loaded.quadruples[1:]):
+                    assert str(original) == str(decoded)
+                for engine in ['loop', 'dispatch', 'python']:
+                    assert run_vm(loaded, engine) == run_vm(program, engine)
+
+def test_rejects_other_files():
+    print("="*60)
+    print("TEST: ARCHIVO QUE NO ES BYTECODE")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.ptc')
+        with open(path, 'wb') as f:
+            f.write(b'program demo; main() { } end' * 4)
+        try:
+            load_bytecode(path)
+            assert False, "Expected an error"
+        except Exception as e:
+            assert "not a Patito bytecode file" in str(e)
+
+def test_vm_reads_instructions_in_place():
+    print("="*60)
+    print("TEST: BYTECODE SIN CUADRUPLOS EN LA VM")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fib_recursive.patito', 'fibonacci.patito']:
+        program = compile_file(file_name)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'program.ptc')
+            write_bytecode(program, path)
+            with load_bytecode(path) as loaded:
+                assert run_vm(loaded, 'dispatch') == run_vm(program, 'dispatch')
+
+                output = io.StringIO()
+                vm = VirtualMachine(output=output)
+                vm.load_program(loaded)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    vm.start()
+                    while vm.step(7):
+                        pass
+                assert output.getvalue() == run_vm(program, 'dispatch')
+                # La VM decodifica directo de los enteros del archivo
+                assert loaded.quadruples.decoded.count(None) == len(loaded.quadruples)
+
+def test_rejects_wide_int_constants():
+    print("="*60)
+    print("TEST: BYTECODE CON ENTEROS DE MAS DE 64 BITS")
+    print("="*60)
+
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse("program wide; var x : int; main() { x = 99999999999999999999; print(x); } end")
+    program = parser.get_program()
+    assert run_vm(program, 'dispatch') == "99999999999999999999\n"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.ptc')
+        try:
+            write_bytecode(program, path)
+            assert False, "Expected an error"
+        except Exception as e:
+            assert "does not fit" in str(e)
+        assert os.listdir(directory) == []
+
+if __name__ == "__main__":
+    test_bytecode_round_trip()
+    test_rejects_other_files()
+    test_vm_reads_instructions_in_place()
+    test_rejects_wide_int_constants()
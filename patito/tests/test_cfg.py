@@ -0,0 +1,164 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, compile_source
+from cfg import ControlFlowGraph, build_cfgs, liveness, reaching_definitions, emit
+from optimizer import function_regions
+from quadruple_generator import Quadruple
+
+CICLOS = """
+program loops;
+var i, j, total : int;
+
+main() {
+    total = 0;
+    i = 0;
+    while (i < 3) do {
+        j = 0;
+        while (j < i) do {
+            total = total + j;
+            j = j + 1;
+        }
+        if (total > 2) {
+            print(total);
+        }
+        i = i + 1;
+    }
+    print(total);
+}
+end
+"""
+
+def main_cfg(program):
+    name, start, end = function_regions(program)[-1]
+    return ControlFlowGraph(program.quadruples, start, end, name)
+
+def test_blocks_and_edges():
+    print("="*60)
+    print("TEST: CFG - BLOQUES Y ARISTAS")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito', recycle_temps=False)
+    cfgs = build_cfgs(program.quadruples, program.functions)
+    print(cfgs, [cfg.blocks for cfg in cfgs])
+    assert [cfg.name for cfg in cfgs] == ['fib', 'main']
+
+    fib = cfgs[0]
+    assert fib.entry.start == program.functions['fib'].start_quad
+    # Los bloques cubren la region sin huecos
+    assert fib.blocks[0].start == fib.start and fib.blocks[-1].end == fib.end
+    for block, following in zip(fib.blocks, fib.blocks[1:]):
+        assert block.end == following.start
+    for block in fib.blocks:
+        for successor in block.successors:
+            assert block in successor.predecessors
+        last = program.quadruples[block.end - 1]
+        if last.operator == 'ENDFUNC':
+            assert block.successors == []
+        if last.operator == 'GOTOF':
+            assert len(block.successors) == 2
+    # La llamada no corta el bloque: el de n - 1 llega hasta el ENDFUNC del return
+    calls = [block for block in fib.blocks
+             if any(program.quadruples[i].operator == 'GOSUB' for i in range(block.start, block.end))]
+    assert len(calls) == 1
+    # El GOTO sobre el else y el ENDFUNC final no se alcanzan
+    assert len(fib.reachable()) == len(fib.blocks) - 2
+
+def test_dominators_and_loops():
+    print("="*60)
+    print("TEST: CFG - DOMINADORES Y CICLOS")
+    print("="*60)
+
+    program = compile_source(CICLOS, recycle_temps=False)
+    cfg = main_cfg(program)
+    loops = cfg.natural_loops()
+    print(loops)
+
+    assert len(loops) == 2
+    inner, outer = loops
+    assert inner.blocks < outer.blocks
+    for loop in loops:
+        assert len(loop.back_edges) == 1
+        tail = loop.back_edges[0]
+        last = program.quadruples[tail.end - 1]
+        assert last.operator == 'GOTO' and int(last.result) == loop.header.start
+        for index in loop.blocks:
+            assert cfg.dominates(loop.header, cfg.blocks[index])
+    assert cfg.dominators()[cfg.entry.index] is None
+    assert cfg.dominates(outer.header, inner.header)
+    assert not cfg.dominates(inner.header, outer.header)
+    # print(total) dentro del if no domina el incremento de i
+    printing = [block for block in cfg.blocks if program.quadruples[block.start].operator == 'PRINT']
+    increment = cfg.block_at(loops[1].back_edges[0].end - 1)
+    assert not cfg.dominates(printing[0], increment)
+
+def test_reaching_definitions_and_liveness():
+    print("="*60)
+    print("TEST: CFG - DEFINICIONES Y VIVACIDAD")
+    print("="*60)
+
+    program = compile_source(CICLOS, recycle_temps=False)
+    quads = program.quadruples
+    cfg = main_cfg(program)
+    outer = cfg.natural_loops()[1]
+    i = program.get_global_address('i')
+
+    # A la condicion del ciclo externo llegan i = 0 y el i = i + 1 del final del cuerpo
+    reaching = reaching_definitions(cfg).reaching(outer.header)
+    print(reaching)
+    writes = sorted(k for k in range(cfg.start, cfg.end) if quads[k].operator == '=' and quads[k].result == i)
+    assert reaching[i] == set(writes)
+    # Solo se siguen las direcciones pedidas
+    only_i = reaching_definitions(cfg, track=lambda address: address == i).reaching(outer.header)
+    assert set(only_i) == {i}
+
+    live = liveness(cfg)
+    header = outer.header.start
+    condition = quads[header].result
+    assert quads[header + 1].operator == 'GOTOF'
+    assert condition in live[header - cfg.start]
+    assert condition not in live[header + 1 - cfg.start]
+    # total se lee despues de los ciclos, sigue vivo al dar la vuelta
+    total = program.get_global_address('total')
+    back_edge = outer.back_edges[0].end - 1
+    assert total in live[back_edge - cfg.start]
+    assert i in live[back_edge - cfg.start]
+    assert live[-1] == set()
+
+def test_emit_renumbers():
+    print("="*60)
+    print("TEST: CFG - REEMISION")
+    print("="*60)
+
+    quads = [
+        Quadruple('GOTO', 'MAIN', None, '1'),
+        Quadruple('=', 7000, None, 1000),
+        Quadruple('<', 1000, 7001, 5000),
+        Quadruple('GOTOF', 5000, None, '7'),
+        Quadruple('PRINT', 1000, None, None),
+        Quadruple('+', 1000, 7002, 1000),
+        Quadruple('GOTO', None, None, '2'),
+        Quadruple('PRINT', 9000, None, None),
+    ]
+    hoisted = Quadruple('*', 1001, 7002, 5001)
+    result, entry = emit(quads, removed={4}, insert={2: [hoisted]}, bypass={2: {6}})
+    print(result)
+
+    assert [quad.operator for quad in result] == ['GOTO', '=', '*', '<', 'GOTOF', '+', 'GOTO', 'PRINT']
+    # Entrar al ciclo pasa por lo insertado, el GOTO de regreso no
+    assert entry[2] == 2
+    assert result[6].result == '3'
+    assert result[4].result == '7'
+    # El salto a un cuadruplo quitado cae en el siguiente
+    assert entry[4] == 5
+    assert entry[len(quads)] == len(result)
+
+if __name__ == "__main__":
+    test_blocks_and_edges()
+    test_dominators_and_loops()
+    test_reaching_definitions_and_liveness()
+    test_emit_renumbers()
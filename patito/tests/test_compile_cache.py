@@ -0,0 +1,100 @@
+import sys
+import os
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import read_file, run_vm
+from parser import PatitoParser
+from compile_cache import CompileCache
+from batch import run_many
+
+def test_cache_hit_skips_compiling():
+    print("="*60)
+    print("TEST: CACHE DE PROGRAMAS COMPILADOS")
+    print("="*60)
+
+    source = read_file('factorial.patito')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+        first = cache.compile(source)
+        other = CompileCache(directory)
+        second = other.compile(source, parser=PatitoParser())
+        print(cache.get_stats())
+
+        assert cache.get_stats()['misses'] == 1 and cache.stores == 1
+        assert other.get_stats()['hits'] == 1 and other.stores == 0
+        assert [str(q) for q in first.quadruples] == [str(q) for q in second.quadruples]
+        assert second.functions['fact'].start_quad == first.functions['fact'].start_quad
+        assert run_vm(second, 'dispatch') == run_vm(first, 'dispatch')
+
+        # Cambiar el codigo cambia la llave
+        assert cache.get(source + "\n") is None
+        assert cache.get(source) is not None
+        assert cache.get_stats()['hits'] == 1
+
+def test_eviction_and_corrupt_entries():
+    print("="*60)
+    print("TEST: DESALOJO LRU")
+    print("="*60)
+
+    sources = [read_file(name) for name in ('factorial.patito', 'fibonacci.patito', 'fib_recursive.patito')]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+        for source in sources:
+            cache.compile(source)
+        sizes = [size for mtime, size, path in cache.entries()]
+        os.utime(cache._path(cache.key(sources[0])), (1, 1))
+
+        # Solo caben dos entradas: sale la usada hace mas tiempo
+        cache.max_bytes = sum(sizes) - min(sizes)
+        cache.evict()
+        assert cache.evictions >= 1
+        assert cache.get(sources[0]) is None
+        assert cache.get(sources[2]) is not None
+
+        with open(cache._path(cache.key(sources[2])), 'wb') as f:
+            f.write(b'basura')
+        assert cache.get(sources[2]) is None
+        assert not os.path.exists(cache._path(cache.key(sources[2])))
+
+def test_parser_options_in_key():
+    print("="*60)
+    print("TEST: OPCIONES DEL PARSER EN LA LLAVE")
+    print("="*60)
+
+    source = read_file('factorial.patito')
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+        default = cache.compile(source)
+        plain = cache.compile(source, PatitoParser(fold_constants=False), recycle_temps=False)
+        assert cache.stores == 2
+        assert plain.functions['fact'].resource_needs['temp_int'] > default.functions['fact'].resource_needs['temp_int']
+        assert cache.compile(source, PatitoParser(fold_constants=False), recycle_temps=False) is not None
+        assert cache.get_stats()['hits'] == 1
+
+        # Segmentos fijos demasiado chicos siguen siendo un error aunque haya una entrada
+        try:
+            cache.compile(source, PatitoParser(segment_sizes={('global', 'int'): 1}))
+            assert False, "Expected an error"
+        except Exception as e:
+            assert "Segment overflow" in str(e)
+
+def test_workers_share_the_cache():
+    print("="*60)
+    print("TEST: CACHE COMPARTIDA POR LOS WORKERS")
+    print("="*60)
+
+    source = read_file('fibonacci.patito')
+    with tempfile.TemporaryDirectory() as directory:
+        results = list(run_many([source] * 4, max_workers=2, cache_dir=directory, engine='dispatch'))
+        assert all(result.ok for result in results)
+        assert len(CompileCache(directory).entries()) == 1
+
+if __name__ == "__main__":
+    test_cache_hit_skips_compiling()
+    test_eviction_and_corrupt_entries()
+    test_parser_options_in_key()
+    test_workers_share_the_cache()
@@ -0,0 +1,96 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source, run_vm
+
+ARITMETICA = """
+program folding;
+var x, y : int; z : float;
+
+main() {
+    x = 2 * 3 + 4;
+    z = 1.5 * 2 - -(3);
+    y = x * (10 - 2 * 4);
+    print(x, z, y, 7 / 2, 1 < 2);
+}
+end
+"""
+
+CONDICIONES = """
+program conditions;
+var x : int;
+
+main() {
+    x = 0;
+    if (2 * 3 > 5) {
+        print("siempre");
+    } else {
+        print("nunca");
+    }
+    if (1 != 1) {
+        print("nunca");
+    }
+    while (3 < 2) do {
+        print("nunca");
+    }
+    while (x < 2 * 2) do {
+        x = x + 1;
+        if (2 > 1) {
+            print(x);
+        }
+    }
+}
+end
+"""
+
+def test_constant_arithmetic_folded():
+    print("="*60)
+    print("TEST: PLEGADO DE CONSTANTES - ARITMETICA")
+    print("="*60)
+
+    program = compile_source(ARITMETICA)
+    operators = [quad.operator for quad in program.quadruples]
+    print(program.quadruples)
+
+    # Solo y = x * 2 usa una variable; 7 / 2 y 1 < 2 se quedan para la VM
+    assert operators.count('*') == 1
+    assert '+' not in operators and 'unary-' not in operators
+    assert operators.count('/') == 1 and operators.count('<') == 1
+    assert 10 in program.constants.values() and 6.0 in program.constants.values()
+
+    plain = compile_source(ARITMETICA, fold_constants=False)
+    assert len(program.quadruples) < len(plain.quadruples)
+    expected = run_vm(plain, 'loop')
+    assert expected == "10 6.0 20 3.5 True\n"
+    for engine in ['loop', 'dispatch', 'python']:
+        assert run_vm(program, engine) == expected
+
+def test_constant_conditions():
+    print("="*60)
+    print("TEST: PLEGADO DE CONSTANTES - IF/WHILE")
+    print("="*60)
+
+    program = compile_source(CONDICIONES)
+    operators = [quad.operator for quad in program.quadruples]
+    print(program.quadruples)
+
+    # Solo queda el GOTOF de x < 4, y el GOTO de regreso del ciclo
+    assert operators.count('GOTOF') == 1
+    assert operators.count('GOTO') == 2
+    assert '!=' not in operators
+    # Los cuerpos que nunca corren no se generan
+    nunca = [address for address, value in program.constants.items() if value == "nunca"]
+    assert not any(quad.operand1 in nunca for quad in program.quadruples)
+
+    expected = run_vm(compile_source(CONDICIONES, fold_constants=False), 'loop')
+    assert expected == "siempre\n1\n2\n3\n4\n"
+    for engine in ['loop', 'dispatch', 'python']:
+        assert run_vm(program, engine) == expected
+
+if __name__ == "__main__":
+    test_constant_arithmetic_folded()
+    test_constant_conditions()
@@ -0,0 +1,83 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+from memory_manager import ConstantPool, export_constants
+
+MIXED = """
+program mixed;
+var a : int; b : float;
+
+main() {
+    a = 1 + 1;
+    b = 1.0 + 1.0;
+    print("uno", a, "uno", b, 1, 1.0);
+}
+end
+"""
+
+def test_constants_indexed_by_type_and_value():
+    print("="*60)
+    print("TEST: POOL DE CONSTANTES")
+    print("="*60)
+
+    pool = ConstantPool()
+    one = pool.add('int', 1)
+    assert pool.add('int', 1) == one
+    assert pool.add('float', 1.0) != one
+    assert pool.get_type(one) == 'int'
+    assert pool.add('string', "hola") == pool.add('string', "ho" + "la")
+    assert pool.export() == [1, 1.0, "hola"]
+    print(pool)
+
+    # 1.0 ya ocupa uno de los 1000 espacios de floats
+    for value in range(999):
+        pool.add('float', value + 0.5)
+    try:
+        pool.add('float', 2000.5)
+        assert False, "Expected a constant segment overflow"
+    except Exception as e:
+        assert "overflow" in str(e)
+
+    # Sin modo estricto solo se anota el desborde, clear() lo olvida
+    pool = ConstantPool(strict=False)
+    for value in range(1001):
+        pool.add('int', value)
+    assert pool.overflowed and len(pool) == 1001
+    pool.clear()
+    assert not pool.overflowed and len(pool) == 0
+    assert pool.add('int', 5) == pool.ranges['int'][0]
+
+def test_program_constants():
+    print("="*60)
+    print("TEST: CONSTANTES DE UN PROGRAMA")
+    print("="*60)
+
+    # Sin plegar constantes, 1 + 1 y 1.0 + 1.0 agregarian 2 y 2.0 al pool
+    parser = PatitoParser(fold_constants=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(MIXED)
+    program = parser.get_program()
+    print(program.constants)
+
+    assert sorted(program.constants.values(), key=repr) == sorted([1, 1.0, "uno"], key=repr)
+    assert program.memory_layout['const'] == {'int': 1, 'float': 1, 'string': 1}
+    assert export_constants(program.constants, program.memory_layout['const']) == [1, 1.0, "uno"]
+
+    output = io.StringIO()
+    vm = VirtualMachine(engine='dispatch', output=output)
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute()
+    assert output.getvalue() == "uno 2 uno 2.0 1 1.0\n"
+
+if __name__ == "__main__":
+    test_constants_indexed_by_type_and_value()
+    test_program_constants()
@@ -0,0 +1,104 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, compile_source, execute, run_vm
+from optimizer import copy_program, compact_temps, propagate_copies
+from quadruple_generator import Quadruple
+
+COPIAS = """
+program copias;
+var a, b : int;
+
+main() {
+    a = 3;
+    b = a + 1;
+    print(b);
+}
+end
+"""
+
+def executed(program):
+    _, vm = execute(program, profile=True)
+    return vm.get_profile().get_instruction_count()
+
+def test_call_result_moved_once():
+    print("="*60)
+    print("TEST: PROPAGACION DE COPIAS - RESULTADO DE LLAMADA")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito')
+    optimized, stats = propagate_copies(program)
+    print(stats)
+
+    # r = fib(20): GOSUB, = slot t, = t r se vuelve GOSUB, = slot r
+    quads = optimized.quadruples
+    gosub = max(i for i, quad in enumerate(quads) if quad.operator == 'GOSUB')
+    slot = optimized.functions['fib'].return_address
+    r = optimized.get_global_address('r')
+    assert (quads[gosub + 1].operator, quads[gosub + 1].operand1, quads[gosub + 1].result) == ('=', slot, r)
+    assert quads[gosub + 2].operator == 'PRINT_ITEM'
+    # return fib(n - 1) + fib(n - 2) suma directo en el slot de retorno
+    assert any(quad.operator == '+' and quad.result == slot and following.operator == 'ENDFUNC'
+               for quad, following in zip(quads, quads[1:]))
+    assert stats['coalesced'] == 2
+    assert stats['removed'] == len(program.quadruples) - len(optimized.quadruples) == 2
+    assert run_vm(optimized) == run_vm(program)
+
+def test_copies_propagated_inside_block():
+    print("="*60)
+    print("TEST: PROPAGACION DE COPIAS - DENTRO DEL BLOQUE")
+    print("="*60)
+
+    program = compile_source(COPIAS)
+    a, b = program.get_global_address('a'), program.get_global_address('b')
+    three, one = [address for address, value in sorted(program.constants.items())][:2]
+    assert (program.constants[three], program.constants[one]) == (3, 1)
+
+    # t = a se usa dos veces, la segunda despues de que a cambia
+    quads = [
+        Quadruple('GOTO', 'MAIN', None, '1'),
+        Quadruple('=', three, None, a),
+        Quadruple('=', a, None, 5000),
+        Quadruple('+', 5000, one, 5001),
+        Quadruple('=', 5001, None, b),
+        Quadruple('PRINT', 5000, None, None),
+        Quadruple('=', one, None, a),
+        Quadruple('PRINT', 5000, None, None),
+    ]
+    # compact_temps ajusta el registro de activacion a los dos temporales
+    program = compact_temps(copy_program(program, quads))
+    optimized, stats = propagate_copies(program)
+    print(optimized.quadruples)
+
+    assert stats == {'rewritten': 2, 'coalesced': 1, 'dead_moves': 0, 'removed': 1,
+                     'quadruples_before': 8, 'quadruples_after': 7}
+    quads = optimized.quadruples
+    assert (quads[3].operator, quads[3].operand1, quads[3].result) == ('+', a, b)
+    assert quads[4].operand1 == a
+    # Despues de a = 1 la copia ya no vale, el temporal se queda
+    assert quads[6].operand1 == 5000
+    assert run_vm(optimized) == run_vm(program) == "3\n3\n"
+
+def test_executed_quadruples_reduced():
+    print("="*60)
+    print("TEST: PROPAGACION DE COPIAS - CUADRUPLOS EJECUTADOS")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        program = compile_file(file_name)
+        optimized, stats = propagate_copies(program)
+        before, after = executed(program), executed(optimized)
+        print(f"{file_name}: {before} -> {after} ejecutados, {stats}")
+        assert after < before
+        expected = run_vm(program)
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(optimized, engine) == expected
+
+if __name__ == "__main__":
+    test_call_result_moved_once()
+    test_copies_propagated_inside_block()
+    test_executed_quadruples_reduced()
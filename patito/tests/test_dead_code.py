@@ -0,0 +1,122 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, compile_source, run_vm
+from optimizer import eliminate_dead_code, jump_targets
+
+SALTOS = """
+program jumps;
+var i, total : int;
+
+void reporta(n: int) {
+    {
+        if (n > 2) {
+            print("grande", n);
+        } else {
+            print("chico", n);
+        }
+    }
+};
+
+int signo(n: int) {
+    {
+        if (n < 3) {
+            return 0 - 1;
+        } else {
+            return 1;
+        }
+    }
+};
+
+main() {
+    i = 0;
+    total = 0;
+    while (i < 5) do {
+        i = i + 1;
+        if (i > 2) {
+            total = total + signo(i);
+        } else {
+            reporta(i);
+        }
+    }
+    if (total > 0) {
+        print(total);
+    } else {
+    }
+}
+end
+"""
+
+def test_unreachable_quadruples_removed():
+    print("="*60)
+    print("TEST: CODIGO MUERTO - CUADRUPLOS INALCANZABLES")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito')
+    optimized, stats = eliminate_dead_code(program)
+    print(stats)
+
+    # El GOTO sobre el else y el ENDFUNC final de fib ya no se alcanzan
+    assert stats['unreachable'] == 2
+    assert stats['removed'] == len(program.quadruples) - len(optimized.quadruples)
+    operators = [quad.operator for quad in optimized.quadruples]
+    assert operators.count('ENDFUNC') == 2
+    assert operators.count('GOTO') == 1
+    # fib sigue empezando en el mismo lugar y main despues del ultimo ENDFUNC de fib
+    fib = optimized.functions['fib']
+    assert fib.start_quad == 1
+    main_start = int(optimized.quadruples[0].result)
+    assert optimized.quadruples[main_start - 1].operator == 'ENDFUNC'
+    assert all(int(quad.operand1) == fib.start_quad
+               for quad in optimized.quadruples if quad.operator == 'GOSUB')
+    assert run_vm(optimized) == run_vm(program)
+
+def test_jumps_threaded():
+    print("="*60)
+    print("TEST: CODIGO MUERTO - SALTOS ENCADENADOS")
+    print("="*60)
+
+    program = compile_source(SALTOS)
+    optimized, stats = eliminate_dead_code(program)
+    print(stats)
+
+    # El GOTO sobre el else del while va directo a la condicion, el GOTO al
+    # ENDFUNC de reporta regresa ahi mismo y el GOTO sobre el else vacio se va
+    assert stats['jumps_threaded'] == 1
+    assert stats['jumps_to_return'] == 1
+    assert stats['jumps_to_next'] == 1
+    quads = optimized.quadruples
+    for target in jump_targets(quads):
+        assert target == len(quads) or quads[target].operator != 'GOTO'
+    for i, quad in enumerate(quads):
+        if quad.operator == 'GOTO' and i > 0:
+            assert int(quad.result) != i + 1
+
+    expected = run_vm(program)
+    assert expected == "chico 1\nchico 2\n3\n"
+    for engine in ['loop', 'dispatch', 'python']:
+        assert run_vm(optimized, engine) == expected
+
+def test_bundled_programs_keep_output():
+    print("="*60)
+    print("TEST: CODIGO MUERTO - PROGRAMAS DE PRUEBA")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        program = compile_file(file_name)
+        optimized, stats = eliminate_dead_code(program)
+        print(f"{file_name}: {stats['quadruples_before']} -> {stats['quadruples_after']}")
+        # Una segunda pasada ya no encuentra nada
+        assert eliminate_dead_code(optimized)[1]['removed'] == 0
+        expected = run_vm(program)
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(optimized, engine) == expected
+
+if __name__ == "__main__":
+    test_unreachable_quadruples_removed()
+    test_jumps_threaded()
+    test_bundled_programs_keep_output()
@@ -0,0 +1,42 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine
+
+def run_program(file_name, engine):
+    with open(os.path.join(current_dir, file_name)) as f:
+        codigo = f.read()
+
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(codigo)
+
+    vm = VirtualMachine(engine=engine)
+    vm.load_quadruples(parser.get_quadruples())
+    vm.set_constants(parser.semantic.memory_manager.get_constants())
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        vm.execute()
+    return output.getvalue()
+
+def test_dispatch_matches_loop():
+    print("="*60)
+    print("TEST: DISPATCH ENGINE")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'normal.patito']:
+        expected = run_program(file_name, 'loop')
+        actual = run_program(file_name, 'dispatch')
+        print(f"{file_name}: {len(actual.splitlines())} lineas")
+        assert actual == expected
+
+if __name__ == "__main__":
+    test_dispatch_matches_loop()
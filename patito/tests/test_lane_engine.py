@@ -0,0 +1,111 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source
+from lane_engine import run_lanes, np
+
+COUNTDOWN = """
+program countdown;
+var n, steps, total : int; ratio : float;
+
+main() {
+    steps = 0;
+    total = 0;
+    while (n > 0) do {
+        if (n > 10) {
+            total = total + n * 2;
+            n = n - 7;
+        } else {
+            total = total - 1;
+            n = n - 1;
+        }
+        steps = steps + 1;
+    }
+    ratio = total / 4;
+    print("pasos", steps);
+}
+end
+"""
+
+def test_lanes_match_scalar_vm():
+    print("="*60)
+    print("TEST: CARRILES VECTORIZADOS")
+    print("="*60)
+    if np is None:
+        print("numpy no esta instalado")
+        return
+
+    program = compile_source(COUNTDOWN)
+    inputs = {'n': np.arange(1, 65)}
+    vectorized = run_lanes(program, inputs)
+    scalar = run_lanes(program, inputs, vectorize=False)
+    print(vectorized, vectorized.globals['steps'][:10])
+
+    assert vectorized.vectorized and not scalar.vectorized
+    assert vectorized.globals['steps'].tolist() == scalar.globals['steps'].tolist()
+    assert vectorized.globals['ratio'].tolist() == scalar.globals['ratio'].tolist()
+    assert vectorized.outputs == scalar.outputs
+    # n = 27: 27, 20, 13 bajan de 7 en 7 y luego 6 pasos de uno en uno
+    assert vectorized.globals['steps'][26] == 9
+    assert vectorized.globals['total'][26] == 114
+    assert vectorized.outputs[26] == "pasos 9\n"
+
+def test_programs_with_calls_run_per_lane():
+    print("="*60)
+    print("TEST: CARRILES CON FUNCIONES")
+    print("="*60)
+    if np is None:
+        print("numpy no esta instalado")
+        return
+
+    with open(os.path.join(current_dir, 'factorial.patito')) as f:
+        program = compile_source(f.read())
+    results = run_lanes(program, {'x': [1, 2, 3]})
+    assert not results.vectorized
+    # main asigna x antes de usarla, asi que todos los carriles terminan igual
+    assert results.globals['res'].tolist() == [120, 120, 120]
+
+FACTORIAL = """
+program factorial;
+var n, f : int;
+
+main() {
+    f = 1;
+    while (n > 1) do {
+        f = f * n;
+        n = n - 1;
+    }
+    print(f);
+}
+end
+"""
+
+def test_int_overflow_falls_back_to_scalar():
+    print("="*60)
+    print("TEST: CARRILES CON ENTEROS GRANDES")
+    print("="*60)
+    if np is None:
+        print("numpy no esta instalado")
+        return
+
+    program = compile_source(FACTORIAL)
+    small = run_lanes(program, {'n': [5, 10, 20]})
+    assert small.vectorized
+    assert small.globals['f'].tolist() == [120, 3628800, 2432902008176640000]
+
+    # 25! no cabe en int64: los carriles corren en la VM escalar con enteros de Python
+    for vectorize in (True, False):
+        results = run_lanes(program, {'n': [5, 25]}, vectorize=vectorize)
+        print(results, results.globals['f'])
+        assert not results.vectorized
+        assert results.globals['f'].tolist() == [120, 15511210043330985984000000]
+        assert results.outputs[1] == "15511210043330985984000000\n"
+
+if __name__ == "__main__":
+    test_lanes_match_scalar_vm()
+    test_programs_with_calls_run_per_lane()
+    test_int_overflow_falls_back_to_scalar()
@@ -0,0 +1,94 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source
+from virtual_machine import VirtualMachine, ResourceLimitExceeded
+
+INFINITE_LOOP = """
+program forever;
+var i : int;
+
+main() {
+    i = 0;
+    while (i < 1) do {
+        print(i);
+    }
+}
+end
+"""
+
+RUNAWAY_RECURSION = """
+program runaway;
+var r : int;
+
+int down(n: int) {
+    {
+        return down(n - 1);
+    }
+};
+
+main() {
+    r = down(1);
+}
+end
+"""
+
+def run_limited(program, **options):
+    vm = VirtualMachine(output=io.StringIO(), **options)
+    vm.load_program(program)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.execute()
+    except ResourceLimitExceeded as e:
+        print(e.to_dict())
+        return e, vm
+    return None, vm
+
+def test_instruction_fuel():
+    print("="*60)
+    print("TEST: LIMITE DE INSTRUCCIONES")
+    print("="*60)
+
+    program = compile_source(INFINITE_LOOP)
+    for engine in ['loop', 'dispatch']:
+        error, vm = run_limited(program, engine=engine, max_instructions=5000)
+        assert error is not None
+        assert error.limit == 'instructions'
+        assert error.maximum == 5000
+        assert vm.get_output().count("\n") < 5000
+
+    # Con el JIT el ciclo corre dentro de un trazo que tambien gasta combustible
+    error, vm = run_limited(program, engine='dispatch', max_instructions=5000, jit_threshold=5)
+    assert error is not None and error.limit == 'instructions'
+    assert vm.get_jit_stats()['traces_compiled'] == 1
+
+    with open(os.path.join(current_dir, 'fib_recursive.patito')) as f:
+        program = compile_source(f.read())
+    error, vm = run_limited(program, engine='dispatch', max_instructions=10**7)
+    assert error is None
+    assert "6765" in vm.get_output()
+
+def test_call_depth_and_frame_slots():
+    print("="*60)
+    print("TEST: LIMITES DE LLAMADAS Y MEMORIA")
+    print("="*60)
+
+    program = compile_source(RUNAWAY_RECURSION)
+    for engine in ['loop', 'dispatch']:
+        error, vm = run_limited(program, engine=engine, max_call_depth=200)
+        assert error.limit == 'call_depth'
+        assert len(vm.memory_stack) == 201
+
+        error, vm = run_limited(program, engine=engine, max_frame_slots=100)
+        assert error.limit == 'frame_slots'
+        assert vm.live_slots > 100
+
+if __name__ == "__main__":
+    test_instruction_fuel()
+    test_call_depth_and_frame_slots()
@@ -0,0 +1,124 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, compile_source, execute, run_vm
+from optimizer import hoist_invariants, recycle_temps, function_global_writes
+
+CICLOS = """
+program licm;
+var i, j, limit, total, scale : int;
+
+void ajusta(n: int) {
+    {
+        scale = scale + n;
+    }
+};
+
+int triple(n: int) {
+    {
+        return n * 3;
+    }
+};
+
+main() {
+    limit = 5;
+    scale = 2;
+    total = 0;
+    i = 0;
+    while (i < limit * 2) do {
+        j = 0;
+        while (j < limit - 3) do {
+            total = total + (limit + 1) * (i - 1) + scale * 2;
+            j = j + 1;
+        }
+        total = total + triple(limit) * (limit + 4);
+        i = i + 1;
+    }
+    print(total);
+    i = 0;
+    while (i < 3) do {
+        total = total + scale * 10;
+        ajusta(1);
+        i = i + 1;
+    }
+    print(total, scale);
+}
+end
+"""
+
+def executed(program):
+    _, vm = execute(program, profile=True)
+    return vm.get_profile().get_instruction_count()
+
+def find(program, operator, operand1, operand2):
+    return [i for i, quad in enumerate(program.quadruples)
+            if (quad.operator, quad.operand1, quad.operand2) == (operator, operand1, operand2)]
+
+def test_invariants_hoisted():
+    print("="*60)
+    print("TEST: CODIGO INVARIANTE - PREENCABEZADO")
+    print("="*60)
+
+    program = compile_source(CICLOS, recycle_temps=False)
+    optimized, stats = hoist_invariants(program)
+    print(stats)
+    for i, quad in enumerate(optimized.quadruples):
+        print(i, quad)
+
+    limit, scale, i = [optimized.get_global_address(name) for name in ('limit', 'scale', 'i')]
+    two = [address for address, value in optimized.constants.items() if value == 2][0]
+    quads = optimized.quadruples
+    # limit * 2 de la condicion queda antes del encabezado y el GOTO de regreso lo salta
+    product = find(optimized, '*', limit, two)[0]
+    compare = [k for k in find(optimized, '<', i, quads[product].result)][0]
+    back_edges = [k for k, quad in enumerate(quads) if quad.operator == 'GOTO' and k > 0 and int(quad.result) <= k]
+    assert product < compare
+    assert int(quads[back_edges[-2]].result) == compare
+    # scale * 2 sale de los dos ciclos: solo ajusta() escribe scale y no se llama ahi
+    assert find(optimized, '*', scale, two)[0] < compare
+    # scale * 10 se queda, ajusta() se llama dentro del ciclo
+    ten = [address for address, value in optimized.constants.items() if value == 10][0]
+    multiply = find(optimized, '*', scale, ten)[0]
+    assert int(quads[back_edges[-1]].result) < multiply < back_edges[-1]
+    assert stats['loops'] == 2
+
+    expected = run_vm(program)
+    assert expected == "1850\n1940 5\n"
+    assert executed(optimized) < executed(program)
+    for engine in ['loop', 'dispatch', 'python']:
+        assert run_vm(optimized, engine) == expected
+        assert run_vm(recycle_temps(optimized)[0], engine) == expected
+
+def test_function_writes():
+    print("="*60)
+    print("TEST: CODIGO INVARIANTE - GLOBALES DE LAS FUNCIONES")
+    print("="*60)
+
+    program = compile_source(CICLOS, recycle_temps=False)
+    writes = function_global_writes(program)
+    print(writes)
+    assert writes['ajusta'] == {program.get_global_address('scale')}
+    assert writes['triple'] == {program.functions['triple'].return_address}
+    assert program.get_global_address('total') in writes['main']
+
+def test_bundled_programs_keep_output():
+    print("="*60)
+    print("TEST: CODIGO INVARIANTE - PROGRAMAS DE PRUEBA")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        program = compile_file(file_name, recycle_temps=False)
+        optimized, stats = hoist_invariants(program)
+        print(f"{file_name}: {stats}")
+        expected = run_vm(program)
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(optimized, engine) == expected
+
+if __name__ == "__main__":
+    test_invariants_hoisted()
+    test_function_writes()
+    test_bundled_programs_keep_output()
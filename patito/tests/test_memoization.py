@@ -0,0 +1,72 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source, compile_file, execute
+
+FIB_30 = """
+program fib30;
+var r : int;
+
+int fib(n: int) {
+    {
+        if (n < 2) {
+            return n;
+        } else {
+            return fib(n - 1) + fib(n - 2);
+        }
+    }
+};
+
+main() {
+    r = fib(30);
+    print(r);
+}
+end
+"""
+
+def test_pure_functions():
+    print("="*60)
+    print("TEST: FUNCIONES PURAS")
+    print("="*60)
+
+    assert compile_file('fib_recursive.patito').functions['fib'].is_pure
+    assert compile_file('factorial.patito').functions['fact'].is_pure
+    # Imprime, asi que no se puede memoizar
+    assert not compile_file('fibonacci.patito').functions['fibIterative'].is_pure
+
+def test_memoized_fib_30():
+    print("="*60)
+    print("TEST: MEMOIZACION - FIB(30)")
+    print("="*60)
+
+    program = compile_source(FIB_30)
+    for engine in ['loop', 'dispatch', 'python']:
+        output, vm = execute(program, engine, memoize=True)
+        stats = vm.get_memo_stats()
+        print(f"{engine}: {stats}")
+        assert "832040" in output
+        assert stats['fib']['misses'] == 31
+        assert stats['fib']['hits'] == 28
+
+def test_memo_cache_eviction():
+    print("="*60)
+    print("TEST: MEMOIZACION - LRU")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito')
+    expected, _ = execute(program, 'loop')
+    for engine in ['loop', 'dispatch']:
+        output, vm = execute(program, engine, memoize=True, memo_size=2)
+        stats = vm.get_memo_stats()
+        print(f"{engine}: {stats}")
+        assert output == expected
+        assert stats['fib']['size'] == 2
+
+if __name__ == "__main__":
+    test_pure_functions()
+    test_memoized_fib_30()
+    test_memo_cache_eviction()
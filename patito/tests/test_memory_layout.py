@@ -0,0 +1,82 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from parser import PatitoParser
+from virtual_machine import VirtualMachine, SEG_CONST
+
+def test_segments_sized_from_memory_manager():
+    print("="*60)
+    print("TEST: MEMORY LAYOUT")
+    print("="*60)
+
+    with open(os.path.join(current_dir, 'factorial.patito')) as f:
+        codigo = f.read()
+
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(codigo)
+
+    memory_manager = parser.semantic.memory_manager
+    layout = memory_manager.get_memory_layout()
+    print(layout)
+
+    outputs = []
+    for engine in ['loop', 'dispatch']:
+        vm = VirtualMachine(engine=engine)
+        vm.load_quadruples(parser.get_quadruples())
+        vm.set_constants(memory_manager.get_constants())
+        vm.set_memory_layout(layout)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            vm.execute()
+        outputs.append(output.getvalue())
+
+        # x, res y el slot de retorno de fact
+        assert len(vm.global_memory) == 3
+        assert vm.segment_sizes[SEG_CONST] == len(memory_manager.get_constants())
+        assert vm.global_memory[vm.locate(1001)[1]] == 120
+
+    assert outputs[0] == outputs[1]
+
+def test_frames_reused_from_resource_needs():
+    print("="*60)
+    print("TEST: FRAME POOLING")
+    print("="*60)
+
+    with open(os.path.join(current_dir, 'factorial.patito')) as f:
+        codigo = f.read()
+
+    parser = PatitoParser()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(codigo)
+    program = parser.get_program()
+
+    fact = program.get_function('fact')
+    print(fact.resource_needs)
+    assert fact.resource_needs['local_int'] == 2
+    # Los 4 temporales de fact nunca estan vivos a la vez, comparten un solo slot
+    assert fact.resource_needs['temp_int'] == 1
+
+    for engine in ['loop', 'dispatch']:
+        vm = VirtualMachine(engine=engine)
+        vm.load_program(program)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.execute()
+
+        stats = vm.get_frame_stats()
+        print(engine, stats)
+        # fact(5) construye 5 registros, fact(6) reutiliza esos 5
+        assert stats['allocated'] == 6
+        assert stats['reused'] == 5
+        assert stats['pooled']['fact'] == 6
+
+if __name__ == "__main__":
+    test_segments_sized_from_memory_manager()
+    test_frames_reused_from_resource_needs()
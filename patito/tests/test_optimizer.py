@@ -0,0 +1,44 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, run_vm
+from optimizer import fuse_superinstructions
+
+def test_superinstructions_keep_output():
+    print("="*60)
+    print("TEST: SUPERINSTRUCCIONES")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito']:
+        program = compile_file(file_name)
+        expected = run_vm(program, 'loop')
+        fused, stats = fuse_superinstructions(program)
+        print(f"{file_name}: {stats}")
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(fused, engine) == expected
+
+def test_superinstruction_stats():
+    print("="*60)
+    print("TEST: SUPERINSTRUCCIONES - ESTADISTICAS")
+    print("="*60)
+
+    # Sin reciclar, cada comparacion tiene su propio temporal que la fusion elimina
+    program = compile_file('fib_recursive.patito', recycle_temps=False)
+    fused, stats = fuse_superinstructions(program)
+    operators = [quad.operator for quad in fused.quadruples]
+    print(fused.quadruples)
+
+    assert 'CALL_AND_STORE' in operators
+    assert 'GOTO_IF_NOT_LT' in operators
+    assert stats['dispatches_removed'] == stats['compare_branch'] + stats['call_store']
+    assert stats['quadruples_after'] == stats['quadruples_before'] - stats['dispatches_removed']
+    assert stats['temps_after']['fib'] < stats['temps_before']['fib']
+    assert fused.functions['fib'].resource_needs['temp_bool'] == 0
+
+if __name__ == "__main__":
+    test_superinstructions_keep_output()
+    test_superinstruction_stats()
@@ -0,0 +1,59 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file
+from virtual_machine import VirtualMachine
+from output_buffer import OutputBuffer
+
+def test_print_items_share_a_line():
+    print("="*60)
+    print("TEST: PRINT EN UNA LINEA")
+    print("="*60)
+
+    program = compile_file('factorial.patito')
+    for engine in ['loop', 'dispatch', 'python']:
+        sink = io.StringIO()
+        vm = VirtualMachine(engine=engine, output=sink)
+        vm.load_program(program)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.execute()
+        print(f"{engine}: {vm.get_output()!r}")
+        assert vm.get_output() == "Factorial of 5 is 120\nFactorial of 6 is 720\n"
+
+def test_flush_policies():
+    print("="*60)
+    print("TEST: POLITICAS DE FLUSH")
+    print("="*60)
+
+    sink = io.StringIO()
+    output = OutputBuffer(sink, 'end')
+    output.write_item("a")
+    output.write_line(1)
+    assert sink.getvalue() == ""
+    output.flush()
+    assert sink.getvalue() == "a 1\n"
+
+    sink = io.StringIO()
+    output = OutputBuffer(sink, 'line')
+    output.write_item("a")
+    assert sink.getvalue() == ""
+    output.write_line(2)
+    assert sink.getvalue() == "a 2\n"
+
+    sink = io.StringIO()
+    output = OutputBuffer(sink, 'size', buffer_size=6)
+    output.write_line(123)
+    assert sink.getvalue() == ""
+    output.write_line(456)
+    assert sink.getvalue() == "123\n456\n"
+    assert output.flushes == 1
+
+if __name__ == "__main__":
+    test_print_items_share_a_line()
+    test_flush_policies()
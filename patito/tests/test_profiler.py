@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, execute
+
+def test_profile_counts():
+    print("="*60)
+    print("TEST: PROFILER")
+    print("="*60)
+
+    program = compile_file('fib_recursive.patito')
+    expected, _ = execute(program)
+    output, vm = execute(program, profile=True)
+    profile = vm.get_profile()
+    print(profile.format_report(5))
+
+    assert output == expected
+    assert profile.get_instruction_count() == 207967
+    assert profile.calls['fib'] == 21891
+    assert profile.counts[program.functions['fib'].start_quad] == 21891
+    assert profile.hot_quadruples(1)[0][1] == 21891
+    assert profile.inclusive['fib'] <= profile.inclusive['main']
+
+def test_profile_loops_and_json():
+    print("="*60)
+    print("TEST: PROFILER - CICLOS Y JSON")
+    print("="*60)
+
+    program = compile_file('fibonacci.patito')
+    _, vm = execute(program, profile=True)
+    profile = vm.get_profile()
+    loops = profile.loops()
+    print(loops)
+    assert len(loops) == 1
+    assert loops[0]['function'] == 'fibIterative'
+    assert loops[0]['iterations'] == 8
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'profile.json')
+        profile.write_json(path)
+        with open(path) as f:
+            data = json.load(f)
+    assert data['instructions'] == profile.get_instruction_count()
+    assert data['functions']['fibIterative']['calls'] == 1
+    assert data['loops'][0]['header'] == loops[0]['header']
+
+if __name__ == "__main__":
+    test_profile_counts()
+    test_profile_loops_and_json()
@@ -0,0 +1,79 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, run_vm
+from quadruple_generator import Quadruple
+from python_backend import compile_to_python
+
+def test_python_engine_matches_interpreter():
+    print("="*60)
+    print("TEST: PYTHON BACKEND")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'normal.patito', 'fib_recursive.patito']:
+        program = compile_file(file_name)
+        expected = run_vm(program, 'loop')
+        actual = run_vm(program, 'python')
+        print(f"{file_name}: {len(actual.splitlines())} lineas")
+        assert actual == expected
+
+    source = compile_to_python(program.quadruples, program.constants, program.functions).source
+    print(source)
+    assert "def f_fib(" in source
+    assert "pc = " not in source
+
+def test_unstructured_jumps_use_block_dispatch():
+    print("="*60)
+    print("TEST: PYTHON BACKEND - SALTOS SIN ESTRUCTURA")
+    print("="*60)
+
+    quads = [
+        Quadruple('GOTO', 'MAIN', None, '1'),
+        Quadruple('GOTO', None, None, '3'),
+        Quadruple('PRINT', 9000, None, None),
+        Quadruple('PRINT', 9001, None, None),
+    ]
+    constants = {9000: 'saltado', 9001: 'impreso'}
+    python_program = compile_to_python(quads, constants)
+    print(python_program.source)
+    assert "pc = " in python_program.source
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        python_program.run()
+    assert output.getvalue() == "impreso\n"
+
+def test_block_dispatch_jump_to_end():
+    print("="*60)
+    print("TEST: PYTHON BACKEND - SALTO AL FINAL DE MAIN")
+    print("="*60)
+
+    # El GOTO hacia adelante obliga al despacho por bloques y el ultimo salta fuera de main
+    quads = [
+        Quadruple('GOTO', 'MAIN', None, '1'),
+        Quadruple('GOTO', None, None, '3'),
+        Quadruple('PRINT', 9000, None, None),
+        Quadruple('PRINT', 9001, None, None),
+        Quadruple('GOTO', None, None, '6'),
+        Quadruple('PRINT', 9000, None, None),
+    ]
+    constants = {9000: 'saltado', 9001: 'impreso'}
+    python_program = compile_to_python(quads, constants)
+    print(python_program.source)
+    assert "pc = 6" in python_program.source
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        python_program.run()
+    assert output.getvalue() == "impreso\n"
+
+if __name__ == "__main__":
+    test_python_engine_matches_interpreter()
+    test_unstructured_jumps_use_block_dispatch()
+    test_block_dispatch_jump_to_end()
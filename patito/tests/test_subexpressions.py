@@ -0,0 +1,96 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_file, compile_source, run_vm
+from optimizer import eliminate_subexpressions, recycle_temps
+
+EXPRESIONES = """
+program cse;
+var a, b, i, j, x, y : int;
+
+int doble(n: int) {
+    {
+        return n * 2;
+    }
+};
+
+main() {
+    a = 3;
+    b = 4;
+    i = 1;
+    j = 2;
+    x = a * b + a * b;
+    y = (i * 4 + j) * (i * 4 + j) - (j + i * 4);
+    print(x, y);
+    x = a * b + doble(a) * b + a * b;
+    a = a + 1;
+    y = a * b + b * a;
+    print(x, y, a < b, a < b);
+}
+end
+"""
+
+def operators(program):
+    return [quad.operator for quad in program.quadruples]
+
+def test_duplicates_reused():
+    print("="*60)
+    print("TEST: SUBEXPRESIONES COMUNES - REUSO")
+    print("="*60)
+
+    # Sin reciclar, cada temporal guarda su valor hasta el final de la sentencia
+    program = compile_source(EXPRESIONES, recycle_temps=False)
+    optimized, stats = eliminate_subexpressions(program)
+    print(stats)
+    for quad in optimized.quadruples:
+        print(quad)
+
+    # a * b + a * b, i * 4 tres veces, i * 4 + j dos veces (j + i * 4 conmuta),
+    # a * b despues de doble() no, b * a despues de a = a + 1 si, a < b una vez
+    assert stats['eliminated'] == 8
+    assert operators(program).count('*') - operators(optimized).count('*') == 5
+    assert operators(program).count('<') - operators(optimized).count('<') == 1
+    assert stats['quadruples_after'] == len(optimized.quadruples) < stats['quadruples_before']
+    expected = run_vm(program)
+    assert expected == "24 30\n48 32 False False\n"
+    optimized, _ = recycle_temps(optimized)
+    for engine in ['loop', 'dispatch', 'python']:
+        assert run_vm(optimized, engine) == expected
+
+def test_writes_invalidate():
+    print("="*60)
+    print("TEST: SUBEXPRESIONES COMUNES - ESCRITURAS")
+    print("="*60)
+
+    program = compile_source(EXPRESIONES, recycle_temps=False)
+    optimized, _ = eliminate_subexpressions(program)
+    a, b = optimized.get_global_address('a'), optimized.get_global_address('b')
+    products = [i for i, quad in enumerate(optimized.quadruples)
+                if quad.operator == '*' and {quad.operand1, quad.operand2} == {a, b}]
+    print(products)
+    # Uno por sentencia de main: la llamada y la escritura de a obligan a recalcular
+    assert len(products) == 3
+    gosub = [i for i, quad in enumerate(optimized.quadruples) if quad.operator == 'GOSUB'][0]
+    assert products[0] < gosub < products[1]
+
+def test_bundled_programs_keep_output():
+    print("="*60)
+    print("TEST: SUBEXPRESIONES COMUNES - PROGRAMAS DE PRUEBA")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        program = compile_file(file_name, recycle_temps=False)
+        optimized, stats = eliminate_subexpressions(program)
+        print(f"{file_name}: {stats}")
+        expected = run_vm(program)
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(optimized, engine) == expected
+
+if __name__ == "__main__":
+    test_duplicates_reused()
+    test_writes_invalidate()
+    test_bundled_programs_keep_output()
@@ -0,0 +1,65 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import read_file
+from parser import PatitoParser
+from lexer import PatitoLexer
+from tables import check_tables, TABLES_DIR, PARSETAB, LEXTAB
+
+def compile_file(parser, file_name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser.parse(read_file(file_name))
+    return parser.get_program()
+
+def test_shipped_tables_match_grammar():
+    print("="*60)
+    print("TEST: TABLAS GENERADAS COINCIDEN CON LA GRAMATICA")
+    print("="*60)
+
+    parser = PatitoParser()
+    assert check_tables(parser, parser.lexer) == []
+    for name in (PARSETAB, LEXTAB):
+        assert os.path.exists(os.path.join(TABLES_DIR, name + '.py'))
+
+def test_optimized_parser_compiles_the_same():
+    print("="*60)
+    print("TEST: PARSER OPTIMIZADO")
+    print("="*60)
+
+    normal = compile_file(PatitoParser(), 'normal.patito')
+    optimized = compile_file(PatitoParser(optimize=True), 'normal.patito')
+    assert [str(q) for q in normal.quadruples] == [str(q) for q in optimized.quadruples]
+    assert normal.constants == optimized.constants
+
+def test_stale_tables_are_detected():
+    print("="*60)
+    print("TEST: TABLAS DESACTUALIZADAS")
+    print("="*60)
+
+    class ExtendedParser(PatitoParser):
+        def p_extra(self, p):
+            '''extra : PRINT PRINT'''
+
+    class ExtendedLexer(PatitoLexer):
+        t_ignore = ' '
+
+    parser = ExtendedParser()
+    problems = check_tables(parser, ExtendedLexer())
+    print(problems)
+    assert len(problems) == 2
+    try:
+        ExtendedParser(optimize=True)
+        assert False, "Expected stale tables to be rejected"
+    except Exception as e:
+        assert "tables.py" in str(e)
+
+if __name__ == "__main__":
+    test_shipped_tables_match_grammar()
+    test_optimized_parser_compiles_the_same()
+    test_stale_tables_are_detected()
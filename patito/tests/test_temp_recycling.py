@@ -0,0 +1,53 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import read_file, parse_source, run_vm
+from optimizer import count_temps
+
+def compile_file(file_name, recycle_temps=True):
+    # El parser guarda temp_stats, se regresa junto con el programa
+    parser = parse_source(read_file(file_name))
+    return parser, parser.get_program(recycle_temps=recycle_temps)
+
+def test_temp_counts_per_function():
+    print("="*60)
+    print("TEST: RECICLAJE DE TEMPORALES - CONTEOS")
+    print("="*60)
+
+    parser, program = compile_file('fib_recursive.patito')
+    stats = parser.temp_stats
+    print(stats)
+
+    assert stats['temps_before']['fib'] == 6
+    assert stats['temps_after']['fib'] == 2
+    assert stats['temps_after'] == count_temps(program)
+    # El registro de activacion de fib solo reserva los slots reciclados
+    assert program.functions['fib'].resource_needs['temp_int'] == 2
+    assert program.memory_layout['temp']['int'] == max(stats['temps_after'].values())
+
+    parser, plain = compile_file('fib_recursive.patito', recycle_temps=False)
+    assert parser.temp_stats is None
+    assert count_temps(plain) == stats['temps_before']
+
+def test_recycled_programs_keep_output():
+    print("="*60)
+    print("TEST: RECICLAJE DE TEMPORALES - SALIDA")
+    print("="*60)
+
+    for file_name in ['factorial.patito', 'fibonacci.patito', 'fib_recursive.patito', 'normal.patito']:
+        parser, plain = compile_file(file_name, recycle_temps=False)
+        expected = run_vm(plain, 'loop')
+        parser, program = compile_file(file_name)
+        print(f"{file_name}: {parser.temp_stats['temps_before']} -> {parser.temp_stats['temps_after']}")
+        for name, count in parser.temp_stats['temps_after'].items():
+            assert count <= parser.temp_stats['temps_before'][name]
+        for engine in ['loop', 'dispatch', 'python']:
+            assert run_vm(program, engine) == expected
+
+if __name__ == "__main__":
+    test_temp_counts_per_function()
+    test_recycled_programs_keep_output()
@@ -0,0 +1,93 @@
+import sys
+import os
+import io
+import contextlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(os.path.dirname(current_dir), 'src')
+sys.path.append(src_path)
+
+from helpers import compile_source, execute
+from virtual_machine import VirtualMachine
+
+LOOPS = """
+program loops;
+var i, s : int; f : float;
+
+main() {
+    i = 0;
+    s = 0;
+    f = 0.5;
+    while (i < 3000) do {
+        if (i > 1500) {
+            s = s + i;
+        } else {
+            s = s - 1;
+        }
+        f = f * 1.5;
+        i = i + 1;
+    }
+    print(s);
+    print(i);
+}
+end
+"""
+
+def test_hot_loop_is_traced():
+    print("="*60)
+    print("TEST: JIT DE CICLOS")
+    print("="*60)
+
+    program = compile_source(LOOPS)
+    expected, _ = execute(program)
+    output, vm = execute(program, engine='dispatch', jit_threshold=10)
+    stats = vm.get_jit_stats()
+    print(stats)
+    for loop in vm.hot_loops.values():
+        print(loop.source)
+
+    assert output == expected
+    # El primer trazo sigue la rama else y sale por la guarda cuando i > 1500
+    assert stats['traces_compiled'] >= 1
+    assert stats['bailouts'] >= 1
+    assert stats['trace_runs'] < 3000
+
+def test_jit_disabled_and_prints_in_loop():
+    print("="*60)
+    print("TEST: JIT DESACTIVADO")
+    print("="*60)
+
+    program = compile_source(LOOPS)
+    _, vm = execute(program, engine='dispatch', jit=False)
+    assert vm.get_jit_stats()['traces_compiled'] == 0
+    assert not vm.hot_loops
+
+    with open(os.path.join(current_dir, 'fibonacci.patito')) as f:
+        program = compile_source(f.read())
+    expected, _ = execute(program)
+    output, vm = execute(program, engine='dispatch', jit_threshold=2)
+    assert output == expected
+    assert vm.get_jit_stats()['traces_compiled'] == 1
+
+def test_jit_after_resumable_run():
+    print("="*60)
+    print("TEST: JIT DESPUES DE START/STEP")
+    print("="*60)
+
+    program = compile_source(LOOPS)
+    vm = VirtualMachine(engine='dispatch', jit_threshold=10, output=io.StringIO())
+    vm.load_program(program)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.start()
+        while vm.step(1000):
+            pass
+        # Por pasos no hay trazos
+        assert vm.get_jit_stats()['traces_compiled'] == 0
+        vm.execute()
+    assert not vm.resumable
+    assert vm.get_jit_stats()['traces_compiled'] >= 1
+
+if __name__ == "__main__":
+    test_hot_loop_is_traced()
+    test_jit_disabled_and_prints_in_loop()
+    test_jit_after_resumable_run()